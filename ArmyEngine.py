@@ -17,12 +17,28 @@ from BoardAnalyzer import BoardAnalyzer
 from Interfaces import MapMatrixInterface
 from Models import Move, MoveBase
 from Engine.ArmyEngineModels import ArmySimState, ArmySimResult, SimTile, ArmySimEvaluationParams
+from Engine.TranspositionTable import TranspositionTable
+from Engine.ZeroSumSolver import ZeroSumSolver
 from MctsLudii import MctsDUCT, Game, Context, MctsEngineSummary
 from Path import Path
-from PerformanceTelemetry import PerformanceTelemetry
+from PerformanceTelemetry import PerformanceTelemetry, NoOpPerformanceTelemetry, NO_OP_TELEMETRY
 from base.client.map import MapBase, Tile
 from MapMatrix import MapMatrix
 
+ALPHA_BETA_MIN = float('-inf')
+ALPHA_BETA_MAX = float('inf')
+
+ALPHA_BETA_EXACT = 0
+ALPHA_BETA_LOWER = 1
+"""The cached result failed high; the real value is at least its value."""
+ALPHA_BETA_UPPER = 2
+"""The cached result failed low; the real value is at most its value."""
+
+
+class BruteForceDeadlineExceeded(Exception):
+    """Raised out of an iterative deepening alpha-beta iteration that ran past the scan deadline."""
+
+
 class ArmyEngine(object):
     def __init__(
             self,
@@ -127,6 +143,16 @@ class ArmyEngine(object):
 
         self._enemy_move_filter: typing.Callable[[Tile, Tile, ArmySimState], bool] | None = None
 
+        self._friendly_move_table: typing.Dict[int, typing.List[MoveBase]] = {}
+        """
+        Per army tile index, the interned legal friendly moves out of that tile, filled lazily and reset every scan.
+        The move filters only look at the source and dest tiles, so their results are cached here too.
+        """
+        self._enemy_move_table: typing.Dict[int, typing.List[MoveBase]] = {}
+        self._friendly_random_move_table: typing.Dict[int, typing.List[MoveBase | None]] = {}
+        """Per army tile index, the interned friendly moves random move generation picks uniformly from, including the no-op if allowed."""
+        self._enemy_random_move_table: typing.Dict[int, typing.List[MoveBase | None]] = {}
+
         self.log_everything: bool = False
 
         self.log_payoff_depth: int = 1
@@ -142,6 +168,45 @@ class ArmyEngine(object):
         self.to_turn: int = 0
         """The turn to simulate up to."""
 
+        self.use_brute_force_transposition_table: bool = False
+        """
+        If true, brute force scans reuse the result of any board state already searched via a different move order.
+        Off by default until it has been validated against the exhaustive search on more than the test scenarios.
+        """
+
+        self.brute_force_transposition_table_size: int = 50000
+
+        self.brute_force_transposition_table: TranspositionTable | None = None
+        """The transposition table from the last brute force scan, kept for its hit rate stats."""
+
+        self._active_transposition_table: TranspositionTable | None = None
+
+        self.use_brute_force_alpha_beta: bool = False
+        """
+        If true, brute force scans search with simultaneous move alpha-beta pruning, iteratively deepening one turn at a
+        time until the scan depth or time_limit is reached, instead of exhaustively searching and cutting the depth back
+        when running out of time. The value found at each completed depth is the same as the exhaustive search's.
+        """
+
+        self.brute_force_completed_depth: int = 0
+        """The deepest iterative deepening iteration the last alpha-beta brute force scan completed."""
+
+        self.nash_depth: int = 1
+        """Brute force payoff matrices at board state depths below this have their moves restricted to the nash equilibrium."""
+
+        self.use_zero_sum_nash_solver: bool = False
+        """
+        If true, nash equilibria are solved by zero_sum_solver (dominance pruning plus a small LP, memoized per scan) instead
+        of nashpy's lemke howson / support enumeration. The payoff matrices are always zero-sum so the equilibrium value is the same,
+        but on degenerate matrices the two can settle on different equilibria and so pick different root moves.
+        """
+
+        self.zero_sum_solver: ZeroSumSolver = ZeroSumSolver()
+
+        self._alpha_beta_deadline: float | None = None
+        self._alpha_beta_move_order: typing.Dict[typing.Tuple, typing.Tuple[MoveBase | None, MoveBase | None]] = {}
+        """The best friendly move and expected enemy response per board state from the previous iterative deepening iteration, searched first in the next one."""
+
         if DebugHelper.IS_DEBUGGING:
             self.iteration_limit = 150
             self.time_limit = 10000000000.0
@@ -177,6 +242,8 @@ class ArmyEngine(object):
         if self.force_enemy_towards_or_parallel_to is not None:
             self._enemy_move_filter = lambda source, dest, board: self.force_enemy_towards_or_parallel_to[source] < self.force_enemy_towards_or_parallel_to[dest]
 
+        self.reset_move_tables()
+
         baseBoardState = self.get_base_board_state()
 
         if turns == 0:
@@ -188,7 +255,7 @@ class ArmyEngine(object):
             result = self.execute_scan_brute_force(baseBoardState, turns, noThrow=noThrow)
 
             duration = time.perf_counter() - start
-            logbook.info(f'brute force army scrim depth {turns} complete in {duration:.3f} after iter {self.iterations} (nash {self.time_in_nash:.3f} - {self.nash_eq_iterations} eq itr, {self.time_in_nash_eq:.3f} in eq)')
+            logbook.info(f'brute force army scrim depth {turns} complete in {duration:.3f} after iter {self.iterations} (nash {self.time_in_nash:.3f} - {self.nash_eq_iterations} eq itr, {self.time_in_nash_eq:.3f} in eq, {self.zero_sum_solver.cache_hits}/{self.zero_sum_solver.solves} eq cached) {str(self.brute_force_transposition_table)}')
         else:
             if self.mcts_runner is None:
                 self.mcts_runner = MctsDUCT()
@@ -242,6 +309,14 @@ class ArmyEngine(object):
 
             return boardState
 
+        transpositionKey = None
+        remainingDepth = self.to_turn - currentTurn
+        if self._active_transposition_table is not None:
+            transpositionKey = boardState.get_transposition_key()
+            cachedResult = self._active_transposition_table.get(transpositionKey, minDepth=remainingDepth)
+            if cachedResult is not None:
+                return self._rebase_transposed_result(boardState, cachedResult)
+
         nextTurn = currentTurn + 1
 
         frMoves: typing.List[MoveBase | None] = boardState.generate_friendly_moves()
@@ -284,9 +359,31 @@ class ArmyEngine(object):
                 # frMoves[frMove].append(nextResult)
                 # enMoves[enMove].append(nextResult)
 
+        result = self._resolve_payoffs(boardState, frMoves, enMoves, payoffs, nashPayoffs)
+        if transpositionKey is not None:
+            self._active_transposition_table.store(transpositionKey, result, depth=remainingDepth)
+
+        return result
+
+    def _resolve_payoffs(
+            self,
+            boardState: ArmySimState,
+            frMoves: typing.List[MoveBase | None],
+            enMoves: typing.List[MoveBase | None],
+            payoffs: typing.List[typing.List[ArmySimState]],
+            nashPayoffs: typing.List[typing.List[int]]
+    ) -> ArmySimState:
+        """Picks the expected result state out of a fully evaluated payoff matrix, restricting the moves to the nash equilibria above nash_depth."""
         frEqMoves = [(i, m) for i, m in enumerate(frMoves)]
         enEqMoves = [(i, m) for i, m in enumerate(enMoves)]
-        if boardState.depth < 1:
+        if boardState.depth < self.nash_depth and self.use_zero_sum_nash_solver:
+            frEqMoves, enEqMoves = self.get_nash_moves_based_on_zero_sum_solver(
+                boardState,
+                numpy.array(nashPayoffs),
+                frEqMoves,
+                enEqMoves,
+                payoffs)
+        elif boardState.depth < self.nash_depth:
             nashStart = time.perf_counter()
             nashA = numpy.array(nashPayoffs)
             nashB = -nashA
@@ -312,6 +409,145 @@ class ArmyEngine(object):
 
         return self.get_comparison_based_expected_result_state(boardState.depth, frEqMoves, enEqMoves, payoffs)
 
+    def simulate_recursive_alpha_beta(
+            self,
+            boardState: ArmySimState,
+            currentTurn: int,
+            alpha: float,
+            beta: float
+    ) -> ArmySimState:
+        """
+        simulate_recursive_brute_force with simultaneous move alpha-beta pruning. The brute force result of a board state
+        is the friendly move with the best worst case enemy response (maximin over the payoff matrix), so a friendly move
+        row stops being searched as soon as one enemy response drops it to or below the best row found so far (or alpha),
+        and the whole matrix stops once a row reaches beta. Rows and columns are searched in the order of the previous
+        iterative deepening iteration's best moves.
+
+        Results strictly inside (alpha, beta) are exact and have the same value the exhaustive search would return.
+        Results at or below alpha / at or above beta are only upper / lower bounds on it.
+        Above nash_depth the full payoff matrix is still searched exactly, as the nash equilibrium move restriction needs it.
+
+        @param boardState:
+        @param currentTurn:
+        @param alpha: the value friendly is already guaranteed elsewhere in the tree.
+        @param beta: the value enemy is already guaranteed elsewhere in the tree.
+        @return: the expected result state.
+        """
+        self.iterations += 1
+        if self._alpha_beta_deadline is not None and self.iterations & 511 == 0 and time.perf_counter() > self._alpha_beta_deadline:
+            raise BruteForceDeadlineExceeded()
+
+        if (currentTurn >= self.to_turn
+                or (boardState.kills_all_friendly_armies and boardState.kills_all_enemy_armies)
+                or boardState.captures_enemy
+                or boardState.captured_by_enemy
+                or boardState.can_enemy_force_repetition
+                or boardState.can_force_repetition):
+            self.set_final_board_state_depth_estimation(boardState)
+            return boardState
+
+        nextTurn = currentTurn + 1
+        frMoves: typing.List[MoveBase | None] = boardState.generate_friendly_moves()
+        enMoves: typing.List[MoveBase | None] = boardState.generate_enemy_moves()
+
+        if boardState.depth < self.nash_depth:
+            payoffs: typing.List[typing.List[None | ArmySimState]] = [[None] * len(enMoves) for f in frMoves]
+            nashPayoffs: typing.List[typing.List[int]] = [[0] * len(enMoves) for f in frMoves]
+            for frIdx, frMove in enumerate(frMoves):
+                for enIdx, enMove in enumerate(enMoves):
+                    nextBoardState = self.get_next_board_state(nextTurn, boardState, frMove, enMove)
+                    nextResult = self.simulate_recursive_alpha_beta(nextBoardState, nextTurn, ALPHA_BETA_MIN, ALPHA_BETA_MAX)
+                    payoffs[frIdx][enIdx] = nextResult
+                    nashPayoffs[frIdx][enIdx] = nextResult.calculate_value_int()
+
+            return self._resolve_payoffs(boardState, frMoves, enMoves, payoffs, nashPayoffs)
+
+        key = boardState.get_transposition_key()
+        remainingDepth = self.to_turn - currentTurn
+        if self._active_transposition_table is not None:
+            cached = self._active_transposition_table.get(key, minDepth=remainingDepth)
+            if cached is not None:
+                bound, cachedResult = cached
+                cachedValue = cachedResult.calculate_value_int()
+                if (bound == ALPHA_BETA_EXACT
+                        or (bound == ALPHA_BETA_LOWER and cachedValue >= beta)
+                        or (bound == ALPHA_BETA_UPPER and cachedValue <= alpha)):
+                    return self._rebase_transposed_result(boardState, cachedResult)
+
+        frOrder = list(range(len(frMoves)))
+        enOrder = list(range(len(enMoves)))
+        prevBest = self._alpha_beta_move_order.get(key, None)
+        if prevBest is not None:
+            prevFr, prevEn = prevBest
+            frOrder.sort(key=lambda i: frMoves[i] != prevFr)
+            enOrder.sort(key=lambda i: enMoves[i] != prevEn)
+
+        best: ArmySimState | None = None
+        bestValue = ALPHA_BETA_MIN
+        bestFrMove = None
+        bestEnMove = None
+        for frIdx in frOrder:
+            frMove = frMoves[frIdx]
+            floor = max(alpha, bestValue)
+            worst: ArmySimState | None = None
+            worstValue = ALPHA_BETA_MAX
+            worstEnMove = None
+            for enIdx in enOrder:
+                enMove = enMoves[enIdx]
+                nextBoardState = self.get_next_board_state(nextTurn, boardState, frMove, enMove)
+                nextResult = self.simulate_recursive_alpha_beta(nextBoardState, nextTurn, floor, min(beta, worstValue))
+                nextValue = nextResult.calculate_value_int()
+                if worst is None or nextValue < worstValue:
+                    worst = nextResult
+                    worstValue = nextValue
+                    worstEnMove = enMove
+                if worstValue <= floor:
+                    # this friendly move cannot do better than one we already have
+                    break
+
+            if best is None or worstValue > bestValue:
+                best = worst
+                bestValue = worstValue
+                bestFrMove = frMove
+                bestEnMove = worstEnMove
+            if bestValue >= beta:
+                break
+
+        self._alpha_beta_move_order[key] = (bestFrMove, bestEnMove)
+
+        if self._active_transposition_table is not None:
+            bound = ALPHA_BETA_EXACT
+            if bestValue <= alpha:
+                bound = ALPHA_BETA_UPPER
+            elif bestValue >= beta:
+                bound = ALPHA_BETA_LOWER
+            self._active_transposition_table.store(key, (bound, best), depth=remainingDepth)
+
+        return best
+
+    def _rebase_transposed_result(self, boardState: ArmySimState, cachedResult: ArmySimState) -> ArmySimState:
+        """
+        The cached result's parent_board chain leads back up through whichever equivalent board state it was originally
+        searched from. Re-parents a copy of the part of that chain below the transposition onto boardState, so that the
+        expected moves built from the result follow the path that was actually taken.
+        """
+        suffix = []
+        cur = cachedResult
+        while cur.depth > boardState.depth:
+            suffix.append(cur)
+            cur = cur.parent_board
+
+        if cur is boardState:
+            return cachedResult
+
+        parent = boardState
+        for state in reversed(suffix):
+            copy = state.clone()
+            copy.parent_board = parent
+            parent = copy
+
+        return parent
+
     def get_next_board_state(
             self,
             turn: int,
@@ -319,7 +555,7 @@ class ArmyEngine(object):
             frMove: MoveBase | None,
             enMove: MoveBase | None,
             noClone: bool = False,
-            perfTelemetry: PerformanceTelemetry = PerformanceTelemetry(),
+            perfTelemetry: PerformanceTelemetry | NoOpPerformanceTelemetry = NO_OP_TELEMETRY,
     ) -> ArmySimState:
         nextBoardState = boardState
         if noClone:
@@ -369,7 +605,7 @@ class ArmyEngine(object):
                         if tile.isCity or tile.isGeneral:
                             newSimTile.army += 1
 
-                        nextBoardState.sim_tiles[tileIdx] = newSimTile
+                        nextBoardState.set_sim_tile(tileIdx, newSimTile)
                         if newSimTile.player == self.friendly_player:
                             st = nextBoardState.friendly_living_armies.pop(tileIdx, None)
                             if st:
@@ -387,7 +623,7 @@ class ArmyEngine(object):
                     simTile = nextBoardState.sim_tiles[tile.tile_index]
                     newSimTile = SimTile(simTile.source_tile, simTile.army + 1, simTile.player)
 
-                    nextBoardState.sim_tiles[tile.tile_index] = newSimTile
+                    nextBoardState.set_sim_tile(tile.tile_index, newSimTile)
                     if newSimTile.player == self.friendly_player:
                         st = nextBoardState.friendly_living_armies.pop(tile.tile_index, None)
                         if st is not None:
@@ -459,8 +695,8 @@ class ArmyEngine(object):
             if resultDest.source_tile.isGeneral:
                 resultDest.player = resultDest.source_tile.player
 
-        nextBoardState.sim_tiles[source.source_tile.tile_index] = SimTile(source.source_tile, source.army - movingArmy, movingPlayer)
-        nextBoardState.sim_tiles[dest.source_tile.tile_index] = resultDest
+        nextBoardState.set_sim_tile(source.source_tile.tile_index, SimTile(source.source_tile, source.army - movingArmy, movingPlayer))
+        nextBoardState.set_sim_tile(dest.source_tile.tile_index, resultDest)
 
         movingPlayerArmies = nextBoardState.friendly_living_armies
         otherPlayerArmies = nextBoardState.enemy_living_armies
@@ -515,7 +751,7 @@ class ArmyEngine(object):
             # if friendlyArmy.value > 0:
             st = SimTile(friendlyArmy.tile, friendlyArmy.value + 1, friendlyArmy.player)
             baseBoardState.friendly_living_armies[friendlyArmy.tile.tile_index] = st
-            baseBoardState.sim_tiles[friendlyArmy.tile.tile_index] = st
+            baseBoardState.set_sim_tile(friendlyArmy.tile.tile_index, st)
             if friendlyArmy.tile.isCity or friendlyArmy.tile.isGeneral:
                 baseBoardState.incrementing.add(friendlyArmy.tile)
 
@@ -523,10 +759,13 @@ class ArmyEngine(object):
             # if enemyArmy.value > 0:
             st = SimTile(enemyArmy.tile, enemyArmy.value + 1, self.enemy_player)
             baseBoardState.enemy_living_armies[enemyArmy.tile.tile_index] = st
-            baseBoardState.sim_tiles[enemyArmy.tile.tile_index] = st
+            baseBoardState.set_sim_tile(enemyArmy.tile.tile_index, st)
             if enemyArmy.tile.isCity or enemyArmy.tile.isGeneral:
                 baseBoardState.incrementing.add(enemyArmy.tile)
 
+        baseBoardState.friendly_living_armies_l = list(baseBoardState.friendly_living_armies.keys())
+        baseBoardState.enemy_living_armies_l = list(baseBoardState.enemy_living_armies.keys())
+
         baseBoardState.tile_differential = self.map.players[self.friendly_player].tileCount - self.map.players[self.enemy_player].tileCount
         baseBoardState.city_differential = self.map.players[self.friendly_player].cityCount - self.map.players[self.enemy_player].cityCount
         baseBoardState.friendly_move_generator = self.generate_friendly_moves
@@ -642,42 +881,64 @@ class ArmyEngine(object):
 
         return False
 
+    def reset_move_tables(self):
+        """Drops the cached per tile moves, must be called whenever the move filters or no-op settings change."""
+        self._friendly_move_table = {}
+        self._enemy_move_table = {}
+        self._friendly_random_move_table = {}
+        self._enemy_random_move_table = {}
+
     def generate_friendly_moves(self, boardState: ArmySimState) -> typing.List[MoveBase | None]:
-        moves = self._generate_moves(boardState.friendly_living_armies, boardState, allowOptionalNoOp=self.allow_friendly_no_op, filter=self._friendly_move_filter)
+        moves = self._generate_moves(boardState.friendly_living_armies, boardState, self._friendly_move_table, allowOptionalNoOp=self.allow_friendly_no_op, filter=self._friendly_move_filter)
         return moves
 
     def generate_enemy_moves(self, boardState: ArmySimState) -> typing.List[MoveBase | None]:
-        moves = self._generate_moves(boardState.enemy_living_armies, boardState, allowOptionalNoOp=self.allow_enemy_no_op, filter=self._enemy_move_filter)
+        moves = self._generate_moves(boardState.enemy_living_armies, boardState, self._enemy_move_table, allowOptionalNoOp=self.allow_enemy_no_op, filter=self._enemy_move_filter)
         return moves
 
     def _generate_moves(
             self,
             armies: typing.Dict[int, SimTile],
             boardState: ArmySimState,
+            moveTable: typing.Dict[int, typing.List[MoveBase]],
             allowOptionalNoOp: bool = True,
             filter: typing.Callable[[Tile, Tile, ArmySimState], bool] | None = None
     ) -> typing.List[MoveBase | None]:
         moves = []
-        for simTile in armies.values():
-            armyTile = simTile.source_tile
-            for dest in armyTile.movable:
-                if dest.isObstacle:
-                    continue
-                if filter is not None and filter(armyTile, dest, boardState):
-                    continue
-                moves.append(MoveBase(armyTile, dest))
+        for tileIdx, simTile in armies.items():
+            tileMoves = moveTable.get(tileIdx, None)
+            if tileMoves is None:
+                tileMoves = self._build_tile_moves(simTile.source_tile, boardState, filter)
+                moveTable[tileIdx] = tileMoves
+            moves.extend(tileMoves)
 
         if allowOptionalNoOp or len(moves) == 0:
             moves.append(None)
 
         return moves
 
+    def _build_tile_moves(
+            self,
+            armyTile: Tile,
+            boardState: ArmySimState,
+            filter: typing.Callable[[Tile, Tile, ArmySimState], bool] | None = None
+    ) -> typing.List[MoveBase]:
+        moves = []
+        for dest in armyTile.movable:
+            if dest.isObstacle:
+                continue
+            if filter is not None and filter(armyTile, dest, boardState):
+                continue
+            moves.append(MoveBase(armyTile, dest))
+
+        return moves
+
     def generate_random_friendly_move(self, boardState: ArmySimState) -> MoveBase | None:
-        move = self._generate_random_move(boardState.friendly_living_armies_l, boardState.friendly_living_armies, boardState, allowOptionalNoOp=self.allow_friendly_no_op, filter=self._friendly_move_filter)
+        move = self._generate_random_move(boardState.friendly_living_armies_l, boardState.friendly_living_armies, boardState, self._friendly_move_table, self._friendly_random_move_table, allowOptionalNoOp=self.allow_friendly_no_op, filter=self._friendly_move_filter)
         return move
 
     def generate_random_enemy_move(self, boardState: ArmySimState) -> MoveBase | None:
-        move = self._generate_random_move(boardState.enemy_living_armies_l, boardState.enemy_living_armies, boardState, allowOptionalNoOp=self.allow_enemy_no_op, filter=self._enemy_move_filter)
+        move = self._generate_random_move(boardState.enemy_living_armies_l, boardState.enemy_living_armies, boardState, self._enemy_move_table, self._enemy_random_move_table, allowOptionalNoOp=self.allow_enemy_no_op, filter=self._enemy_move_filter)
         return move
 
     def _generate_random_move(
@@ -685,31 +946,28 @@ class ArmyEngine(object):
             armiesIdxs: typing.List[int],
             armies: typing.Dict[int, SimTile],
             boardState: ArmySimState,
+            moveTable: typing.Dict[int, typing.List[MoveBase]],
+            randomMoveTable: typing.Dict[int, typing.List[MoveBase | None]],
             allowOptionalNoOp: bool = True,
             filter: typing.Callable[[Tile, Tile, ArmySimState], bool] | None = None
     ) -> MoveBase | None:
         try:
-            simTile = armies[random.choice(armiesIdxs)]
+            tileIdx = random.choice(armiesIdxs)
         except IndexError:
             return None
-        armyTile = simTile.source_tile
-
-        moves = []
-        for dest in armyTile.movable:
-            if dest.isObstacle:
-                continue
-            if filter is not None and filter(armyTile, dest, boardState):
-                continue
-            moves.append(dest)
-
-        if allowOptionalNoOp:
-            moves.append(None)
 
-        toTile = random.choice(moves)
-        if toTile is None:
-            return None
+        choices = randomMoveTable.get(tileIdx, None)
+        if choices is None:
+            tileMoves = moveTable.get(tileIdx, None)
+            if tileMoves is None:
+                tileMoves = self._build_tile_moves(armies[tileIdx].source_tile, boardState, filter)
+                moveTable[tileIdx] = tileMoves
+            choices = tileMoves.copy()
+            if allowOptionalNoOp:
+                choices.append(None)
+            randomMoveTable[tileIdx] = choices
 
-        return MoveBase(armyTile, toTile)
+        return random.choice(choices)
 
     def set_final_board_state_depth_estimation(self, boardState: ArmySimState):
         pass
@@ -889,6 +1147,44 @@ class ArmyEngine(object):
         self.time_in_nash_eq += time.perf_counter() - nashEqStart
         return frEqMoves, enEqMoves
 
+    def get_nash_moves_based_on_zero_sum_solver(
+            self,
+            boardState: ArmySimState,
+            nashPayoffs: numpy.ndarray,
+            frEnumMoves: typing.List[typing.Tuple[int, MoveBase | None]],
+            enEnumMoves: typing.List[typing.Tuple[int, MoveBase | None]],
+            payoffs: typing.List[typing.List[ArmySimState]]
+    ) -> typing.Tuple[typing.List[typing.Tuple[int, MoveBase | None]], typing.List[typing.Tuple[int, MoveBase | None]]]:
+        """
+        Returns just the enumeration of the moves that are part of the equilibrium, as solved by zero_sum_solver.
+
+        @param boardState:
+        @param nashPayoffs: the friendly payoff matrix, enemy payoffs being its negation.
+        @param frEnumMoves:
+        @param enEnumMoves:
+        @param payoffs:
+        @return:
+        """
+        nashEqStart = time.perf_counter()
+        frEqMoves = frEnumMoves
+        enEqMoves = enEnumMoves
+
+        self.nash_eq_iterations += 1
+        if len(frEnumMoves) > 0 and len(enEnumMoves) > 0:
+            solution = self.zero_sum_solver.solve(nashPayoffs)
+            frEqMoves = [frEnumMoves[moveIdx] for moveIdx, val in enumerate(solution.row_strategy) if val >= 0.5]
+            enEqMoves = [enEnumMoves[moveIdx] for moveIdx, val in enumerate(solution.col_strategy) if val >= 0.5]
+
+            if len(frEqMoves) == 0:
+                logbook.warn(f'no fr zero sum move >= 0.5, mixed equilibrium {str(solution)}')
+                frEqMoves = frEnumMoves
+            if len(enEqMoves) == 0:
+                logbook.warn(f'no en zero sum move >= 0.5, mixed equilibrium {str(solution)}')
+                enEqMoves = enEnumMoves
+
+        self.time_in_nash_eq += time.perf_counter() - nashEqStart
+        return frEqMoves, enEqMoves
+
     def get_nash_moves_based_on_lemke_howson(
             self,
             boardState: ArmySimState,
@@ -956,19 +1252,80 @@ class ArmyEngine(object):
             turns: int,
             noThrow: bool = False
     ) -> ArmySimResult:
+        if self.use_brute_force_alpha_beta:
+            return self.execute_scan_alpha_beta(baseBoardState, turns, noThrow)
+
         # we gradually cut off the recursive search depth so the time limit is more a time suggestion, unlike mcts. Back the initial cutoff off slightly.
         self._time_limit_dec = max(self.time_limit * 0.09, 0.004)
         self.time_limit = min(self.time_limit, self.time_limit * 0.6 + 0.007)
 
-        multiFriendly = len(self.friendly_armies) > 1
-        multiEnemy = len(self.enemy_armies) > 1
         self.to_turn = self.map.turn + turns
         self.start_time = time.perf_counter()
+        self.zero_sum_solver.clear()
+
+        self.brute_force_transposition_table = None
+        if self.use_brute_force_transposition_table:
+            self.brute_force_transposition_table = TranspositionTable(self.brute_force_transposition_table_size)
+
+        self._active_transposition_table = self.brute_force_transposition_table
+        try:
+            final_state: ArmySimState = self.simulate_recursive_brute_force(
+                baseBoardState,
+                self.map.turn)
+        finally:
+            self._active_transposition_table = None
+
+        return self._build_brute_force_result(baseBoardState, final_state, noThrow)
+
+    def execute_scan_alpha_beta(
+            self,
+            baseBoardState: ArmySimState,
+            turns: int,
+            noThrow: bool = False
+    ) -> ArmySimResult:
+        """
+        Iteratively deepens simulate_recursive_alpha_beta one turn at a time up to turns, returning the result of the
+        deepest iteration that finished before time_limit. The first iteration always runs to completion.
+        """
+        self.start_time = time.perf_counter()
+        deadline = self.start_time + self.time_limit
+        self.zero_sum_solver.clear()
+
+        self.brute_force_transposition_table = None
+        if self.use_brute_force_transposition_table:
+            self.brute_force_transposition_table = TranspositionTable(self.brute_force_transposition_table_size)
+
+        self._alpha_beta_move_order = {}
+        self.brute_force_completed_depth = 0
+        final_state: ArmySimState | None = None
+
+        self._active_transposition_table = self.brute_force_transposition_table
+        try:
+            for depth in range(1, max(1, turns) + 1):
+                self.to_turn = self.map.turn + depth
+                self._alpha_beta_deadline = deadline if final_state is not None else None
+                try:
+                    final_state = self.simulate_recursive_alpha_beta(baseBoardState, self.map.turn, ALPHA_BETA_MIN, ALPHA_BETA_MAX)
+                except BruteForceDeadlineExceeded:
+                    break
+
+                self.brute_force_completed_depth = depth
+                if time.perf_counter() > deadline:
+                    break
+        finally:
+            self._active_transposition_table = None
+            self._alpha_beta_deadline = None
+
+        if self.brute_force_completed_depth < turns:
+            logbook.info(f'AE ALPHA-BETA ITER {self.iterations} completed depth {self.brute_force_completed_depth}/{turns} in {time.perf_counter() - self.start_time:.3f}')
+
+        return self._build_brute_force_result(baseBoardState, final_state, noThrow)
+
+    def _build_brute_force_result(self, baseBoardState: ArmySimState, final_state: ArmySimState, noThrow: bool) -> ArmySimResult:
+        multiFriendly = len(self.friendly_armies) > 1
+        multiEnemy = len(self.enemy_armies) > 1
         ogDiff = baseBoardState.initial_differential
 
-        final_state: ArmySimState = self.simulate_recursive_brute_force(
-            baseBoardState,
-            self.map.turn)
         result = ArmySimResult(final_state)
         result.best_result_state_depth = final_state.depth
 
@@ -1044,7 +1401,7 @@ class ArmyEngine(object):
         decompressedExpectedScore = self.mcts_runner.decompress_player_utility(mctsSummary.expected_score)
         decompressedExpandedExpectedScore = self.mcts_runner.decompress_player_utility(mctsSummary.expanded_expected_score)
 
-        logbook.info(f'MCTS e{decompressedExpectedScore/10:.1f}({mctsSummary.expected_score:.4f}) : ee{decompressedExpandedExpectedScore/10:.1f}({mctsSummary.expanded_expected_score:.4f}) iter {mctsSummary.iterations}, nodesExplored {mctsSummary.nodes_explored}, rollouts {mctsSummary.trials_performed}, backprops {mctsSummary.backprop_iter}, rolloutExpansions {mctsSummary.rollout_expansions}, biasedRolloutExpansions {mctsSummary.biased_rollout_expansions}')
+        logbook.info(f'MCTS e{decompressedExpectedScore/10:.1f}({mctsSummary.expected_score:.4f}) : ee{decompressedExpandedExpectedScore/10:.1f}({mctsSummary.expanded_expected_score:.4f}) iter {mctsSummary.iterations}, nodesExplored {mctsSummary.nodes_explored}, rollouts {mctsSummary.trials_performed}, backprops {mctsSummary.backprop_iter}, rolloutExpansions {mctsSummary.rollout_expansions}, biasedRolloutExpansions {mctsSummary.biased_rollout_expansions}, ttHits {mctsSummary.transposition_hits}/{mctsSummary.transposition_lookups}, reusedVisits {mctsSummary.reused_visits}, parallel {mctsSummary.parallel_workers} workers {mctsSummary.parallel_iterations} iter')
 
         if self.honor_mcts_expected_score:
             result.net_economy_differential = decompressedExpectedScore / 10
@@ -1060,7 +1417,7 @@ class ArmyEngine(object):
             if simTile.source_tile.isGeneral or simTile.player != player:
                 continue
             armyGained = simTile.army - simTile.army // 2
-            nextBoardState.sim_tiles[simTile.source_tile.tile_index] = SimTile(simTile.source_tile, armyGained, byPlayer)
+            nextBoardState.set_sim_tile(simTile.source_tile.tile_index, SimTile(simTile.source_tile, armyGained, byPlayer))
             econDelta += armyGained
             econDelta += 1  # for the tile itselves econ.
 
@@ -124,6 +124,10 @@ class ArmyTracker(object):
         self.dropped_fog_tiles_this_turn: typing.Set[Tile] = set()
         self._boardAnalysis: BoardAnalyzer | None = None
 
+        self._pathable_tile_indexes: typing.List[int] = []
+        self._pathable_tile_indexes_version: int = -1
+        """The map.pathable_tiles_version _pathable_tile_indexes was built from."""
+
     def __getstate__(self):
         state = self.__dict__.copy()
 
@@ -358,10 +362,8 @@ class ArmyTracker(object):
 
         # if player.tileCount > 22 and player.tileCount < 25:
 
-        for tile in self.map.pathable_tiles:
-            if not self.valid_general_positions_by_player[pIdx].raw[tile.tile_index]:
-                continue
-            self.emergenceLocationMap[player.index].raw[tile.tile_index] += biggestNegative
+        validRaw = self.valid_general_positions_by_player[pIdx].raw
+        self.add_emergence(player.index, [i for i in self._get_pathable_tile_indexes() if validRaw[i]], biggestNegative)
 
         if tilesCouldntGetBetter:
             for tile in tilesCouldntGetBetter:
@@ -999,21 +1001,25 @@ class ArmyTracker(object):
 
             distancePlateau = max(1, min(distance - 1, 5))
 
+            undiscIndexes = []
+            undiscDists = []
+
             def foreachFunc(tile, dist):
                 if not tile.discovered:
-                    distCapped = max(distancePlateau, dist)
-                    emergeValue = distancePlateau * armyEmergenceScaledToTurns // distCapped
-                    # if self.valid_general_positions_by_player[emergingPlayer][tile]:
-                    # TODO this is doing the weird +1 emergence every turn thing
-                    self.emergenceLocationMap[emergedTile.player][tile] += max(1, emergeValue)
-                    # if largest[0] < self.emergenceLocationMap[emergedTile.player][tile]]:
-                    #     largestTile[0] = tile
-                    #     largest[0] = self.emergenceLocationMap[emergedTile.player][tile]]
+                    undiscIndexes.append(tile.tile_index)
+                    undiscDists.append(dist)
                 visibleOrDiscNeut = (tile.was_visible_last_turn() or (tile.discoveredAsNeutral and self.map.turn <= 100))
                 return (tile.isObstacle or visibleOrDiscNeut) and tile != emergedTile
 
             breadth_first_foreach_dist(self.map, [emergedTile], distance, foreachFunc, bypassDefaultSkip=True)
 
+            emergeRaw = self.emergenceLocationMap[emergedTile.player].raw
+            for tileIndex, dist in zip(undiscIndexes, undiscDists):
+                distCapped = max(distancePlateau, dist)
+                emergeValue = distancePlateau * armyEmergenceScaledToTurns // distCapped
+                # TODO this is doing the weird +1 emergence every turn thing
+                emergeRaw[tileIndex] += max(1, emergeValue)
+
             if len(self.uneliminated_emergence_events[emergedTile.player]) < 8:
                 logbook.info(f'new_army_emerged calling limit_gen_position_from_emergence because less than 8 so far')
                 self.limit_gen_position_from_emergence(self.map.players[emergedTile.player], emergedTile, emergenceAmount=armyEmergenceValue)
@@ -1052,27 +1058,25 @@ class ArmyTracker(object):
         player = emergingTile.player
         self.unrecaptured_emergence_events[player].add(emergingTile)
         if confidentFromGeneral:
-            for tile in self.map.get_all_tiles():
-                self.emergenceLocationMap[player][tile] /= 5.0
+            self.scale_emergence(player, 1 / 5.0)
 
-        incTiles = []
+        incIndexes = []
 
         def foreachFunc(curTile: Tile, dist: int):
             if dist == 0:
                 return
-            incTiles.append((curTile, dist))
+            incIndexes.append(curTile.tile_index)
 
             return curTile.visible and curTile != emergingTile
 
         breadth_first_foreach_dist(self.map, [emergingTile], maxDepth=maxDist, foreachFunc=foreachFunc)
 
-        if len(incTiles) == 0:
+        if len(incIndexes) == 0:
             incAmount = 20
         else:
-            incAmount = 500 / len(incTiles)
+            incAmount = 500 / len(incIndexes)
 
-        for incTile, dist in incTiles:
-            self.emergenceLocationMap[player][incTile] += incAmount
+        self.add_emergence(player, incIndexes, incAmount)
 
     def find_fog_source(self, armyPlayer: int, tile: Tile, delta: int | None = None, depthLimit: int | None = None) -> Path | None:
         """
@@ -2963,7 +2967,8 @@ class ArmyTracker(object):
             self._check_over_elimination(player)
 
     def _limit_general_position_to_within_tiles_and_distance(self, player: int, tiles: typing.List[Tile], maxDist: int, alsoIncreaseEmergence: bool = True, overrideCityPerfectInfo: bool | None = None, emergenceAmount: int = -1, dontCountSwamps: bool = True) -> int:
-        validSet = set()
+        # 1 for every still-valid general position the search reached.
+        reached = bytearray(len(self.map.tiles_by_index))
 
         # ONLY USE FOR EMERGENCE
         launchDist = self.player_launch_timings[player] // 2 + 1
@@ -2989,7 +2994,7 @@ class ArmyTracker(object):
         if alsoIncreaseEmergence:
             def limiter(t: Tile, dist: int) -> bool:
                 if validPositions.raw[t.tile_index]:
-                    validSet.add(t.tile_index)
+                    reached[t.tile_index] = 1
                     launchDistDiff = abs(launchDist - dist)
                     launchDistFactor = (divOffset + launchDistDiff)
                     launchEmergence = emFactor // launchDistFactor
@@ -3003,7 +3008,7 @@ class ArmyTracker(object):
         else:
             def limiter(t: Tile, dist: int) -> bool:
                 if validPositions.raw[t.tile_index]:
-                    validSet.add(t.tile_index)
+                    reached[t.tile_index] = 1
                 if t.discoveredAsNeutral and t not in everOwned:  # and (t.visible or self.map.turn < 50)   # should be solved without the visible check by adding the lost-sight-ever-owned-by-player hack to allow pathing through the fog now.
                     return True
                 if (t.isCostlyNeutralCity and (t.visible or hasPerfectInfoOfPlayerCities)) or t.isMountain or (t.isUndiscoveredObstacle and hasPerfectInfoOfPlayerCities) or t.isGeneral:
@@ -3030,7 +3035,7 @@ class ArmyTracker(object):
                 maxDist - 1,
                 limiter)
 
-        if len(validSet) == 0:
+        if not any(reached):
             if BYPASS_TIMEOUTS_FOR_DEBUGGING:
                 raise AssertionError('we produced an invalid general position restriction with 0 valid tiles.')
             else:
@@ -3039,16 +3044,20 @@ class ArmyTracker(object):
                 return 0
 
         elims = 0
-        for t in self.map.tiles_by_index:
-            if t.tile_index not in validSet and validPositions.raw[t.tile_index]:
-                # logbook.info(f'elimin')
+        raw = validPositions.raw
+        for tileIndex, isValid in enumerate(raw):
+            if isValid and not reached[tileIndex]:
                 elims += 1
-                validPositions.raw[t.tile_index] = False
+                raw[tileIndex] = False
                 if elims < 5:
-                    logbook.info(f'elim {elims} was {str(t)} (will stop logging at 5)')
+                    logbook.info(f'elim {elims} was {str(self.map.tiles_by_index[tileIndex])} (will stop logging at 5)')
 
         return elims
 
+    def get_valid_general_position_bits(self, player: int) -> int:
+        """The players valid general positions as an int bitset by tile_index, see MapMatrixSet.to_bits."""
+        return self.valid_general_positions_by_player[player].to_bits()
+
     def _initialize_viable_general_positions(self):
         ourGens = [self.map.generals[self.map.player_index]]
         self.seen_player_lookup[self.map.player_index] = True
@@ -3931,7 +3940,6 @@ class ArmyTracker(object):
 
     def add_emergence_around_minimum_connected_tree(self, connectedTiles: typing.List[Tile], requiredTiles: typing.List[Tile], player: int):
         enPlayer = self.map.players[player]
-        emergeMap = self.emergenceLocationMap[player]
         validMap = self.valid_general_positions_by_player[player]
 
         basis = enPlayer.tileCount - len(connectedTiles)
@@ -3952,12 +3960,16 @@ class ArmyTracker(object):
             basis = int(math.sqrt(basis) + 1)
         depth = basis
 
+        incIndexes = []
+
         def foreachFunc(tile: Tile):
-            if validMap[tile]:
-                emergeMap[tile] += factor
+            if validMap.raw[tile.tile_index]:
+                incIndexes.append(tile.tile_index)
 
         SearchUtils.breadth_first_foreach(self.map, connectedTiles, depth, foreachFunc, noLog=True)
 
+        self.add_emergence(player, incIndexes, factor)
+
     def get_prediction_value_x_y(self, player: int, x: int, y: int) -> float:
         """
         Return the emergence value for the tile at x,y for player player
@@ -3984,6 +3996,36 @@ class ArmyTracker(object):
     def _reset_player_emergences(self, player: int):
         self.emergenceLocationMap[player] = MapMatrix(self.map, 0.0)
 
+    def add_emergence(self, player: int, tileIndexes: typing.Iterable[int], amount: float):
+        """
+        Adds amount to the players emergence value at each tile_index, in one pass over the raw list.
+
+        @param player:
+        @param tileIndexes:
+        @param amount:
+        @return:
+        """
+        raw = self.emergenceLocationMap[player].raw
+        for tileIndex in tileIndexes:
+            raw[tileIndex] += amount
+
+    def get_emergence_snapshot(self, player: int) -> typing.List[float]:
+        """A copy of the players emergence values by tile_index, safe to hand to the viewer."""
+        return self.emergenceLocationMap[player].raw.copy()
+
+    def scale_emergence(self, player: int, factor: float):
+        """Decays (or boosts) every emergence value for the player by factor."""
+        raw = self.emergenceLocationMap[player].raw
+        raw[:] = [v * factor for v in raw]
+
+    def _get_pathable_tile_indexes(self) -> typing.List[int]:
+        version = self.map.pathable_tiles_version
+        if self._pathable_tile_indexes_version != version:
+            self._pathable_tile_indexes = [t.tile_index for t in self.map.pathable_tiles]
+            self._pathable_tile_indexes_version = version
+
+        return self._pathable_tile_indexes
+
     def reset_temp_tile_marked(self, curTile: Tile, noLog: bool = False):
         if not noLog:
             logbook.info(f'resetting wrong undisc fog guess {str(curTile)}')
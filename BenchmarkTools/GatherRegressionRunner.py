@@ -0,0 +1,470 @@
+"""
+Gather quality / latency regression runner.
+
+Runs a set of gather algorithms over the Tests/GameContinuationEntries corpus in a process pool, and produces a json
+report with per-algorithm value / turns / time percentiles plus per-case results. When given a baseline report (the
+json from a previous run), the per-case diffs are included and the run is flagged as a regression when the p95 latency
+or the mean gather value of any algorithm regresses past the configured thresholds.
+
+With an exact time limit configured, each (map, turns) case is also solved with the bounded exact steiner gather, and
+every algorithm gets an optimality gap (exact value minus its value) on the cases the exact solver proved optimal.
+
+Usage (from the repo root):
+    python -m BenchmarkTools.GatherRegressionRunner --baseline gather_baseline.json --output gather_report.json
+
+Exits nonzero on regression, so it can gate a change.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import pathlib
+import random
+import sys
+import time
+import traceback
+import typing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import logbook
+import numpy as np
+
+import Gather
+from Gather import GatherCapturePlan, GatherDebug
+from Interfaces import MapMatrixInterface
+from base.client.map import MapBase
+from base.client.tile import Tile
+
+DEFAULT_MAP_FOLDER = pathlib.Path(__file__).parent / '../Tests/GameContinuationEntries'
+
+SKIP_MAP_FRAGMENTS = ['TagXHz0X4-', 'nyeEPub4n---7--1165']
+"""Same known-bad maps that TestBase.execute_with_random_maps skips."""
+
+GatherAlgoFunc = typing.Callable[[MapBase, Tile, typing.Set[Tile], int, MapMatrixInterface[float], MapMatrixInterface[float], typing.Set[Tile]], typing.Union[GatherCapturePlan, None]]
+
+
+def _gather_max_set_iterative(map: MapBase, general: Tile, targets: typing.Set[Tile], turns: int, valueMatrix: MapMatrixInterface[float], armyCostMatrix: MapMatrixInterface[float], negativeTiles: typing.Set[Tile]) -> GatherCapturePlan | None:
+    return Gather.gather_max_set_iterative_plan(
+        map,
+        targets,
+        turns,
+        valueMatrix,
+        armyCostMatrix,
+        renderLive=False,
+        viewInfo=None,
+        searchingPlayer=general.player,
+        fastMode=False)
+
+
+def _gather_max_set_iterative_fast(map: MapBase, general: Tile, targets: typing.Set[Tile], turns: int, valueMatrix: MapMatrixInterface[float], armyCostMatrix: MapMatrixInterface[float], negativeTiles: typing.Set[Tile]) -> GatherCapturePlan | None:
+    return Gather.gather_max_set_iterative_plan(
+        map,
+        targets,
+        turns,
+        valueMatrix,
+        armyCostMatrix,
+        renderLive=False,
+        viewInfo=None,
+        searchingPlayer=general.player,
+        fastMode=True)
+
+
+def _gather_depth_iterative(map: MapBase, general: Tile, targets: typing.Set[Tile], turns: int, valueMatrix: MapMatrixInterface[float], armyCostMatrix: MapMatrixInterface[float], negativeTiles: typing.Set[Tile]) -> GatherCapturePlan | None:
+    valGathered, turnsUsed, nodes = Gather.knapsack_depth_gather_with_values(
+        map,
+        targets,
+        turns,
+        targetArmy=-1,
+        distPriorityMap=None,
+        negativeTiles=negativeTiles,
+        searchingPlayer=general.player,
+        viewInfo=None,
+        useTrueValueGathered=True,
+        incrementBackward=False,
+        includeGatherTreeNodesThatGatherNegative=True,
+        cutoffTime=time.perf_counter() + 1.0,
+        fastMode=False,
+        shouldLog=False)
+    plan = GatherCapturePlan.build_from_root_nodes(map, nodes, negativeTiles, general.player)
+    plan.gathered_army = valGathered
+    return plan
+
+
+def _gather_max_iterative(map: MapBase, general: Tile, targets: typing.Set[Tile], turns: int, valueMatrix: MapMatrixInterface[float], armyCostMatrix: MapMatrixInterface[float], negativeTiles: typing.Set[Tile]) -> GatherCapturePlan | None:
+    valGathered, turnsUsed, nodes = Gather.knapsack_max_gather_with_values(
+        map,
+        targets,
+        turns,
+        targetArmy=-1,
+        distPriorityMap=None,
+        negativeTiles=negativeTiles,
+        searchingPlayer=general.player,
+        viewInfo=None,
+        useTrueValueGathered=True,
+        incrementBackward=False,
+        includeGatherTreeNodesThatGatherNegative=True,
+        cutoffTime=time.perf_counter() + 1.0,
+        fastMode=False,
+        shouldLog=False)
+    plan = GatherCapturePlan.build_from_root_nodes(map, nodes, negativeTiles, general.player)
+    plan.gathered_army = valGathered
+    return plan
+
+
+GATHER_ALGORITHMS: typing.Dict[str, GatherAlgoFunc] = {
+    'DEF ITER': _gather_depth_iterative,
+    'MAX ITER': _gather_max_iterative,
+    'MAX SET ITER': _gather_max_set_iterative,
+    'MAX SET ITER FAST': _gather_max_set_iterative_fast,
+}
+"""Algorithms the runner knows how to run, by report key. Register more here (module level, so they pickle to the workers)."""
+
+
+def get_case_turns(mapFileName: str, turnsMin: int, turnsMax: int) -> int:
+    """Deterministic 'random' gather length per map, so baselines from different runs line up case for case."""
+    return turnsMin + zlib.crc32(mapFileName.encode()) % (turnsMax - turnsMin + 1)
+
+
+def _load_map_with_test_base(mapFileName: str) -> typing.Tuple[MapBase, Tile, Tile]:
+    # TestBase owns the txtmap -> MapBase loading (enemy general prediction etc), import lazily so this module doesnt require the test folder unless actually loading maps.
+    from Tests.TestBase import TestBase
+    loader = TestBase('runTest')
+    return loader.load_map_and_generals(f'GameContinuationEntries/{mapFileName}')
+
+
+def _run_map_cases(args: typing.Tuple[str, typing.List[int], typing.List[str], float | None]) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Worker entrypoint; runs every algorithm at every turn count on one map. Returns one result dict per case."""
+    mapFileName, turnsList, algoKeys, exactTimeLimit = args
+
+    results = []
+    try:
+        map, general, enemyGeneral = _load_map_with_test_base(mapFileName)
+    except Exception as ex:
+        return [{'map': mapFileName, 'turns': turns, 'algo': algo, 'error': f'load failed: {ex}'} for turns in turnsList for algo in algoKeys]
+
+    # TestBase turns debug asserts on, which both slows the gathers down and asserts on things production tolerates.
+    GatherDebug.USE_DEBUG_ASSERTS = False
+    GatherDebug.USE_DEBUG_LOGGING = False
+
+    if enemyGeneral is None:
+        return [{'map': mapFileName, 'turns': turns, 'algo': algo, 'error': 'no enemy general'} for turns in turnsList for algo in algoKeys]
+
+    negativeTiles = set()
+    targets = {enemyGeneral}
+    valueMatrix = Gather.build_gather_capture_pure_value_matrix(map, general.player, negativeTiles, useTrueValueGathered=True, prioritizeCaptureHighArmyTiles=False)
+    armyCostMatrix = Gather.build_gather_capture_pure_value_matrix(map, general.player, negativeTiles, useTrueValueGathered=True, prioritizeCaptureHighArmyTiles=False)
+
+    for turns in turnsList:
+        exactValue = None
+        exactOptimal = False
+        if exactTimeLimit is not None:
+            exactValue, exactTiles, exactOptimal = Gather.find_exact_best_steiner_gather(
+                map,
+                turns,
+                targets,
+                general.player,
+                valueMatrix,
+                negativeTiles=negativeTiles,
+                timeLimit=exactTimeLimit)
+            exactValue = float(exactValue) if exactTiles is not None else None
+
+        for algo in algoKeys:
+            result = {'map': mapFileName, 'turns': turns, 'algo': algo, 'error': None}
+            # seed per case so algorithms with randomness are repeatable against the baseline.
+            random.seed(zlib.crc32(f'{mapFileName}{turns}{algo}'.encode()))
+            gc.collect()
+            try:
+                start = time.perf_counter()
+                plan = GATHER_ALGORITHMS[algo](map, general, targets, turns, valueMatrix, armyCostMatrix, negativeTiles)
+                result['time_ms'] = (time.perf_counter() - start) * 1000.0
+
+                value = 0.0
+                turnsUsed = 0
+                result['reported_value'] = float(plan.gathered_army) if plan is not None else 0.0
+                if plan is not None:
+                    # recalculate from the matrix rather than trusting the reported value, same as GatherBenchmarkResult.
+                    Gather.recalculate_tree_values_from_matrix([], plan.root_nodes, valueMatrix, negativeTiles=negativeTiles)
+                    for node in plan.root_nodes:
+                        value += node.value
+                        turnsUsed += node.gatherTurns
+                result['value'] = float(value)
+                result['turns_used'] = int(turnsUsed)
+                if exactValue is not None:
+                    result['exact_value'] = exactValue
+                    result['exact_optimal'] = exactOptimal
+                    result['optimality_gap'] = exactValue - result['value'] if exactOptimal else None
+            except Exception:
+                result['error'] = traceback.format_exc(limit=3)
+            results.append(result)
+
+    return results
+
+
+def _percentiles(vals: typing.List[float]) -> typing.Dict[str, float]:
+    if not vals:
+        return {'p50': 0.0, 'p90': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    arr = np.array(vals, dtype=np.float64)
+    p50, p90, p95, p99 = np.percentile(arr, [50, 90, 95, 99])
+    return {'p50': float(p50), 'p90': float(p90), 'p95': float(p95), 'p99': float(p99), 'max': float(arr.max())}
+
+
+def _case_key(case: typing.Dict[str, typing.Any]) -> typing.Tuple[str, int, str]:
+    return case['map'], case['turns'], case['algo']
+
+
+class GatherRegressionReport(object):
+    def __init__(self, cases: typing.List[typing.Dict[str, typing.Any]], config: typing.Dict[str, typing.Any]):
+        self.cases: typing.List[typing.Dict[str, typing.Any]] = cases
+        self.config: typing.Dict[str, typing.Any] = config
+        self.comparison: typing.Dict[str, typing.Any] | None = None
+
+    def get_summary(self, onlyKeys: typing.Set[typing.Tuple[str, int, str]] | None = None) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Per algorithm aggregates.
+
+        @param onlyKeys: if provided, only cases with these (map, turns, algo) keys are aggregated (used to compare like for like vs a baseline).
+        """
+        byAlgo: typing.Dict[str, typing.List[typing.Dict[str, typing.Any]]] = {}
+        errorsByAlgo: typing.Dict[str, int] = {}
+        for case in self.cases:
+            algo = case['algo']
+            if case.get('error'):
+                errorsByAlgo[algo] = errorsByAlgo.get(algo, 0) + 1
+                continue
+            if onlyKeys is not None and _case_key(case) not in onlyKeys:
+                continue
+            byAlgo.setdefault(algo, []).append(case)
+
+        summary = {}
+        for algo in sorted(set(byAlgo.keys()).union(errorsByAlgo.keys())):
+            algoCases = byAlgo.get(algo, [])
+            values = [c['value'] for c in algoCases]
+            turns = [c['turns_used'] for c in algoCases]
+            gaps = [c['optimality_gap'] for c in algoCases if c.get('optimality_gap') is not None]
+            summary[algo] = {
+                'cases': len(algoCases),
+                'errors': errorsByAlgo.get(algo, 0),
+                'mean_value': float(np.mean(values)) if values else 0.0,
+                'mean_reported_value': float(np.mean([c['reported_value'] for c in algoCases])) if algoCases else 0.0,
+                'mean_value_per_turn': float(np.mean([c['value'] / max(1, c['turns_used']) for c in algoCases])) if algoCases else 0.0,
+                'mean_turns': float(np.mean(turns)) if turns else 0.0,
+                'time_ms': _percentiles([c['time_ms'] for c in algoCases]),
+            }
+            if gaps:
+                optimalCases = [c for c in algoCases if c.get('optimality_gap') is not None]
+                summary[algo]['optimal_cases'] = len(gaps)
+                summary[algo]['mean_optimality_gap'] = float(np.mean(gaps))
+                summary[algo]['mean_optimality_gap_ratio'] = float(np.mean([c['optimality_gap'] / max(1.0, abs(c['exact_value'])) for c in optimalCases]))
+                summary[algo]['optimal_rate'] = float(np.mean([1.0 if gap <= 0.0001 else 0.0 for gap in gaps]))
+        return summary
+
+    def compare_to_baseline(
+            self,
+            baseline: GatherRegressionReport,
+            maxValueRegression: float = 0.01,
+            maxP95LatencyRegression: float = 0.15,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Diffs this run against a baseline run case by case, and decides whether it regressed.
+        Only cases that succeeded in both runs are compared, so adding/removing maps doesnt skew the aggregates.
+
+        @param baseline:
+        @param maxValueRegression: fraction the mean gather value of an algorithm may drop before it counts as a regression.
+        @param maxP95LatencyRegression: fraction the p95 latency of an algorithm may grow before it counts as a regression.
+        @return: the comparison dict, also stored on self.comparison so it ends up in the json.
+        """
+        baseByKey = {_case_key(c): c for c in baseline.cases if not c.get('error')}
+        ourByKey = {_case_key(c): c for c in self.cases if not c.get('error')}
+        commonKeys = set(baseByKey.keys()).intersection(ourByKey.keys())
+
+        caseDiffs = []
+        for key in sorted(commonKeys):
+            ours = ourByKey[key]
+            base = baseByKey[key]
+            valueDiff = ours['value'] - base['value']
+            turnsDiff = ours['turns_used'] - base['turns_used']
+            if valueDiff == 0 and turnsDiff == 0:
+                # keep the report readable, only list cases whose output changed.
+                continue
+            caseDiffs.append({
+                'map': key[0],
+                'turns': key[1],
+                'algo': key[2],
+                'value_diff': valueDiff,
+                'turns_diff': turnsDiff,
+                'time_ms_diff': ours['time_ms'] - base['time_ms'],
+            })
+
+        ourSummary = self.get_summary(commonKeys)
+        baseSummary = baseline.get_summary(commonKeys)
+
+        regressions = []
+        algoDiffs = {}
+        for algo, ours in ourSummary.items():
+            base = baseSummary.get(algo)
+            if base is None or base['cases'] == 0:
+                continue
+
+            valueRatio = (ours['mean_value'] - base['mean_value']) / max(1.0, abs(base['mean_value']))
+            p95Ratio = (ours['time_ms']['p95'] - base['time_ms']['p95']) / max(0.001, base['time_ms']['p95'])
+            algoDiffs[algo] = {
+                'mean_value_change': valueRatio,
+                'p95_latency_change': p95Ratio,
+                'mean_turns_diff': ours['mean_turns'] - base['mean_turns'],
+            }
+            if valueRatio < -maxValueRegression:
+                regressions.append(f'{algo} mean value {base["mean_value"]:.2f} -> {ours["mean_value"]:.2f} ({100.0 * valueRatio:.1f}%, allowed -{100.0 * maxValueRegression:.1f}%)')
+            if p95Ratio > maxP95LatencyRegression:
+                regressions.append(f'{algo} p95 latency {base["time_ms"]["p95"]:.1f}ms -> {ours["time_ms"]["p95"]:.1f}ms (+{100.0 * p95Ratio:.1f}%, allowed +{100.0 * maxP95LatencyRegression:.1f}%)')
+
+        self.comparison = {
+            'compared_cases': len(commonKeys),
+            'max_value_regression': maxValueRegression,
+            'max_p95_latency_regression': maxP95LatencyRegression,
+            'algo_diffs': algoDiffs,
+            'regressions': regressions,
+            'passed': len(regressions) == 0,
+            'case_diffs': caseDiffs,
+        }
+        return self.comparison
+
+    def to_json_dict(self) -> typing.Dict[str, typing.Any]:
+        data = {
+            'config': self.config,
+            'summary': self.get_summary(),
+            'cases': self.cases,
+        }
+        if self.comparison is not None:
+            data['comparison'] = self.comparison
+        return data
+
+    def save(self, filePath: str):
+        with open(filePath, 'w') as file:
+            json.dump(self.to_json_dict(), file, indent=1)
+
+    @staticmethod
+    def load(filePath: str) -> GatherRegressionReport:
+        with open(filePath, 'r') as file:
+            data = json.load(file)
+        return GatherRegressionReport(data['cases'], data.get('config', {}))
+
+
+class GatherRegressionRunner(object):
+    def __init__(
+            self,
+            algoKeys: typing.List[str] | None = None,
+            turnsMin: int = 15,
+            turnsMax: int = 40,
+            turnsPerMap: int = 1,
+            processes: int | None = None,
+            mapFolder: str | pathlib.Path = DEFAULT_MAP_FOLDER,
+            exactTimeLimit: float | None = None,
+    ):
+        """
+        @param algoKeys: keys from GATHER_ALGORITHMS to run, defaults to all of them.
+        @param turnsMin:
+        @param turnsMax:
+        @param turnsPerMap: how many different gather lengths to run per map (spread evenly through [turnsMin, turnsMax], offset per map).
+        @param processes: worker process count, defaults to the cpu count.
+        @param mapFolder:
+        @param exactTimeLimit: if set, also solve every (map, turns) case with find_exact_best_steiner_gather under this
+         time limit (seconds) and report the per algorithm optimality gap on the cases it proves optimal.
+        """
+        if algoKeys is None:
+            algoKeys = list(GATHER_ALGORITHMS.keys())
+        for key in algoKeys:
+            if key not in GATHER_ALGORITHMS:
+                raise ValueError(f'unknown gather algorithm {key}, known: {list(GATHER_ALGORITHMS.keys())}')
+
+        self.algo_keys: typing.List[str] = algoKeys
+        self.turns_min: int = turnsMin
+        self.turns_max: int = turnsMax
+        self.turns_per_map: int = turnsPerMap
+        self.processes: int = processes if processes is not None else max(1, os.cpu_count() or 1)
+        self.map_folder: pathlib.Path = pathlib.Path(mapFolder)
+        self.exact_time_limit: float | None = exactTimeLimit
+
+    def get_map_files(self, limit: int | None = None) -> typing.List[str]:
+        files = sorted(f for f in os.listdir(self.map_folder) if f.endswith('.txtmap') and not any(skip in f for skip in SKIP_MAP_FRAGMENTS))
+        if limit is not None:
+            files = files[:limit]
+        return files
+
+    def _get_turns_for_map(self, mapFileName: str) -> typing.List[int]:
+        first = get_case_turns(mapFileName, self.turns_min, self.turns_max)
+        if self.turns_per_map == 1:
+            return [first]
+        span = self.turns_max - self.turns_min + 1
+        step = max(1, span // self.turns_per_map)
+        return sorted({self.turns_min + (first - self.turns_min + i * step) % span for i in range(self.turns_per_map)})
+
+    def run(self, mapFiles: typing.List[str] | None = None) -> GatherRegressionReport:
+        if mapFiles is None:
+            mapFiles = self.get_map_files()
+
+        jobs = [(mapFile, self._get_turns_for_map(mapFile), self.algo_keys, self.exact_time_limit) for mapFile in mapFiles]
+
+        start = time.perf_counter()
+        cases: typing.List[typing.Dict[str, typing.Any]] = []
+        if self.processes <= 1:
+            for job in jobs:
+                cases.extend(_run_map_cases(job))
+        else:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                for mapResults in pool.map(_run_map_cases, jobs, chunksize=max(1, len(jobs) // (self.processes * 8))):
+                    cases.extend(mapResults)
+
+        logbook.info(f'gather regression run of {len(jobs)} maps x {len(self.algo_keys)} algos completed in {time.perf_counter() - start:.1f}s on {self.processes} processes')
+
+        config = {
+            'algos': self.algo_keys,
+            'turns_min': self.turns_min,
+            'turns_max': self.turns_max,
+            'turns_per_map': self.turns_per_map,
+            'maps': len(mapFiles),
+            'exact_time_limit': self.exact_time_limit,
+        }
+        return GatherRegressionReport(cases, config)
+
+
+def main(argv: typing.List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Gather quality / latency regression benchmark over the GameContinuationEntries corpus.')
+    parser.add_argument('--output', default='gather_regression_report.json', help='where to write the json report')
+    parser.add_argument('--baseline', default=None, help='json report from a previous run to diff against')
+    parser.add_argument('--algos', default=None, help=f'comma separated keys, from {list(GATHER_ALGORITHMS.keys())}')
+    parser.add_argument('--maps', type=int, default=None, help='only run the first N maps (sorted by name)')
+    parser.add_argument('--turns-min', type=int, default=15)
+    parser.add_argument('--turns-max', type=int, default=40)
+    parser.add_argument('--turns-per-map', type=int, default=1)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--exact-time-limit', type=float, default=None, help='seconds per case for the exact gather; enables the optimality gap metric (use with small --turns-max)')
+    parser.add_argument('--max-value-regression', type=float, default=0.01, help='allowed fractional drop in mean value per algo')
+    parser.add_argument('--max-p95-latency-regression', type=float, default=0.15, help='allowed fractional increase in p95 latency per algo')
+    args = parser.parse_args(argv)
+
+    algoKeys = args.algos.split(',') if args.algos else None
+    runner = GatherRegressionRunner(algoKeys, args.turns_min, args.turns_max, args.turns_per_map, args.processes, exactTimeLimit=args.exact_time_limit)
+    report = runner.run(runner.get_map_files(args.maps))
+
+    passed = True
+    if args.baseline:
+        comparison = report.compare_to_baseline(GatherRegressionReport.load(args.baseline), args.max_value_regression, args.max_p95_latency_regression)
+        passed = comparison['passed']
+        for regression in comparison['regressions']:
+            logbook.error(f'REGRESSION: {regression}')
+
+    report.save(args.output)
+    for algo, stats in report.get_summary().items():
+        logbook.info(f'{algo.rjust(20)}: value {stats["mean_value"]:7.2f}  turns {stats["mean_turns"]:5.1f}  p50 {stats["time_ms"]["p50"]:6.1f}ms  p95 {stats["time_ms"]["p95"]:6.1f}ms  ({stats["cases"]} cases, {stats["errors"]} errors)')
+        if 'mean_optimality_gap' in stats:
+            logbook.info(f'{"".rjust(20)}  optimality gap {stats["mean_optimality_gap"]:6.2f} ({100.0 * stats["mean_optimality_gap_ratio"]:.1f}%), optimal on {100.0 * stats["optimal_rate"]:.0f}% of {stats["optimal_cases"]} proven cases')
+
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    logbook.StreamHandler(sys.stdout, level=logbook.INFO).push_application()
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+MCTS hyperparameter sweep runner.
+
+Runs every combination of a grid of MctsDUCT settings against a set of scrim scenarios (a GameContinuationEntries map
+plus the biggest friendly / enemy army on it) in a process pool, each search under the same fixed time budget. Each
+scenario is first searched once for a long time with the default settings, and that search's first friendly move is
+the reference move the sweep configurations are scored against.
+
+Produces a json report (config, per configuration summary, per search cases) and optionally a csv with one row per
+search, with throughput (iterations / rollouts / rollout expansions per second) and decision quality (agreement with
+the reference move, expected score) metrics.
+
+Usage (from the repo root):
+    python -m BenchmarkTools.MctsSweepRunner --param rollout_depth=15,50,100 --param biased_playouts_allowed_per_trial=7,30 --output mcts_sweep.json --csv mcts_sweep.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import traceback
+import typing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import logbook
+import numpy as np
+
+from BoardAnalyzer import BoardAnalyzer
+from MctsLudii import MctsDUCT
+
+DEFAULT_SCENARIOS: typing.List[typing.Tuple[str, int | None]] = [
+    ('scrim_playground_benchmarker_holding_enemy_city.txtmap', 204),
+    ('should_scrim_against_incoming_army__turn_241.txtmap', None),
+    ('army_scrim_defense_should_not_avoid_kill_threat___rgNPA7Zan---b--388.txtmap', None),
+    ('should_not_scrim_into_pocket____xd-FYFud---0--529.txtmap', None),
+]
+"""(GameContinuationEntries map file, turn override) pairs swept by default."""
+
+CASE_CSV_COLUMNS = [
+    'scenario', 'config', 'trial', 'error', 'duration', 'iterations', 'trials_performed', 'nodes_explored', 'backprop_iter',
+    'rollout_expansions', 'biased_rollout_expansions', 'iterations_per_second', 'rollouts_per_second', 'rollout_expansions_per_second',
+    'friendly_move', 'enemy_move', 'reference_move', 'agrees_with_reference', 'expected_score', 'net_economy_differential',
+]
+
+
+def expand_param_grid(paramGrid: typing.Dict[str, typing.List[typing.Any]]) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Every combination of the grid values, in grid order. An empty grid is the single default configuration."""
+    keys = list(paramGrid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*[paramGrid[k] for k in keys])]
+
+
+def get_config_name(params: typing.Dict[str, typing.Any]) -> str:
+    if not params:
+        return 'default'
+    return ' '.join(f'{k}={v}' for k, v in params.items())
+
+
+def _load_scenario(mapFileName: str, turn: int | None):
+    # TestBase owns the txtmap -> MapBase loading, import lazily so this module doesnt require the test folder unless actually loading maps.
+    from Tests.TestBase import TestBase
+    loader = TestBase('runTest')
+    map, general, enemyGeneral = loader.load_map_and_generals(f'GameContinuationEntries/{mapFileName}', turn)
+    friendlyArmy, enemyArmy = loader.get_test_army_tiles(map, general, enemyGeneral)
+    boardAnalysis = BoardAnalyzer(map, general)
+    boardAnalysis.rebuild_intergeneral_analysis(enemyGeneral)
+    return map, friendlyArmy, enemyArmy, boardAnalysis
+
+
+def _run_search(
+        mapFileName: str,
+        turn: int | None,
+        params: typing.Dict[str, typing.Any],
+        timeBudget: float,
+        depth: int,
+        seed: int,
+) -> typing.Dict[str, typing.Any]:
+    # imported here rather than at module level, ArmyEngine pulls in the whole bot.
+    from ArmyEngine import ArmyEngine
+
+    with logbook.NullHandler().applicationbound():
+        map, friendlyArmy, enemyArmy, boardAnalysis = _load_scenario(mapFileName, turn)
+
+        mcts = MctsDUCT(logStuff=False)
+        for param, value in params.items():
+            setattr(mcts, param, value)
+
+        engine = ArmyEngine(map, [friendlyArmy], [enemyArmy], boardAnalysis, timeCap=timeBudget, mctsRunner=mcts)
+        engine.time_limit = timeBudget
+
+        random.seed(seed)
+        np.random.seed(seed)
+        gc.collect()
+        start = time.perf_counter()
+        result = engine.scan(depth, mcts=True)
+        duration = time.perf_counter() - start
+
+    summary = mcts.last_summary
+    friendlyMove = None
+    enemyMove = None
+    if result.expected_best_moves:
+        friendlyMove, enemyMove = result.expected_best_moves[0]
+
+    return {
+        'duration': duration,
+        'iterations': summary.iterations,
+        'trials_performed': summary.trials_performed,
+        'nodes_explored': summary.nodes_explored,
+        'backprop_iter': summary.backprop_iter,
+        'rollout_expansions': summary.rollout_expansions,
+        'biased_rollout_expansions': summary.biased_rollout_expansions,
+        'iterations_per_second': summary.iterations / max(0.000001, duration),
+        'rollouts_per_second': summary.trials_performed / max(0.000001, duration),
+        'rollout_expansions_per_second': summary.rollout_expansions / max(0.000001, duration),
+        'friendly_move': str(friendlyMove),
+        'enemy_move': str(enemyMove),
+        'expected_score': float(summary.expected_score),
+        'net_economy_differential': float(result.net_economy_differential),
+    }
+
+
+def _run_reference(args: typing.Tuple[str, int | None, float, int]) -> typing.Dict[str, typing.Any]:
+    """Worker entrypoint; the long default settings search per scenario."""
+    mapFileName, turn, referenceTime, depth = args
+    try:
+        return _run_search(mapFileName, turn, {}, referenceTime, depth, zlib.crc32(f'{mapFileName}reference'.encode()))
+    except Exception:
+        return {'error': traceback.format_exc(limit=3)}
+
+
+def _run_case(args: typing.Tuple[str, int | None, typing.Dict[str, typing.Any], int, float, int, str | None]) -> typing.Dict[str, typing.Any]:
+    """Worker entrypoint; one time budgeted search of one configuration on one scenario."""
+    mapFileName, turn, params, trial, timeBudget, depth, referenceMove = args
+    configName = get_config_name(params)
+    case = {'scenario': mapFileName, 'config': configName, 'params': params, 'trial': trial, 'error': None, 'reference_move': referenceMove}
+    try:
+        # seed per case so the same sweep is repeatable, at least up to timing.
+        case.update(_run_search(mapFileName, turn, params, timeBudget, depth, zlib.crc32(f'{mapFileName}{configName}{trial}'.encode())))
+        case['agrees_with_reference'] = referenceMove is not None and case['friendly_move'] == referenceMove
+    except Exception:
+        case['error'] = traceback.format_exc(limit=3)
+    return case
+
+
+class MctsSweepReport(object):
+    def __init__(self, cases: typing.List[typing.Dict[str, typing.Any]], config: typing.Dict[str, typing.Any]):
+        self.cases: typing.List[typing.Dict[str, typing.Any]] = cases
+        self.config: typing.Dict[str, typing.Any] = config
+
+    def get_summary(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Per configuration aggregates over every scenario and trial, best reference agreement first."""
+        byConfig: typing.Dict[str, typing.List[typing.Dict[str, typing.Any]]] = {}
+        errorsByConfig: typing.Dict[str, int] = {}
+        paramsByConfig: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        for case in self.cases:
+            configName = case['config']
+            paramsByConfig[configName] = case['params']
+            if case.get('error'):
+                errorsByConfig[configName] = errorsByConfig.get(configName, 0) + 1
+                continue
+            byConfig.setdefault(configName, []).append(case)
+
+        summary = {}
+        for configName in paramsByConfig:
+            configCases = byConfig.get(configName, [])
+            referenced = [c for c in configCases if c['reference_move'] is not None]
+            summary[configName] = {
+                'params': paramsByConfig[configName],
+                'cases': len(configCases),
+                'errors': errorsByConfig.get(configName, 0),
+                'mean_duration': float(np.mean([c['duration'] for c in configCases])) if configCases else 0.0,
+                'mean_iterations': float(np.mean([c['iterations'] for c in configCases])) if configCases else 0.0,
+                'mean_iterations_per_second': float(np.mean([c['iterations_per_second'] for c in configCases])) if configCases else 0.0,
+                'mean_rollouts_per_second': float(np.mean([c['rollouts_per_second'] for c in configCases])) if configCases else 0.0,
+                'mean_rollout_expansions_per_second': float(np.mean([c['rollout_expansions_per_second'] for c in configCases])) if configCases else 0.0,
+                'reference_agreement': float(np.mean([1.0 if c['agrees_with_reference'] else 0.0 for c in referenced])) if referenced else 0.0,
+                'mean_expected_score': float(np.mean([c['expected_score'] for c in configCases])) if configCases else 0.0,
+            }
+
+        return dict(sorted(summary.items(), key=lambda item: (-item[1]['reference_agreement'], -item[1]['mean_iterations_per_second'])))
+
+    def to_json_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            'config': self.config,
+            'summary': self.get_summary(),
+            'cases': self.cases,
+        }
+
+    def save(self, filePath: str):
+        with open(filePath, 'w') as file:
+            json.dump(self.to_json_dict(), file, indent=1)
+
+    def save_csv(self, filePath: str):
+        """One row per search. The swept params get a column each, after the fixed columns."""
+        paramColumns = list(self.config.get('param_grid', {}).keys())
+        with open(filePath, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=CASE_CSV_COLUMNS + paramColumns, extrasaction='ignore')
+            writer.writeheader()
+            for case in self.cases:
+                row = dict(case)
+                row.update(case['params'])
+                writer.writerow(row)
+
+    @staticmethod
+    def load(filePath: str) -> MctsSweepReport:
+        with open(filePath, 'r') as file:
+            data = json.load(file)
+        return MctsSweepReport(data['cases'], data.get('config', {}))
+
+
+class MctsSweepRunner(object):
+    def __init__(
+            self,
+            paramGrid: typing.Dict[str, typing.List[typing.Any]],
+            scenarios: typing.List[typing.Tuple[str, int | None]] | None = None,
+            timeBudget: float = 0.3,
+            referenceTime: float = 5.0,
+            depth: int = 5,
+            trials: int = 3,
+            processes: int | None = None,
+    ):
+        """
+        @param paramGrid: MctsDUCT attribute name -> the values to sweep it over.
+        @param scenarios: (GameContinuationEntries map file, turn override) pairs, defaults to DEFAULT_SCENARIOS.
+        @param timeBudget: seconds per sweep search.
+        @param referenceTime: seconds for the default settings reference search per scenario, 0 to skip the agreement metric.
+        @param depth: the scan depth of every search.
+        @param trials: searches per configuration per scenario.
+        @param processes: worker process count, defaults to the cpu count. Searches are time budgeted, so more workers than
+         cores just means fewer iterations per search.
+        """
+        defaults = MctsDUCT(logStuff=False)
+        for param in paramGrid:
+            if not hasattr(defaults, param):
+                raise ValueError(f'unknown MctsDUCT setting {param}')
+
+        self.param_grid: typing.Dict[str, typing.List[typing.Any]] = paramGrid
+        self.scenarios: typing.List[typing.Tuple[str, int | None]] = scenarios if scenarios is not None else DEFAULT_SCENARIOS
+        self.time_budget: float = timeBudget
+        self.reference_time: float = referenceTime
+        self.depth: int = depth
+        self.trials: int = trials
+        self.processes: int = processes if processes is not None else max(1, os.cpu_count() or 1)
+
+    def _map(self, func, jobs: typing.List[typing.Any]) -> typing.List[typing.Any]:
+        if self.processes <= 1:
+            return [func(job) for job in jobs]
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            return list(pool.map(func, jobs))
+
+    def run(self) -> MctsSweepReport:
+        start = time.perf_counter()
+
+        referenceMoves: typing.Dict[str, str | None] = {mapFile: None for mapFile, turn in self.scenarios}
+        if self.reference_time > 0:
+            referenceJobs = [(mapFile, turn, self.reference_time, self.depth) for mapFile, turn in self.scenarios]
+            for (mapFile, turn), reference in zip(self.scenarios, self._map(_run_reference, referenceJobs)):
+                if reference.get('error'):
+                    logbook.error(f'reference search failed for {mapFile}: {reference["error"]}')
+                    continue
+                referenceMoves[mapFile] = reference['friendly_move']
+
+        configs = expand_param_grid(self.param_grid)
+        jobs = [
+            (mapFile, turn, params, trial, self.time_budget, self.depth, referenceMoves[mapFile])
+            for mapFile, turn in self.scenarios
+            for params in configs
+            for trial in range(self.trials)
+        ]
+        cases = self._map(_run_case, jobs)
+
+        logbook.info(f'mcts sweep of {len(configs)} configs x {len(self.scenarios)} scenarios x {self.trials} trials completed in {time.perf_counter() - start:.1f}s on {self.processes} processes')
+
+        config = {
+            'param_grid': self.param_grid,
+            'scenarios': [list(s) for s in self.scenarios],
+            'time_budget': self.time_budget,
+            'reference_time': self.reference_time,
+            'reference_moves': referenceMoves,
+            'depth': self.depth,
+            'trials': self.trials,
+            'processes': self.processes,
+        }
+        return MctsSweepReport(cases, config)
+
+
+def parse_param_arg(paramArg: str) -> typing.Tuple[str, typing.List[typing.Any]]:
+    """'name=v1,v2,...' -> (name, [v1, v2, ...]), with each value parsed as json where possible (ints, floats, true/false) and left a string otherwise."""
+    name, valuesStr = paramArg.split('=', 1)
+    values = []
+    for valueStr in valuesStr.split(','):
+        try:
+            values.append(json.loads(valueStr))
+        except ValueError:
+            values.append(valueStr)
+    return name.strip(), values
+
+
+def main(argv: typing.List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Parallel MctsDUCT hyperparameter sweep over scrim scenarios.')
+    parser.add_argument('--param', action='append', default=[], help='MctsDUCT setting to sweep, as name=v1,v2,... (repeatable)')
+    parser.add_argument('--output', default='mcts_sweep_report.json', help='where to write the json report')
+    parser.add_argument('--csv', default=None, help='where to also write the per search csv')
+    parser.add_argument('--time-budget', type=float, default=0.3, help='seconds per sweep search')
+    parser.add_argument('--reference-time', type=float, default=5.0, help='seconds for the reference search per scenario, 0 to skip')
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paramGrid = dict(parse_param_arg(p) for p in args.param)
+    runner = MctsSweepRunner(paramGrid, timeBudget=args.time_budget, referenceTime=args.reference_time, depth=args.depth, trials=args.trials, processes=args.processes)
+    report = runner.run()
+
+    report.save(args.output)
+    if args.csv:
+        report.save_csv(args.csv)
+
+    for configName, stats in report.get_summary().items():
+        logbook.info(f'{configName.rjust(50)}: agree {100.0 * stats["reference_agreement"]:5.1f}%  its/s {stats["mean_iterations_per_second"]:8.0f}  rollouts/s {stats["mean_rollouts_per_second"]:8.0f}  expansions/s {stats["mean_rollout_expansions_per_second"]:9.0f}  ({stats["cases"]} cases, {stats["errors"]} errors)')
+
+    return 0
+
+
+if __name__ == '__main__':
+    logbook.StreamHandler(sys.stdout, level=logbook.INFO).push_application()
+    sys.exit(main())
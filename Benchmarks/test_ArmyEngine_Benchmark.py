@@ -1,5 +1,7 @@
 import logbook
+import os
 import random
+import tempfile
 import time
 import traceback
 import typing
@@ -8,6 +10,7 @@ from unittest import mock
 import SearchUtils
 from ArmyEngine import ArmyEngine, ArmySimResult
 from ArmyTracker import Army
+from BenchmarkTools.MctsSweepRunner import MctsSweepRunner, MctsSweepReport, CASE_CSV_COLUMNS
 from BoardAnalyzer import BoardAnalyzer
 from Models import Move
 from Engine.ArmyEngineModels import calc_value_int, calc_econ_value, ArmySimState
@@ -1328,4 +1331,90 @@ dur 0.3073, iter   109, nodesExplored   109, rollouts   109,
             f'AVG:\ndur {outer_avg_duration:.4f}, iter {str(outer_avg_iterations).rjust(5)}, nodesExplored {str(outer_avg_nodes_explored).rjust(5)}, rollouts {str(outer_avg_trials_performed).rjust(5)}, \n                      backprops {str(outer_avg_backprop_iter).rjust(5)}, rolloutExpansions {str(outer_avg_rollout_expansions).rjust(5)}, biasedRolloutExpansions {str(outer_avg_biased_rollout_expansions).rjust(5)}')
 
         logbook.info("Perf metrics:")
-        logbook.info(str(sharedTelemetry))
\ No newline at end of file
+        logbook.info(str(sharedTelemetry))
+
+    def get_sweep_report_path(self, envVar: str, fileName: str) -> str:
+        """The path from envVar if it is set, otherwise fileName in a new temp dir, so benchmark runs never litter the working directory."""
+        path = os.environ.get(envVar, None)
+        if path:
+            return path
+        return os.path.join(tempfile.mkdtemp(prefix='mcts_sweep_'), fileName)
+
+    def test_sweep_runner_should_report_every_configuration_as_json_and_csv(self):
+        runner = MctsSweepRunner(
+            {'rollout_depth': [15, 50], 'biased_playouts_allowed_per_trial': [7]},
+            scenarios=[('scrim_playground_benchmarker_holding_enemy_city.txtmap', 204)],
+            timeBudget=0.05,
+            referenceTime=0.2,
+            trials=2,
+            processes=1)
+        report = runner.run()
+
+        self.assertEqual(4, len(report.cases))
+        for case in report.cases:
+            self.assertIsNone(case['error'])
+            self.assertGreater(case['iterations'], 0)
+            self.assertEqual(case['reference_move'], report.config['reference_moves'][case['scenario']])
+
+        summary = report.get_summary()
+        self.assertEqual({'rollout_depth=15 biased_playouts_allowed_per_trial=7', 'rollout_depth=50 biased_playouts_allowed_per_trial=7'}, set(summary.keys()))
+        for stats in summary.values():
+            self.assertEqual(2, stats['cases'])
+            self.assertGreater(stats['mean_iterations_per_second'], 0.0)
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            jsonPath = os.path.join(tmpDir, 'sweep.json')
+            csvPath = os.path.join(tmpDir, 'sweep.csv')
+            report.save(jsonPath)
+            report.save_csv(csvPath)
+
+            self.assertEqual(report.cases, MctsSweepReport.load(jsonPath).cases)
+            with open(csvPath) as csvFile:
+                lines = csvFile.read().splitlines()
+            self.assertEqual(','.join(CASE_CSV_COLUMNS + ['rollout_depth', 'biased_playouts_allowed_per_trial']), lines[0])
+            self.assertEqual(5, len(lines))
+
+        with self.assertRaises(ValueError):
+            MctsSweepRunner({'not_an_mcts_setting': [1]})
+
+    def test_benchmark_mcts_sweep(self):
+        # The rollout depth / biased rollout dimensions of test_benchmark_mcts, run through MctsSweepRunner across the default scenarios.
+        # Reports go to a fresh temp dir unless MCTS_SWEEP_OUTPUT / MCTS_SWEEP_CSV point somewhere else.
+        runner = MctsSweepRunner(
+            {
+                'rollout_depth': [15, 50, 100],
+                'biased_playouts_allowed_per_trial': [0, 7, 30],
+                'explore_factor': [0.55, 1.05],
+            },
+            timeBudget=0.3,
+            trials=5)
+        report = runner.run()
+
+        jsonPath = self.get_sweep_report_path('MCTS_SWEEP_OUTPUT', 'mcts_sweep_report.json')
+        csvPath = self.get_sweep_report_path('MCTS_SWEEP_CSV', 'mcts_sweep_report.csv')
+        report.save(jsonPath)
+        report.save_csv(csvPath)
+
+        self.begin_capturing_logging()
+        logbook.info(f'mcts sweep report written to {jsonPath} and {csvPath}')
+        for configName, stats in report.get_summary().items():
+            logbook.info(f'{configName}: agree {100.0 * stats["reference_agreement"]:.1f}%, its/s {stats["mean_iterations_per_second"]:.0f}, rollout expansions/s {stats["mean_rollout_expansions_per_second"]:.0f}')
+
+    def test_benchmark_mcts_progressive_widening(self):
+        # Progressive widening against the current full-width DUCT selection on the same scenarios.
+        runner = MctsSweepRunner(
+            {
+                'use_progressive_widening': [False, True],
+                'progressive_widening_exponent': [0.5, 0.7],
+            },
+            timeBudget=0.3,
+            trials=5)
+        report = runner.run()
+
+        jsonPath = self.get_sweep_report_path('MCTS_PROGRESSIVE_WIDENING_OUTPUT', 'mcts_progressive_widening_report.json')
+        report.save(jsonPath)
+
+        self.begin_capturing_logging()
+        logbook.info(f'progressive widening report written to {jsonPath}')
+        for configName, stats in report.get_summary().items():
+            logbook.info(f'{configName}: agree {100.0 * stats["reference_agreement"]:.1f}%, its/s {stats["mean_iterations_per_second"]:.0f}')
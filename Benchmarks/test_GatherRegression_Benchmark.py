@@ -0,0 +1,67 @@
+import copy
+import os
+import tempfile
+
+import logbook
+
+from BenchmarkTools.GatherRegressionRunner import GatherRegressionRunner, GatherRegressionReport
+from Tests.TestBase import TestBase
+
+
+class GatherRegressionBenchmarkTests(TestBase):
+    def test_regression_runner_should_pass_against_itself_and_fail_on_regressed_values_and_latency(self):
+        runner = GatherRegressionRunner(algoKeys=['MAX SET ITER FAST', 'DEF ITER'], processes=1)
+        report = runner.run(runner.get_map_files(limit=4))
+
+        with tempfile.TemporaryDirectory() as tmpDir:
+            path = os.path.join(tmpDir, 'baseline.json')
+            report.save(path)
+            baseline = GatherRegressionReport.load(path)
+
+        comparison = report.compare_to_baseline(baseline)
+        self.assertTrue(comparison['passed'], comparison['regressions'])
+        self.assertGreater(comparison['compared_cases'], 0)
+        self.assertEqual([], comparison['case_diffs'])
+
+        worse = GatherRegressionReport(copy.deepcopy(report.cases), report.config)
+        for case in worse.cases:
+            if case.get('error'):
+                continue
+            case['value'] -= 10.0
+            case['time_ms'] *= 2.0
+
+        comparison = worse.compare_to_baseline(baseline)
+        self.assertFalse(comparison['passed'])
+        self.assertEqual(comparison['compared_cases'], len(comparison['case_diffs']))
+        self.assertTrue(any('mean value' in r for r in comparison['regressions']))
+        self.assertTrue(any('p95 latency' in r for r in comparison['regressions']))
+
+    def test_benchmark_gather_regression_full_corpus(self):
+        # Full 988 map corpus run. Point GATHER_REGRESSION_BASELINE at a report from a previous run to gate on it.
+        runner = GatherRegressionRunner()
+        report = runner.run()
+
+        baselinePath = os.environ.get('GATHER_REGRESSION_BASELINE', None)
+        if baselinePath:
+            comparison = report.compare_to_baseline(GatherRegressionReport.load(baselinePath))
+            for regression in comparison['regressions']:
+                logbook.error(f'REGRESSION: {regression}')
+            self.assertTrue(comparison['passed'], '\n'.join(comparison['regressions']))
+
+        report.save(os.environ.get('GATHER_REGRESSION_OUTPUT', 'gather_regression_report.json'))
+
+    def test_regression_runner_should_report_optimality_gap_vs_exact_gather(self):
+        runner = GatherRegressionRunner(algoKeys=['MAX SET ITER FAST', 'MAX ITER'], turnsMin=4, turnsMax=10, processes=1, exactTimeLimit=0.5)
+        report = runner.run(runner.get_map_files(limit=6))
+
+        provenCases = [c for c in report.cases if not c.get('error') and c.get('optimality_gap') is not None]
+        self.assertGreater(len(provenCases), 0)
+        for case in provenCases:
+            if case['turns_used'] <= case['turns']:
+                # nothing within the turn budget may beat the proven optimum.
+                self.assertGreaterEqual(case['optimality_gap'], -0.0001, str(case))
+
+        summary = report.get_summary()
+        for algo in runner.algo_keys:
+            self.assertIn('mean_optimality_gap', summary[algo])
+            logbook.info(f'{algo}: gap {summary[algo]["mean_optimality_gap"]:.2f}, optimal rate {summary[algo]["optimal_rate"]:.2f} over {summary[algo]["optimal_cases"]} cases')
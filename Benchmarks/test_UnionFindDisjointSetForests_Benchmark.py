@@ -8,6 +8,8 @@ import unionfind as uf
 import logbook
 
 from Algorithms import FastDisjointSet
+from Algorithms.FastDisjointSet import FastDisjointTileSetSum, FastDisjointTileIndexSetSum, FastDisjointTileSetMultiSum, FastDisjointTileIndexSetMultiSum
+from MapMatrix import MapMatrix
 from Tests.TestBase import TestBase
 from base.client.tile import Tile
 
@@ -163,3 +165,100 @@ class UnionFindSetBenchmarkTests(TestBase):
                         logbook.info(f'disjSet duration {disjSetTotalDuration:.4f} vs scyPyDisjSet duration {sciPyDisjSetTotalDuration:.4f} at num rand tiles {numInSet} + retrievals {accesses} (ratio {sciPyDisjSetTotalDuration / disjSetTotalDuration:.3f})')
 
                         # self.assertLess(unionForestTotalDur, disjSetTotalDuration, f'unionForest stopped being faster at num "added" {numInSet} + retrievals {accesses}')
+
+    def test_benchmark_tile_index_array_sets_vs_tile_dict_sets(self):
+        # Compares the Tile-keyed dict forests against the tile_index array backed forests that get reset() and reused
+        #  between iterations, the way GathSetPruneReconnect._reconnect uses them.
+        for mapSize in [
+            'small',
+            'large'
+        ]:
+            for numInSet in [
+                5000,
+                500,
+                120,
+                50,
+                20,
+                5,
+            ]:
+                with self.subTest(mapSize=mapSize, numInSet=numInSet):
+                    if mapSize == 'large':
+                        mapFile = 'GameContinuationEntries/fog_land_builder_should_not_take_ages_to_build___Sx5Tl3mwJ---2--880.txtmap'
+                    else:
+                        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+
+                    map, general, enemyGeneral = self.load_map_and_generals(mapFile, 136)
+
+                    allTiles = list(map.get_all_tiles())
+                    valueMatrix = MapMatrix(map, 0.0)
+                    costMatrix = MapMatrix(map, 0.0)
+                    for t in allTiles:
+                        valueMatrix.raw[t.tile_index] = random.uniform(-5, 20)
+                        costMatrix.raw[t.tile_index] = float(t.army)
+
+                    self.begin_capturing_logging()
+
+                    dictSumDuration = 0.0
+                    arraySumDuration = 0.0
+                    dictMultiDuration = 0.0
+                    arrayMultiDuration = 0.0
+
+                    arrayForest = FastDisjointTileIndexSetSum(map, valueMatrix)
+                    arrayMultiForest = FastDisjointTileIndexSetMultiSum(map, [valueMatrix, costMatrix])
+
+                    for i in range(300):
+                        randTiles = random.choices(allTiles, k=min(len(allTiles), numInSet))
+                        randSet = set(randTiles)
+
+                        start = time.perf_counter()
+                        dictForest = FastDisjointTileSetSum(valueMatrix)
+                        for t in randTiles:
+                            for adj in t.movable:
+                                if adj in randSet:
+                                    dictForest.merge(t, adj)
+                        dictSubsets = dictForest.subsets_with_values()
+                        dictSumDuration += time.perf_counter() - start
+
+                        start = time.perf_counter()
+                        arrayForest.reset()
+                        for t in randTiles:
+                            adjInSet = [adj for adj in t.movable if adj in randSet]
+                            if adjInSet:
+                                arrayForest.merge_many(adjInSet, into=t)
+                        arraySubsets = arrayForest.subsets_with_values()
+                        arraySumDuration += time.perf_counter() - start
+
+                        start = time.perf_counter()
+                        dictMultiForest = FastDisjointTileSetMultiSum([valueMatrix, costMatrix])
+                        for t in randTiles:
+                            for adj in t.movable:
+                                if adj in randSet:
+                                    dictMultiForest.merge(t, adj)
+                        dictMultiSubsets = dictMultiForest.subsets_with_values()
+                        dictMultiDuration += time.perf_counter() - start
+
+                        start = time.perf_counter()
+                        arrayMultiForest.reset()
+                        for t in randTiles:
+                            adjInSet = [adj for adj in t.movable if adj in randSet]
+                            if adjInSet:
+                                arrayMultiForest.merge_many(adjInSet, into=t)
+                        arrayMultiSubsets = arrayMultiForest.subsets_with_values()
+                        arrayMultiDuration += time.perf_counter() - start
+
+                        self.assertEqual(dictForest.n_subsets, arrayForest.n_subsets)
+                        self.assertEqual(len(dictSubsets), len(arraySubsets))
+                        self.assertEqual(len(dictMultiSubsets), len(arrayMultiSubsets))
+                        for subset, val in dictSubsets:
+                            tile = next(iter(subset))
+                            arraySubset, arrayVal = arrayForest.subset_with_value(tile)
+                            self.assertEqual(subset, arraySubset)
+                            self.assertAlmostEqual(val, arrayVal, places=5)
+                            self.assertEqual(dictForest[tile], arrayForest[tile])
+                        for subset, vals in dictMultiSubsets:
+                            tile = next(iter(subset))
+                            arrayVals = arrayMultiForest.subset_values(tile)
+                            for val, arrayVal in zip(vals, arrayVals):
+                                self.assertAlmostEqual(val, arrayVal, places=5)
+
+                    logbook.info(f'{mapSize} numInSet {numInSet}: Sum dict {dictSumDuration:.4f} vs array {arraySumDuration:.4f} (ratio {arraySumDuration / dictSumDuration:.3f}), MultiSum dict {dictMultiDuration:.4f} vs array {arrayMultiDuration:.4f} (ratio {arrayMultiDuration / dictMultiDuration:.3f})')
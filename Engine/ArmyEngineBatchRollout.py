@@ -0,0 +1,560 @@
+from __future__ import annotations
+
+import random
+import typing
+
+import numpy
+from numba import jit
+
+from Engine.ArmyEngineModels import ArmySimState, ArmySimEvaluationParams
+
+NO_TILE = -1
+FRIENDLY = 0
+ENEMY = 1
+
+
+class BatchRolloutResult(object):
+    def __init__(self, numRollouts: int, maxSteps: int):
+        self.values: numpy.ndarray = numpy.zeros(numRollouts, dtype=numpy.float64)
+        """The ArmySimState.calculate_value_int() of each rollouts final board state."""
+
+        self.steps: numpy.ndarray = numpy.zeros(numRollouts, dtype=numpy.int32)
+        """How many moves each rollout played."""
+
+        self.moves: numpy.ndarray = numpy.full((numRollouts, max(0, maxSteps), 2, 2), NO_TILE, dtype=numpy.int32)
+        """[rollout, step, friendly/enemy, source/dest] tile indexes of the moves played, NO_TILE for no-ops."""
+
+        self.expansions: int = 0
+
+
+class BatchRolloutEngine(object):
+    """
+    Plays many MCTS rollouts in lockstep over NumPy arrays of tile armies / owners and living army lists, with the
+    random and biased move selection and the move resolution done in one numba kernel, instead of cloning an
+    ArmySimState and building MoveBase objects for every rollout move.
+
+    Follows the same rules as ArmyEngine.get_next_board_state and Game.playout_biased_move / playout_random_move, except
+    that positional (kill threat) win detection and repetition tracking are not modelled; neither affects the value of a
+    rollout when positional win detection is disabled in rollouts.
+    """
+
+    def __init__(self, engine, teams: typing.List[int]):
+        """
+        @param engine: the ArmyEngine the rollouts are played in. Its map is snapshotted, so build a new BatchRolloutEngine per search.
+        @param teams: the Game teams list used by the biased move heuristic.
+        """
+        self.engine = engine
+        self.map = engine.map
+        self.friendly_player: int = engine.friendly_player
+        self.enemy_player: int = engine.enemy_player
+
+        tiles = self.map.tiles_by_index
+        numTiles = len(tiles)
+        self.num_tiles: int = numTiles
+
+        self.base_army: numpy.ndarray = numpy.array([t.army for t in tiles], dtype=numpy.int64)
+        self.base_player: numpy.ndarray = numpy.array([t.player for t in tiles], dtype=numpy.int64)
+        self.is_city: numpy.ndarray = numpy.array([t.isCity for t in tiles], dtype=numpy.bool_)
+        self.is_general: numpy.ndarray = numpy.array([t.isGeneral for t in tiles], dtype=numpy.bool_)
+
+        # the engines move filters only look at the source and dest tiles, so they can be baked into per player destination tables.
+        self.dests: numpy.ndarray = numpy.full((2, numTiles, 4), NO_TILE, dtype=numpy.int32)
+        self.dest_counts: numpy.ndarray = numpy.zeros((2, numTiles), dtype=numpy.int32)
+        baseBoardState = engine.get_base_board_state()
+        for side, moveFilter in enumerate([engine._friendly_move_filter, engine._enemy_move_filter]):
+            for tile in tiles:
+                if tile.isObstacle:
+                    continue
+                count = 0
+                for dest in tile.movable:
+                    if dest.isObstacle:
+                        continue
+                    if moveFilter is not None and moveFilter(tile, dest, baseBoardState):
+                        continue
+                    self.dests[side, tile.tile_index, count] = dest.tile_index
+                    count += 1
+                self.dest_counts[side, tile.tile_index] = count
+
+        self.allow_no_op: numpy.ndarray = numpy.array([engine.allow_friendly_no_op, engine.allow_enemy_no_op], dtype=numpy.bool_)
+        self.team_ids: numpy.ndarray = numpy.array(self.map.team_ids_by_player_index, dtype=numpy.int64)
+        self.heuristic_teams: numpy.ndarray = numpy.array(teams, dtype=numpy.int64)
+        self.next_cycle_turn: int = engine.next_cycle_turn if engine.next_cycle_turn is not None else -1
+        self.base_city_differential: int = engine.base_city_differential
+
+        _seed_batch_rollout_rng(random.randrange(2 ** 31))
+
+    def run(
+            self,
+            boardStates: typing.List[ArmySimState],
+            maxNumBiasedActions: int,
+            maxNumPlayoutActions: int,
+            biasedMoveRatio: float,
+            minRandomInitialMoves: int
+    ) -> BatchRolloutResult:
+        """
+        Plays one rollout from each board state, with the same parameters as Game.playout. Does not modify the board states.
+
+        @param boardStates:
+        @param maxNumBiasedActions:
+        @param maxNumPlayoutActions:
+        @param biasedMoveRatio:
+        @param minRandomInitialMoves:
+        @return:
+        """
+        numRollouts = len(boardStates)
+        maxSteps = max(0, maxNumPlayoutActions)
+        result = BatchRolloutResult(numRollouts, maxSteps)
+        if numRollouts == 0:
+            return result
+
+        numTiles = self.num_tiles
+        army = numpy.empty((numRollouts, numTiles), dtype=numpy.int64)
+        army[:] = self.base_army
+        player = numpy.empty((numRollouts, numTiles), dtype=numpy.int64)
+        player[:] = self.base_player
+        touched = numpy.zeros((numRollouts, numTiles), dtype=numpy.bool_)
+        incrementing = numpy.zeros((numRollouts, numTiles), dtype=numpy.bool_)
+        living = numpy.zeros((numRollouts, 2, numTiles), dtype=numpy.bool_)
+
+        maxTouched = max(len(bs.sim_tiles) for bs in boardStates) + 2 * 2 * maxSteps
+        touchedList = numpy.zeros((numRollouts, maxTouched), dtype=numpy.int32)
+        touchedCount = numpy.zeros(numRollouts, dtype=numpy.int32)
+        maxLiving = max(1, max(max(len(bs.friendly_living_armies), len(bs.enemy_living_armies)) for bs in boardStates))
+        livingList = numpy.zeros((numRollouts, 2, maxLiving), dtype=numpy.int32)
+        livingCount = numpy.zeros((numRollouts, 2), dtype=numpy.int32)
+
+        turn = numpy.zeros(numRollouts, dtype=numpy.int64)
+        depth = numpy.zeros(numRollouts, dtype=numpy.int64)
+        tileDiff = numpy.zeros(numRollouts, dtype=numpy.int64)
+        cityDiff = numpy.zeros(numRollouts, dtype=numpy.int64)
+        controlledCityTurnDiff = numpy.zeros(numRollouts, dtype=numpy.int64)
+        skipped = numpy.zeros((numRollouts, 2), dtype=numpy.int64)
+        flags = numpy.zeros((numRollouts, 4), dtype=numpy.bool_)
+
+        for r, bs in enumerate(boardStates):
+            for tileIdx, simTile in bs.sim_tiles.items():
+                army[r, tileIdx] = simTile.army
+                player[r, tileIdx] = simTile.player
+                touched[r, tileIdx] = True
+                touchedList[r, touchedCount[r]] = tileIdx
+                touchedCount[r] += 1
+            for tile in bs.incrementing:
+                incrementing[r, tile.tile_index] = True
+            for side, armies in enumerate([bs.friendly_living_armies, bs.enemy_living_armies]):
+                for tileIdx in armies:
+                    living[r, side, tileIdx] = True
+                    livingList[r, side, livingCount[r, side]] = tileIdx
+                    livingCount[r, side] += 1
+
+            turn[r] = bs.turn
+            depth[r] = bs.depth
+            tileDiff[r] = bs.tile_differential
+            cityDiff[r] = bs.city_differential
+            controlledCityTurnDiff[r] = bs.controlled_city_turn_differential
+            skipped[r, FRIENDLY] = bs.friendly_skipped_move_count
+            skipped[r, ENEMY] = bs.enemy_skipped_move_count
+            flags[r, FLAG_CAPTURES_ENEMY] = bs.captures_enemy
+            flags[r, FLAG_CAPTURED_BY_ENEMY] = bs.captured_by_enemy
+            flags[r, FLAG_KILLS_ALL_FRIENDLY] = bs.kills_all_friendly_armies
+            flags[r, FLAG_KILLS_ALL_ENEMY] = bs.kills_all_enemy_armies
+
+        result.expansions = _run_batch_rollouts_jit(
+            self.base_army,
+            self.base_player,
+            self.is_city,
+            self.is_general,
+            self.dests,
+            self.dest_counts,
+            self.allow_no_op,
+            self.team_ids,
+            self.heuristic_teams,
+            self.friendly_player,
+            self.enemy_player,
+            self.next_cycle_turn,
+            self.base_city_differential,
+            maxSteps,
+            maxNumBiasedActions,
+            biasedMoveRatio,
+            minRandomInitialMoves,
+            army,
+            player,
+            touched,
+            touchedList,
+            touchedCount,
+            incrementing,
+            living,
+            livingList,
+            livingCount,
+            turn,
+            depth,
+            tileDiff,
+            cityDiff,
+            controlledCityTurnDiff,
+            skipped,
+            flags,
+            result.steps,
+            result.moves,
+        )
+
+        result.values = calculate_values_batch(
+            boardStates[0].eval_params,
+            tileDiff,
+            cityDiff,
+            controlledCityTurnDiff,
+            depth,
+            flags,
+            skipped,
+        )
+
+        return result
+
+
+FLAG_CAPTURES_ENEMY = 0
+FLAG_CAPTURED_BY_ENEMY = 1
+FLAG_KILLS_ALL_FRIENDLY = 2
+FLAG_KILLS_ALL_ENEMY = 3
+
+
+def calculate_values_batch(
+        evalParams: ArmySimEvaluationParams,
+        tileDiff: numpy.ndarray,
+        cityDiff: numpy.ndarray,
+        controlledCityTurnDiff: numpy.ndarray,
+        depth: numpy.ndarray,
+        flags: numpy.ndarray,
+        skipped: numpy.ndarray,
+) -> numpy.ndarray:
+    """Vectorized ArmySimState.calculate_value_int over a batch of rollout end states."""
+    values = (10 * (tileDiff + 25 * cityDiff + controlledCityTurnDiff)).astype(numpy.float64)
+    captureBonus = 100000 // (depth + 20)
+    values += numpy.where(flags[:, FLAG_CAPTURES_ENEMY], captureBonus, 0)
+    values -= numpy.where(flags[:, FLAG_CAPTURED_BY_ENEMY], captureBonus, 0)
+    values -= (depth - skipped[:, FRIENDLY]) * evalParams.friendly_move_penalty_10_fraction
+    values -= (depth - skipped[:, ENEMY]) * evalParams.enemy_move_penalty_10_fraction
+
+    killsEnemy = flags[:, FLAG_KILLS_ALL_ENEMY]
+    killsFriendly = flags[:, FLAG_KILLS_ALL_FRIENDLY]
+    values += numpy.where(killsEnemy, evalParams.kills_enemy_armies_10_fraction, 0)
+    rewardEnemyNoOps = numpy.logical_or(~killsEnemy, evalParams.always_reward_dead_army_no_ops)
+    values += numpy.where(rewardEnemyNoOps, skipped[:, ENEMY] * evalParams.enemy_move_no_op_scale_10_fraction, 0)
+    values += numpy.where(killsFriendly, evalParams.kills_friendly_armies_10_fraction, 0)
+    rewardFriendlyNoOps = numpy.logical_or(~killsFriendly, evalParams.always_reward_dead_army_no_ops)
+    values += numpy.where(rewardFriendlyNoOps, skipped[:, FRIENDLY] * evalParams.friendly_move_no_op_scale_10_fraction, 0)
+
+    return values
+
+
+@jit(nopython=True, cache=True)
+def _seed_batch_rollout_rng(seed: int):
+    numpy.random.seed(seed)
+
+
+@jit(nopython=True, cache=True)
+def _is_on_same_team(teamIds, playerANotNeutral: int, playerB: int) -> bool:
+    if playerB == playerANotNeutral:
+        return True
+    if playerB == -1:
+        return False
+    return teamIds[playerANotNeutral] == teamIds[playerB]
+
+
+@jit(nopython=True, cache=True)
+def _remove_living(living, livingList, livingCount, r: int, side: int, tileIdx: int) -> bool:
+    if not living[r, side, tileIdx]:
+        return False
+    living[r, side, tileIdx] = False
+    count = livingCount[r, side]
+    for i in range(count):
+        if livingList[r, side, i] == tileIdx:
+            livingList[r, side, i] = livingList[r, side, count - 1]
+            break
+    livingCount[r, side] = count - 1
+    return True
+
+
+@jit(nopython=True, cache=True)
+def _add_living(living, livingList, livingCount, r: int, side: int, tileIdx: int):
+    if living[r, side, tileIdx]:
+        return
+    living[r, side, tileIdx] = True
+    livingList[r, side, livingCount[r, side]] = tileIdx
+    livingCount[r, side] += 1
+
+
+@jit(nopython=True, cache=True)
+def _pick_random_move(dests, destCounts, allowNoOp, livingList, livingCount, r: int, side: int) -> typing.Tuple[int, int]:
+    """Same distribution as ArmyEngine._generate_random_move: a uniformly random living army, then a uniformly random destination or no-op."""
+    count = livingCount[r, side]
+    if count == 0:
+        return NO_TILE, NO_TILE
+    src = livingList[r, side, numpy.random.randint(0, count)]
+    numDests = destCounts[side, src]
+    numOptions = numDests
+    if allowNoOp[side]:
+        numOptions += 1
+    if numOptions == 0:
+        return NO_TILE, NO_TILE
+    choice = numpy.random.randint(0, numOptions)
+    if choice == numDests:
+        return NO_TILE, NO_TILE
+    return src, dests[side, src, choice]
+
+
+@jit(nopython=True, cache=True)
+def _heuristic_team(heuristicTeams, p: int) -> int:
+    # Game.pick_best_move_heuristic indexes the teams list directly, so neutral (-1) looks up the last team.
+    if p < 0:
+        p += len(heuristicTeams)
+    return heuristicTeams[p]
+
+
+@jit(nopython=True, cache=True)
+def _pick_biased_move(
+        baseArmy, basePlayer, isCity, isGeneral, dests, destCounts, heuristicTeams,
+        army, player, touched, livingList, livingCount,
+        r: int, side: int, movingPlayer: int, otherPlayer: int, depth: int
+) -> typing.Tuple[int, int]:
+    """Same as Game.pick_best_move_heuristic over the moves ArmyEngine._generate_moves would produce."""
+    bestSrc = NO_TILE
+    bestDest = NO_TILE
+    bestVal = -1
+    numBestFound = 1
+    movingTeam = _heuristic_team(heuristicTeams, movingPlayer)
+    otherTeam = _heuristic_team(heuristicTeams, otherPlayer)
+    for i in range(livingCount[r, side]):
+        src = livingList[r, side, i]
+        for d in range(destCounts[side, src]):
+            dest = dests[side, src, d]
+            val = 2
+            p = basePlayer[dest]
+            a = baseArmy[dest]
+            if isCity[dest] and p != -1:
+                a += depth // 2
+            if touched[r, dest]:
+                val -= 2
+                p = player[r, dest]
+                a = army[r, dest]
+
+            destTeam = _heuristic_team(heuristicTeams, p)
+            if destTeam == movingTeam:
+                val = 1
+            elif destTeam == otherTeam:
+                val = 6
+                if isCity[dest] or isGeneral[dest]:
+                    if army[r, src] - 1 > a:
+                        val += 10
+                        if isGeneral[dest]:
+                            val += 20
+            elif isCity[dest]:
+                val = -20
+
+            if bestVal < val:
+                bestVal = val
+                numBestFound = 1
+                bestSrc = src
+                bestDest = dest
+            elif bestVal == val:
+                numBestFound += 1
+                if numpy.random.randint(0, numBestFound) == 0:
+                    bestSrc = src
+                    bestDest = dest
+
+    return bestSrc, bestDest
+
+
+@jit(nopython=True, cache=True)
+def _touch(baseArmy, basePlayer, isCity, isGeneral, army, player, touched, touchedList, touchedCount, incrementing, r: int, tileIdx: int, movingArmy: int, depth: int, turn: int):
+    """The lazy SimTile creation from ArmyEngine.execute for a tile not yet in the board states sim_tiles."""
+    touched[r, tileIdx] = True
+    touchedList[r, touchedCount[r]] = tileIdx
+    touchedCount[r] += 1
+    army[r, tileIdx] = baseArmy[tileIdx]
+    player[r, tileIdx] = basePlayer[tileIdx]
+    if isCity[tileIdx] or isGeneral[tileIdx]:
+        if basePlayer[tileIdx] >= 0:
+            army[r, tileIdx] += (depth - ((turn - 1) & 1)) // 2
+            incrementing[r, tileIdx] = True
+        elif baseArmy[tileIdx] < movingArmy:
+            incrementing[r, tileIdx] = True
+
+
+@jit(nopython=True, cache=True)
+def _execute_player_capture(isGeneral, army, player, touchedList, touchedCount, tileDiff, r: int, capturedPlayer: int, byPlayer: int, friendly: bool):
+    econDelta = 0
+    for i in range(touchedCount[r]):
+        tileIdx = touchedList[r, i]
+        if isGeneral[tileIdx] or player[r, tileIdx] != capturedPlayer:
+            continue
+        armyGained = army[r, tileIdx] - army[r, tileIdx] // 2
+        army[r, tileIdx] = armyGained
+        player[r, tileIdx] = byPlayer
+        econDelta += armyGained + 1
+
+    if friendly:
+        tileDiff[r] -= econDelta
+    else:
+        tileDiff[r] += econDelta
+
+
+@jit(nopython=True, cache=True)
+def _execute(
+        baseArmy, basePlayer, isCity, isGeneral, teamIds,
+        army, player, touched, touchedList, touchedCount, incrementing, living, livingList, livingCount,
+        tileDiff, cityDiff, flags, turn, depth,
+        r: int, src: int, dest: int, side: int, movingPlayer: int, otherPlayer: int, friendlyPlayer: int, enemyPlayer: int
+):
+    """ArmyEngine.execute over the batch arrays."""
+    if src == NO_TILE:
+        return
+
+    sourceArmy = army[r, src]
+    movingArmy = sourceArmy - 1
+    if player[r, src] != movingPlayer or movingArmy <= 0:
+        return
+
+    if not touched[r, dest]:
+        _touch(baseArmy, basePlayer, isCity, isGeneral, army, player, touched, touchedList, touchedCount, incrementing, r, dest, movingArmy, depth[r], turn[r])
+
+    tileDif = 0
+    cityDif = 0
+    capsGeneral = False
+    destPlayer = player[r, dest]
+    destArmy = army[r, dest]
+    if not _is_on_same_team(teamIds, movingPlayer, destPlayer):
+        resultArmy = destArmy - movingArmy
+        resultPlayer = destPlayer
+        if resultArmy < 0:
+            resultArmy = 0 - resultArmy
+            if _is_on_same_team(teamIds, otherPlayer, destPlayer):
+                tileDif = 2
+                if isCity[dest]:
+                    cityDif = 2
+                if isGeneral[dest] and teamIds[otherPlayer] != teamIds[movingPlayer]:
+                    capsGeneral = True
+            else:
+                tileDif = 1
+                if isCity[dest]:
+                    cityDif = 1
+            resultPlayer = movingPlayer
+    else:
+        resultArmy = destArmy + movingArmy
+        resultPlayer = movingPlayer
+        if isGeneral[dest]:
+            resultPlayer = basePlayer[dest]
+
+    army[r, src] = sourceArmy - movingArmy
+    player[r, src] = movingPlayer
+    army[r, dest] = resultArmy
+    player[r, dest] = resultPlayer
+
+    otherSide = 1 - side
+    if side == ENEMY:
+        tileDif = 0 - tileDif
+        cityDif = 0 - cityDif
+        if capsGeneral:
+            if basePlayer[dest] != friendlyPlayer:
+                _execute_player_capture(isGeneral, army, player, touchedList, touchedCount, tileDiff, r, basePlayer[dest], movingPlayer, True)
+            else:
+                flags[r, FLAG_CAPTURED_BY_ENEMY] = True
+    else:
+        if capsGeneral:
+            if basePlayer[dest] != enemyPlayer:
+                _execute_player_capture(isGeneral, army, player, touchedList, touchedCount, tileDiff, r, basePlayer[dest], movingPlayer, False)
+            else:
+                flags[r, FLAG_CAPTURES_ENEMY] = True
+
+    _remove_living(living, livingList, livingCount, r, side, src)
+    otherWasLiving = _remove_living(living, livingList, livingCount, r, otherSide, dest)
+
+    if movingPlayer == resultPlayer:
+        if resultArmy > 1:
+            _add_living(living, livingList, livingCount, r, side, dest)
+    elif resultArmy > 1 and otherWasLiving:
+        _add_living(living, livingList, livingCount, r, otherSide, dest)
+
+    tileDiff[r] += tileDif
+    cityDiff[r] += cityDif
+
+
+@jit(nopython=True, cache=True)
+def _run_batch_rollouts_jit(
+        baseArmy, basePlayer, isCity, isGeneral, dests, destCounts, allowNoOp, teamIds, heuristicTeams,
+        friendlyPlayer: int, enemyPlayer: int, nextCycleTurn: int, baseCityDifferential: int,
+        maxSteps: int, maxNumBiasedActions: int, biasedMoveRatio: float, minRandomInitialMoves: int,
+        army, player, touched, touchedList, touchedCount, incrementing, living, livingList, livingCount,
+        turn, depth, tileDiff, cityDiff, controlledCityTurnDiff, skipped, flags,
+        steps, moves,
+) -> int:
+    """Advances every rollout one move at a time, in lockstep, until each is over or has played maxSteps moves. Returns the total number of moves played."""
+    numRollouts = army.shape[0]
+    alwaysBiased = biasedMoveRatio == 1.0
+    friendlyPriorityParity = friendlyPlayer > enemyPlayer
+    biasedActionsLeft = numpy.full(numRollouts, maxNumBiasedActions)
+    expansions = 0
+
+    for step in range(maxSteps):
+        anyActive = False
+        for r in range(numRollouts):
+            if flags[r, FLAG_CAPTURES_ENEMY] or flags[r, FLAG_CAPTURED_BY_ENEMY]:
+                continue
+            if flags[r, FLAG_KILLS_ALL_FRIENDLY] and flags[r, FLAG_KILLS_ALL_ENEMY]:
+                continue
+            anyActive = True
+
+            if step >= minRandomInitialMoves and biasedActionsLeft[r] > 0 and (alwaysBiased or numpy.random.random() <= biasedMoveRatio):
+                biasedActionsLeft[r] -= 1
+                frSrc, frDest = _pick_biased_move(baseArmy, basePlayer, isCity, isGeneral, dests, destCounts, heuristicTeams, army, player, touched, livingList, livingCount, r, FRIENDLY, friendlyPlayer, enemyPlayer, depth[r])
+                enSrc, enDest = _pick_biased_move(baseArmy, basePlayer, isCity, isGeneral, dests, destCounts, heuristicTeams, army, player, touched, livingList, livingCount, r, ENEMY, enemyPlayer, friendlyPlayer, depth[r])
+            else:
+                frSrc, frDest = _pick_random_move(dests, destCounts, allowNoOp, livingList, livingCount, r, FRIENDLY)
+                enSrc, enDest = _pick_random_move(dests, destCounts, allowNoOp, livingList, livingCount, r, ENEMY)
+
+            moves[r, step, FRIENDLY, 0] = frSrc
+            moves[r, step, FRIENDLY, 1] = frDest
+            moves[r, step, ENEMY, 0] = enSrc
+            moves[r, step, ENEMY, 1] = enDest
+
+            turn[r] += 1
+            depth[r] += 1
+
+            if ((turn[r] & 1) == 0) == friendlyPriorityParity:
+                _execute(baseArmy, basePlayer, isCity, isGeneral, teamIds, army, player, touched, touchedList, touchedCount, incrementing, living, livingList, livingCount, tileDiff, cityDiff, flags, turn, depth, r, frSrc, frDest, FRIENDLY, friendlyPlayer, enemyPlayer, friendlyPlayer, enemyPlayer)
+                if not flags[r, FLAG_CAPTURES_ENEMY]:
+                    _execute(baseArmy, basePlayer, isCity, isGeneral, teamIds, army, player, touched, touchedList, touchedCount, incrementing, living, livingList, livingCount, tileDiff, cityDiff, flags, turn, depth, r, enSrc, enDest, ENEMY, enemyPlayer, friendlyPlayer, friendlyPlayer, enemyPlayer)
+            else:
+                _execute(baseArmy, basePlayer, isCity, isGeneral, teamIds, army, player, touched, touchedList, touchedCount, incrementing, living, livingList, livingCount, tileDiff, cityDiff, flags, turn, depth, r, enSrc, enDest, ENEMY, enemyPlayer, friendlyPlayer, friendlyPlayer, enemyPlayer)
+                if not flags[r, FLAG_CAPTURED_BY_ENEMY]:
+                    _execute(baseArmy, basePlayer, isCity, isGeneral, teamIds, army, player, touched, touchedList, touchedCount, incrementing, living, livingList, livingCount, tileDiff, cityDiff, flags, turn, depth, r, frSrc, frDest, FRIENDLY, friendlyPlayer, enemyPlayer, friendlyPlayer, enemyPlayer)
+
+            if frSrc == NO_TILE:
+                skipped[r, FRIENDLY] += 1
+            if enSrc == NO_TILE:
+                skipped[r, ENEMY] += 1
+
+            if livingCount[r, FRIENDLY] == 0:
+                flags[r, FLAG_KILLS_ALL_FRIENDLY] = True
+            if livingCount[r, ENEMY] == 0:
+                flags[r, FLAG_KILLS_ALL_ENEMY] = True
+
+            if turn[r] == nextCycleTurn:
+                controlledCityTurnDiff[r] += cityDiff[r] - baseCityDifferential
+                for i in range(touchedCount[r]):
+                    tileIdx = touchedList[r, i]
+                    if player[r, tileIdx] >= 0:
+                        army[r, tileIdx] += 1
+                        if isCity[tileIdx] or isGeneral[tileIdx]:
+                            army[r, tileIdx] += 1
+            elif turn[r] & 1 == 0:
+                controlledCityTurnDiff[r] += cityDiff[r] - baseCityDifferential
+                for i in range(touchedCount[r]):
+                    tileIdx = touchedList[r, i]
+                    if incrementing[r, tileIdx]:
+                        army[r, tileIdx] += 1
+
+            steps[r] += 1
+            expansions += 1
+
+        if not anyActive:
+            break
+
+    return expansions
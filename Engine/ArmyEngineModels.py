@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import random
 import typing
 from collections import deque
 
@@ -25,6 +26,46 @@ class SimTile(object):
         return str(self)
 
 
+ZOBRIST_ARMY_BUCKET_BITS = 8
+ZOBRIST_ARMY_BUCKETS = 1 << ZOBRIST_ARMY_BUCKET_BITS
+"""Armies below this get their own random key per tile; larger armies fold the overflow in via a per tile multiplier."""
+ZOBRIST_PLAYER_SLOTS = 17
+"""Players -1 (neutral) through 15."""
+_ZOBRIST_MASK = (1 << 64) - 1
+
+_zobrist_random = random.Random(0x5EED2B1D)
+_zobrist_player_keys: typing.List[typing.List[int]] = []
+"""[tileIdx][player + 1] random 64 bit keys."""
+_zobrist_army_keys: typing.List[typing.List[int]] = []
+"""[tileIdx][army bucket] random 64 bit keys, with one extra trailing odd multiplier for armies past the last bucket."""
+
+
+def _extend_zobrist_tables(tileCount: int):
+    while len(_zobrist_player_keys) < tileCount:
+        _zobrist_player_keys.append([_zobrist_random.getrandbits(64) for _ in range(ZOBRIST_PLAYER_SLOTS)])
+        armyKeys = [_zobrist_random.getrandbits(64) for _ in range(ZOBRIST_ARMY_BUCKETS)]
+        armyKeys.append(_zobrist_random.getrandbits(64) | 1)
+        _zobrist_army_keys.append(armyKeys)
+
+
+def get_zobrist_key(tileIdx: int, army: int, player: int) -> int:
+    """
+    The zobrist key of a single sim tile, from the precomputed random tables. The tables are seeded, so keys are stable
+    across runs, and grow on demand to cover whatever tile indexes get asked for.
+    """
+    if tileIdx >= len(_zobrist_player_keys):
+        _extend_zobrist_tables(tileIdx + 1)
+    armyKeys = _zobrist_army_keys[tileIdx]
+    key = _zobrist_player_keys[tileIdx][player + 1] ^ armyKeys[army & (ZOBRIST_ARMY_BUCKETS - 1)]
+    overflow = army >> ZOBRIST_ARMY_BUCKET_BITS
+    if overflow:
+        key ^= (overflow * armyKeys[ZOBRIST_ARMY_BUCKETS]) & _ZOBRIST_MASK
+    return key
+
+
+_extend_zobrist_tables(1024)
+
+
 class ArmySimEvaluationParams(object):
     def __init__(self):
         self.friendly_move_penalty_10_fraction = 4
@@ -73,6 +114,41 @@ class ArmySimEvaluationParams(object):
 # ])
 # # @jitclass
 class ArmySimState(object):
+    __slots__ = (
+        'eval_params',
+        'turn',
+        'depth',
+        'tile_differential',
+        'city_differential',
+        'captures_enemy',
+        'captured_by_enemy',
+        'can_force_repetition',
+        'can_enemy_force_repetition',
+        'kills_all_friendly_armies',
+        'kills_all_enemy_armies',
+        'sim_tiles',
+        'zobrist_hash',
+        'incrementing',
+        'controlled_city_turn_differential',
+        'friendly_living_armies',
+        'enemy_living_armies',
+        'friendly_living_armies_l',
+        'enemy_living_armies_l',
+        'friendly_skipped_move_count',
+        'enemy_skipped_move_count',
+        'friendly_move',
+        'enemy_move',
+        'prev_friendly_move',
+        'prev_enemy_move',
+        'repetition_count',
+        'parent_board',
+        'friendly_move_generator',
+        'enemy_move_generator',
+        'friendly_random_move_generator',
+        'enemy_random_move_generator',
+        'initial_differential',
+    )
+
     def __init__(
             self,
             turn: int,
@@ -127,9 +203,18 @@ class ArmySimState(object):
 
         self.sim_tiles: typing.Dict[int, SimTile] = simTiles
         """
-        the set of tiles that have been involved in the scrim so far, tracking the current owner and army amount on them
+        the set of tiles that have been involved in the scrim so far, tracking the current owner and army amount on them.
+        SimTiles are shared between cloned states, so never mutate one in place; replace it via set_sim_tile.
         """
 
+        self.zobrist_hash: int = 0
+        """
+        Zobrist hash of the (tile_index, army, player) of every sim tile (see get_zobrist_key), maintained incrementally by set_sim_tile.
+        Only covers the tiles; combine with the scalar fields if those matter to whatever is keyed on it.
+        """
+        if simTiles:
+            self.recalculate_zobrist_hash()
+
         self.incrementing: typing.Set[Tile] = set() if not noKeys else None
         """
         The set of tiles in the scrim that are currently incrementing (city or general)
@@ -218,15 +303,81 @@ class ArmySimState(object):
         self.depth += 1
         self.turn += 1
 
-    def clone(self, noKeys: bool = False) -> ArmySimState:
-        copy = ArmySimState(
+    def set_sim_tile(self, tileIdx: int, simTile: SimTile):
+        """Replaces the sim tile at tileIdx, keeping the zobrist hash up to date."""
+        old = self.sim_tiles.get(tileIdx, None)
+        if old is not None:
+            self.zobrist_hash ^= get_zobrist_key(tileIdx, old.army, old.player)
+        self.zobrist_hash ^= get_zobrist_key(tileIdx, simTile.army, simTile.player)
+        self.sim_tiles[tileIdx] = simTile
+
+    def recalculate_zobrist_hash(self) -> int:
+        zobrist = 0
+        for tileIdx, simTile in self.sim_tiles.items():
+            zobrist ^= get_zobrist_key(tileIdx, simTile.army, simTile.player)
+        self.zobrist_hash = zobrist
+        return zobrist
+
+    def get_transposition_key(self, includeMoveHistory: bool = True) -> typing.Tuple:
+        """
+        Identifies everything about this state that affects its value or how play can continue from it, so that move
+        orders reaching the same position can share search results.
+
+        @param includeMoveHistory: if True, the last two moves (reduced to their destinations, which is all repetition
+         detection looks at) are part of the key, making it exact. If False, positions reached with different recent
+         moves transpose too, at the cost of repetition detection below them following whichever path got there first.
+        @return:
+        """
+        positionKey = (
+            self.zobrist_hash,
             self.turn,
-            self.eval_params,
-            self.sim_tiles.copy(),
-            self.friendly_living_armies.copy(),
-            self.enemy_living_armies.copy(),
-            noKeys=noKeys,
+            self.depth,
+            self.tile_differential,
+            self.city_differential,
+            self.controlled_city_turn_differential,
+            self.friendly_skipped_move_count,
+            self.enemy_skipped_move_count,
+            self.repetition_count,
+            self.captures_enemy,
+            self.captured_by_enemy,
+            self.can_force_repetition,
+            self.can_enemy_force_repetition,
+            self.kills_all_friendly_armies,
+            self.kills_all_enemy_armies,
+            frozenset(self.friendly_living_armies),
+            frozenset(self.enemy_living_armies),
+            frozenset(self.incrementing),
         )
+        if not includeMoveHistory:
+            return positionKey
+
+        frMove = self.friendly_move
+        enMove = self.enemy_move
+        prevFrMove = self.prev_friendly_move
+        prevEnMove = self.prev_enemy_move
+        return (
+            positionKey,
+            frMove.dest.tile_index if frMove is not None else -1,
+            enMove.dest.tile_index if enMove is not None else -1,
+            prevFrMove.dest.tile_index if prevFrMove is not None else -1,
+            prevEnMove.dest.tile_index if prevEnMove is not None else -1,
+        )
+
+    def clone(self, noKeys: bool = False) -> ArmySimState:
+        # bypasses __init__; the dict copies are straight hash table buffer copies of the (immutable by convention) SimTiles.
+        copy = ArmySimState.__new__(ArmySimState)
+        copy.eval_params = self.eval_params
+        copy.turn = self.turn
+        copy.sim_tiles = self.sim_tiles.copy()
+        copy.zobrist_hash = self.zobrist_hash
+        copy.friendly_living_armies = self.friendly_living_armies.copy()
+        copy.enemy_living_armies = self.enemy_living_armies.copy()
+        if noKeys:
+            copy.friendly_living_armies_l = None
+            copy.enemy_living_armies_l = None
+        else:
+            copy.friendly_living_armies_l = list(copy.friendly_living_armies.keys())
+            copy.enemy_living_armies_l = list(copy.enemy_living_armies.keys())
         copy.tile_differential = self.tile_differential
         copy.city_differential = self.city_differential
         copy.captures_enemy = self.captures_enemy
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import typing
+
+
+class TranspositionTable(object):
+    """
+    Bounded map from ArmySimState.get_transposition_key() to search results, so that different move orders reaching
+    the same board state share the work done below it.
+    Each entry remembers the remaining search depth it was computed with; a store never replaces a deeper entry,
+    and when full the oldest entry is evicted.
+    """
+
+    def __init__(self, maxEntries: int = 50000):
+        self.max_entries: int = maxEntries
+
+        self._entries: typing.Dict[typing.Hashable, typing.Tuple[int, typing.Any]] = {}
+
+        self.lookups: int = 0
+        self.hits: int = 0
+        self.stores: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: typing.Hashable, minDepth: int = 0) -> typing.Any | None:
+        """
+        Returns the cached value for key if one exists that was searched at least minDepth deep, otherwise None.
+
+        @param key:
+        @param minDepth: the remaining search depth the caller needs the cached result to cover.
+        @return:
+        """
+        self.lookups += 1
+        entry = self._entries.get(key, None)
+        if entry is None or entry[0] < minDepth:
+            return None
+
+        self.hits += 1
+        return entry[1]
+
+    def store(self, key: typing.Hashable, value: typing.Any, depth: int = 0) -> bool:
+        """
+        Stores value under key unless a deeper-searched entry is already present.
+
+        @param key:
+        @param value:
+        @param depth: the remaining search depth value was computed with.
+        @return: True if the value was stored.
+        """
+        existing = self._entries.get(key, None)
+        if existing is not None:
+            if existing[0] > depth:
+                return False
+        elif len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+            self.evictions += 1
+
+        self._entries[key] = (depth, value)
+        self.stores += 1
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        if self.lookups == 0:
+            return 0.0
+        return self.hits / self.lookups
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return f'TT {len(self._entries)}/{self.max_entries} entries, {self.hits}/{self.lookups} hits ({self.hit_rate:.1%}), {self.evictions} evicted'
+
+    def __repr__(self):
+        return str(self)
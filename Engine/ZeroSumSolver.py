@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import typing
+
+import numpy
+from scipy.optimize import linprog
+
+
+class ZeroSumSolution(object):
+    def __init__(self, rowStrategy: numpy.ndarray, colStrategy: numpy.ndarray, value: float):
+        self.row_strategy: numpy.ndarray = rowStrategy
+        """The maximizing row player's equilibrium mixed strategy, over all the original rows."""
+
+        self.col_strategy: numpy.ndarray = colStrategy
+        """The minimizing column player's equilibrium mixed strategy, over all the original columns."""
+
+        self.value: float = value
+        """The expected row player payoff at equilibrium."""
+
+    def __str__(self):
+        return f'v{self.value:.2f} rows {numpy.round(self.row_strategy, 3)} cols {numpy.round(self.col_strategy, 3)}'
+
+
+class ZeroSumSolver(object):
+    """
+    Solves two player zero-sum matrix games, where the row player gets the payoff and the column player gets its
+    negation, the shape of every ArmyEngine payoff matrix. Dominated rows / columns are pruned first, pure saddle points
+    are returned without solving anything, and the rest are solved as the standard maximin linear program.
+    Solutions are memoized by the payoff matrix contents, so clear() it between searches.
+    """
+
+    def __init__(self, maxCacheEntries: int = 10000):
+        self.max_cache_entries: int = maxCacheEntries
+        self._cache: typing.Dict[typing.Tuple[typing.Tuple[int, ...], bytes], ZeroSumSolution] = {}
+
+        self.solves: int = 0
+        self.cache_hits: int = 0
+        self.saddle_points: int = 0
+        self.linear_programs: int = 0
+
+    def clear(self):
+        self._cache.clear()
+        self.solves = 0
+        self.cache_hits = 0
+        self.saddle_points = 0
+        self.linear_programs = 0
+
+    def solve(self, payoffs: numpy.ndarray) -> ZeroSumSolution:
+        """
+        @param payoffs: the row player's payoffs, rows x columns.
+        @return: an equilibrium of the game.
+        """
+        self.solves += 1
+        payoffs = numpy.ascontiguousarray(payoffs, dtype=numpy.float64)
+        key = (payoffs.shape, payoffs.tobytes())
+        cached = self._cache.get(key, None)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        solution = self._solve_uncached(payoffs)
+
+        if len(self._cache) >= self.max_cache_entries:
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = solution
+        return solution
+
+    def _solve_uncached(self, payoffs: numpy.ndarray) -> ZeroSumSolution:
+        numRows, numCols = payoffs.shape
+        rowStrategy = numpy.zeros(numRows)
+        colStrategy = numpy.zeros(numCols)
+
+        rowMins = payoffs.min(axis=1)
+        colMaxes = payoffs.max(axis=0)
+        bestRow = int(numpy.argmax(rowMins))
+        bestCol = int(numpy.argmin(colMaxes))
+        if rowMins[bestRow] == colMaxes[bestCol]:
+            self.saddle_points += 1
+            rowStrategy[bestRow] = 1.0
+            colStrategy[bestCol] = 1.0
+            return ZeroSumSolution(rowStrategy, colStrategy, float(rowMins[bestRow]))
+
+        rows, cols = prune_dominated(payoffs)
+        reduced = payoffs[numpy.ix_(rows, cols)]
+        reducedRows, reducedCols, value = self._solve_linear_program(reduced)
+        rowStrategy[rows] = reducedRows
+        colStrategy[cols] = reducedCols
+        return ZeroSumSolution(rowStrategy, colStrategy, value)
+
+    def _solve_linear_program(self, payoffs: numpy.ndarray) -> typing.Tuple[numpy.ndarray, numpy.ndarray, float]:
+        """
+        maximize v subject to (payoffs^T x)_j >= v for every column j, sum(x) = 1, x >= 0.
+        The column strategy is the dual of the column constraints.
+        """
+        self.linear_programs += 1
+        numRows, numCols = payoffs.shape
+
+        # variables are [x_0 .. x_n-1, v]; linprog minimizes, so minimize -v.
+        objective = numpy.zeros(numRows + 1)
+        objective[-1] = -1.0
+
+        upperBoundsA = numpy.hstack([-payoffs.T, numpy.ones((numCols, 1))])
+        upperBoundsB = numpy.zeros(numCols)
+        equalityA = numpy.ones((1, numRows + 1))
+        equalityA[0, -1] = 0.0
+        equalityB = numpy.ones(1)
+        bounds = [(0.0, None)] * numRows + [(None, None)]
+
+        result = linprog(objective, A_ub=upperBoundsA, b_ub=upperBoundsB, A_eq=equalityA, b_eq=equalityB, bounds=bounds, method='highs')
+        if not result.success:
+            raise AssertionError(f'zero sum LP failed: {result.message}')
+
+        rowStrategy = numpy.clip(result.x[:-1], 0.0, None)
+        rowStrategy /= rowStrategy.sum()
+        colStrategy = numpy.clip(-result.ineqlin.marginals, 0.0, None)
+        colSum = colStrategy.sum()
+        if colSum > 0.0:
+            colStrategy /= colSum
+        else:
+            colStrategy[:] = 1.0 / numCols
+
+        return rowStrategy, colStrategy, float(result.x[-1])
+
+
+def prune_dominated(payoffs: numpy.ndarray) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Iteratively removes weakly dominated rows (for the maximizing row player) and columns (for the minimizing column
+    player). At least one equilibrium of the original game, and its value, survives. Of identical rows / columns the
+    first is kept.
+
+    @param payoffs:
+    @return: the indexes of the remaining rows and columns.
+    """
+    rows = list(range(payoffs.shape[0]))
+    cols = list(range(payoffs.shape[1]))
+
+    changed = True
+    while changed:
+        changed = False
+
+        sub = payoffs[numpy.ix_(rows, cols)]
+        keptRows = []
+        for i in range(len(rows)):
+            dominated = False
+            for k in range(len(rows)):
+                if k == i:
+                    continue
+                if numpy.all(sub[k] >= sub[i]) and (numpy.any(sub[k] > sub[i]) or k < i):
+                    dominated = True
+                    break
+            if not dominated:
+                keptRows.append(rows[i])
+        if len(keptRows) < len(rows):
+            rows = keptRows
+            changed = True
+
+        sub = payoffs[numpy.ix_(rows, cols)]
+        keptCols = []
+        for j in range(len(cols)):
+            dominated = False
+            for k in range(len(cols)):
+                if k == j:
+                    continue
+                if numpy.all(sub[:, k] <= sub[:, j]) and (numpy.any(sub[:, k] < sub[:, j]) or k < j):
+                    dominated = True
+                    break
+            if not dominated:
+                keptCols.append(cols[j])
+        if len(keptCols) < len(cols):
+            cols = keptCols
+            changed = True
+
+    return numpy.array(rows, dtype=numpy.int64), numpy.array(cols, dtype=numpy.int64)
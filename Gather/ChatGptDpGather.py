@@ -2,6 +2,8 @@ import time
 import typing
 
 import logbook
+import numpy as np
+from numba import jit
 
 from .GatherCapturePlan import *
 from .GatherDebug import USE_DEBUG_LOGGING, USE_DEBUG_ASSERTS, assertConnected
@@ -13,6 +15,201 @@ from base.client.tile import Tile
 import heapq
 
 
+@jit(nopython=True, cache=True)
+def _heap_less(counts, prios, armies, a: int, b: int) -> bool:
+    """Tuple style (count, prio, army) ordering, matching the old (count, prio, Tile) heap entries."""
+    if counts[a] != counts[b]:
+        return counts[a] < counts[b]
+    if prios[a] != prios[b]:
+        return prios[a] < prios[b]
+    return armies[a] < armies[b]
+
+
+@jit(nopython=True, cache=True)
+def _heap_swap(counts, prios, armies, tiles, a: int, b: int):
+    counts[a], counts[b] = counts[b], counts[a]
+    prios[a], prios[b] = prios[b], prios[a]
+    armies[a], armies[b] = armies[b], armies[a]
+    tiles[a], tiles[b] = tiles[b], tiles[a]
+
+
+@jit(nopython=True, cache=True)
+def _heap_sift_down(counts, prios, armies, tiles, startPos: int, pos: int):
+    """Same as heapq._siftdown, so pop order (including ties) matches the original heapq implementation."""
+    while pos > startPos:
+        parentPos = (pos - 1) >> 1
+        if _heap_less(counts, prios, armies, pos, parentPos):
+            _heap_swap(counts, prios, armies, tiles, pos, parentPos)
+            pos = parentPos
+            continue
+        break
+
+
+@jit(nopython=True, cache=True)
+def _heap_sift_up(counts, prios, armies, tiles, size: int, pos: int):
+    """Same as heapq._siftup."""
+    startPos = pos
+    childPos = 2 * pos + 1
+    while childPos < size:
+        rightPos = childPos + 1
+        if rightPos < size and not _heap_less(counts, prios, armies, childPos, rightPos):
+            childPos = rightPos
+        _heap_swap(counts, prios, armies, tiles, pos, childPos)
+        pos = childPos
+        childPos = 2 * pos + 1
+    _heap_sift_down(counts, prios, armies, tiles, startPos, pos)
+
+
+@jit(nopython=True, cache=True)
+def _dp_gather_kernel(
+        adjacency: np.ndarray,
+        values: np.ndarray,
+        armies: np.ndarray,
+        included: np.ndarray,
+        outerOrder: np.ndarray,
+        dpValues: np.ndarray,
+        dpLabels: np.ndarray,
+        labelTiles: np.ndarray,
+        labelParents: np.ndarray,
+        labelCount: int,
+        nodeCount: int,
+):
+    """
+    The max-plus relaxation core of cutesy_chatgpt_gather.
+
+    Instead of copying a Set[Tile] per dp slot, each slot holds a label id. A label is a (tile, parentLabel) backpointer,
+    and labels are never mutated once written, so overwriting a dp slot never corrupts the chains other slots point at.
+
+    @param adjacency: [numTiles, maxDegree] movable neighbor tile_indexes, padded with -1.
+    @param values: per tile_index values (roots already boosted).
+    @param armies: per tile_index army, used only as the heap tiebreaker like the old Tile.__lt__.
+    @param included: per tile_index bool mask of tiles that have a dp row.
+    @param outerOrder: the tile_indexes in the order the outer priority queue would pop them.
+    @param dpValues: [numTiles, nodeCount + 1] dp values, pre-initialized.
+    @param dpLabels: [numTiles, nodeCount + 1] dp backpointer label ids, -1 for no set.
+    @param labelTiles: label id -> tile_index. Grown (and returned) as needed.
+    @param labelParents: label id -> parent label id or -1.
+    @param labelCount: number of labels already in use.
+    @param nodeCount: max nodes per set.
+    @return: (labelTiles, labelParents, labelCount)
+    """
+    numTiles = values.shape[0]
+    maxDegree = adjacency.shape[1]
+    visited = np.zeros(numTiles, dtype=np.bool_)
+    stamps = np.zeros(numTiles, dtype=np.int64)
+    stamp = 0
+
+    heapCap = 64
+    hCounts = np.empty(heapCap, dtype=np.int64)
+    hPrios = np.empty(heapCap, dtype=np.float64)
+    hArmies = np.empty(heapCap, dtype=np.int64)
+    hTiles = np.empty(heapCap, dtype=np.int64)
+
+    for outerIdx in range(outerOrder.shape[0]):
+        outerTile = outerOrder[outerIdx]
+        hCounts[0] = 1
+        hPrios[0] = 0.0
+        hArmies[0] = armies[outerTile]
+        hTiles[0] = outerTile
+        heapSize = 1
+
+        while heapSize > 0:
+            # heappop
+            heapSize -= 1
+            if heapSize > 0:
+                _heap_swap(hCounts, hPrios, hArmies, hTiles, 0, heapSize)
+                _heap_sift_up(hCounts, hPrios, hArmies, hTiles, heapSize, 0)
+            count = hCounts[heapSize]
+            tileIdx = hTiles[heapSize]
+
+            if count >= nodeCount:
+                continue
+
+            sourceVal = dpValues[tileIdx, count]
+            curLabel = dpLabels[tileIdx, count]
+
+            stamp += 1
+            label = curLabel
+            while label >= 0:
+                stamps[labelTiles[label]] = stamp
+                label = labelParents[label]
+
+            nextCount = count + 1
+            for adjIdx in range(maxDegree):
+                neighbor = adjacency[tileIdx, adjIdx]
+                if neighbor < 0:
+                    break
+                if not included[neighbor] or stamps[neighbor] == stamp or visited[neighbor]:
+                    continue
+
+                nVal = values[neighbor]
+                newValue = sourceVal + nVal
+                if newValue > dpValues[neighbor, nextCount]:
+                    dpValues[neighbor, nextCount] = newValue
+
+                    if labelCount == labelTiles.shape[0]:
+                        newTiles = np.empty(labelCount * 2, dtype=np.int64)
+                        newTiles[:labelCount] = labelTiles
+                        labelTiles = newTiles
+                        newParents = np.empty(labelCount * 2, dtype=np.int64)
+                        newParents[:labelCount] = labelParents
+                        labelParents = newParents
+                    labelTiles[labelCount] = neighbor
+                    labelParents[labelCount] = curLabel
+                    dpLabels[neighbor, nextCount] = labelCount
+                    labelCount += 1
+
+                    if heapSize == hCounts.shape[0]:
+                        heapCap = heapSize * 2
+                        newCounts = np.empty(heapCap, dtype=np.int64)
+                        newCounts[:heapSize] = hCounts
+                        hCounts = newCounts
+                        newPrios = np.empty(heapCap, dtype=np.float64)
+                        newPrios[:heapSize] = hPrios
+                        hPrios = newPrios
+                        newArmies = np.empty(heapCap, dtype=np.int64)
+                        newArmies[:heapSize] = hArmies
+                        hArmies = newArmies
+                        newHeapTiles = np.empty(heapCap, dtype=np.int64)
+                        newHeapTiles[:heapSize] = hTiles
+                        hTiles = newHeapTiles
+
+                    # heappush
+                    hCounts[heapSize] = nextCount
+                    hPrios[heapSize] = -nVal
+                    hArmies[heapSize] = armies[neighbor]
+                    hTiles[heapSize] = neighbor
+                    heapSize += 1
+                    _heap_sift_down(hCounts, hPrios, hArmies, hTiles, 0, heapSize - 1)
+
+        visited[outerTile] = True
+
+    return labelTiles, labelParents, labelCount
+
+
+def _build_movable_adjacency(map: MapBase) -> np.ndarray:
+    numTiles = len(map.tiles_by_index)
+    maxDegree = 1
+    for tile in map.tiles_by_index:
+        maxDegree = max(maxDegree, len(tile.movable))
+    adjacency = np.full((numTiles, maxDegree), -1, dtype=np.int64)
+    for tile in map.tiles_by_index:
+        for i, movable in enumerate(tile.movable):
+            adjacency[tile.tile_index, i] = movable.tile_index
+
+    return adjacency
+
+
+def _label_chain_to_set(map: MapBase, labelTiles: np.ndarray, labelParents: np.ndarray, label: int) -> typing.Set[Tile] | None:
+    if label < 0:
+        return None
+    tiles = set()
+    while label >= 0:
+        tiles.add(map.tiles_by_index[labelTiles[label]])
+        label = labelParents[label]
+    return tiles
+
+
 # TODO THIS IS CHATGPT CODE FROM https://chatgpt.com/g/g-3w1rEXGE0-web-browser/c/4fe68032-e88c-4057-a329-d37a42df465b
 def cutesy_chatgpt_gather(
         map: MapBase,
@@ -24,6 +221,11 @@ def cutesy_chatgpt_gather(
         negativeTiles: TileSet | None = None,
         viewInfo: ViewInfo | None = None,
 ) -> typing.Tuple[float, typing.Set[Tile]]:
+    """
+    DP over (tile, nodeCount) where the dp is a 2d value array plus backpointer labels instead of a set per slot,
+    with the max-plus relaxation compiled via numba (_dp_gather_kernel). Produces the same output as the original
+    set-copying implementation (same pop order / tiebreaks).
+    """
     if tilesToInclude is None:
         tilesToInclude = map.pathable_tiles
     else:
@@ -36,7 +238,6 @@ def cutesy_chatgpt_gather(
     if USE_DEBUG_ASSERTS:
         assertConnected(tilesToInclude.union(rootTiles))
 
-    useFullSearch = len(tilesToInclude) < 100
     useFullSearch = False
 
     rootCount = len(rootTiles)
@@ -44,29 +245,50 @@ def cutesy_chatgpt_gather(
 
     start = time.perf_counter()
 
-    # DP table to store the best values for k nodes starting from a given node
-    dpValues: MapMatrixInterface[typing.List[float]] = MapMatrix(map)
-    dpBestSets: MapMatrixInterface[typing.List[typing.Set[Tile] | None]] = MapMatrix(map)
+    numTiles = len(map.tiles_by_index)
     dpSize = nodeCount + 1
+
+    # values with the root bonus applied, so we no longer mutate the callers valueMatrix.
+    values = np.zeros(numTiles, dtype=np.float64)
+    armies = np.zeros(numTiles, dtype=np.int64)
+    included = np.zeros(numTiles, dtype=np.bool_)
     for tile in tilesToInclude:
-        dpValues.raw[tile.tile_index] = [0.0] * dpSize
-        dpBestSets.raw[tile.tile_index] = [None] * dpSize
+        values[tile.tile_index] = valueMatrix.raw[tile.tile_index]
+        armies[tile.tile_index] = tile.army
+        included[tile.tile_index] = True
+    for tile in rootTiles:
+        values[tile.tile_index] = valueMatrix.raw[tile.tile_index] + 1000
+        armies[tile.tile_index] = tile.army
+        included[tile.tile_index] = True
 
-    rootSet = set(rootTiles)
-    # if rootCount > nodeCount:
-    #     raise Exception("Error: K is less than the number of root nodes")
+    # DP table to store the best values for k nodes starting from a given node
+    dpValues = np.zeros((numTiles, dpSize), dtype=np.float64)
+    dpLabels = np.full((numTiles, dpSize), -1, dtype=np.int64)
 
-    # Priority queue to explore nodes by value, max-heap
+    labelCap = max(64, 4 * len(tilesToInclude) + rootCount)
+    labelTiles = np.empty(labelCap, dtype=np.int64)
+    labelParents = np.empty(labelCap, dtype=np.int64)
+    labelCount = 0
+
+    # the shared root set chain
+    rootSetLabel = -1
+    for tile in rootTiles:
+        labelTiles[labelCount] = tile.tile_index
+        labelParents[labelCount] = rootSetLabel
+        rootSetLabel = labelCount
+        labelCount += 1
+
+    # Priority queue to explore nodes by value, max-heap. Only used to determine the outer iteration order.
     pq = []
 
-    # rootSum = sum(valueMatrix.raw[tile.tile_index] for tile in rootTiles)
     for tile in rootTiles:
-        valueMatrix.raw[tile.tile_index] += 1000
-        # dpValues.raw[tile.tile_index][rootCount] = rootSum
-        dpValues.raw[tile.tile_index][rootCount] = 1000
-        dpBestSets.raw[tile.tile_index][rootCount] = rootSet
-        dpValues.raw[tile.tile_index][1] = 1000
-        dpBestSets.raw[tile.tile_index][1] = {tile}
+        dpValues[tile.tile_index, rootCount] = 1000
+        dpLabels[tile.tile_index, rootCount] = rootSetLabel
+        dpValues[tile.tile_index, 1] = 1000
+        labelTiles[labelCount] = tile.tile_index
+        labelParents[labelCount] = -1
+        dpLabels[tile.tile_index, 1] = labelCount
+        labelCount += 1
         # force rootnode eval first (?)
         heapq.heappush(pq, (-100000000, tile))
 
@@ -74,183 +296,113 @@ def cutesy_chatgpt_gather(
         if tile in rootTiles:
             continue
         value = valueMatrix.raw[tile.tile_index]
-        # if useFullSearch:
-        #     heapq.heappush(pq, (value, tile))
-        # else:
         heapq.heappush(pq, (-value, tile))
         # Initialize the DP table with single node values
-        dpValues.raw[tile.tile_index][1] = value
-        dpBestSets.raw[tile.tile_index][1] = {tile}
-
-    # Perform the DP and priority search
-    maxValue = 0
-    maxSet = None
-    visited: MapMatrixSet = MapMatrixSet(map)
-    visCount = 0
-    internalQueue: typing.List[typing.Tuple[float, int, Tile]] = []
-    # internalQueue: typing.Deque[typing.Tuple[Tile, int]] = deque()
-    # internalQueue: typing.Deque[typing.Tuple[Tile, int, typing.Set[Tile]]] = deque()
-
-    # internalVisited = set()
-
-    # TODO connected adjacency prunable structure for any searches like this where we have a set of good tiles and visit tiles permanently pulling them out of the available pool. Would allow us to not skip visited neighbors in a loop constantly?
-    #  MapMatrix[Set[Tile]] and visiting something removes it from the set? Hell the same structure could also track the visitedness of a node at the same time, too so we have just one structure for both is visited and tracking neighbors?
-
-    # for tile in tilesToInclude:
-    while pq:  #  and visCount < nodeCount    chatgpt did not have this, and rightly so, this outer loop isn't whats choosing the nodes in the set...
-        value, tile = heapq.heappop(pq)
-        value = -value
-        # No reason to check visited; we dont ever add anything extra to the outer queue. It is literally just for looping the tiles from greatest bonus to worst bonus.
-        # if visited.raw[tile.tile_index]:
-        #     continue
-
-        # TODO this should be priorityQueue 99.9% sure. We are DFSing randomly through the rest of the map tiles to explore here otherwise.
-        if useFullSearch:
-            heapq.heappush(internalQueue, (-1, 0.0, tile))
-        else:
-            heapq.heappush(internalQueue, (1, 0.0, tile))
-        # internalQueue.append((tile, 1))
-        # internalQueue.append((tile, 1, set()))
-        # Use BFS to explore neighbors and update DP table
-        # internalVisited.clear()
-        while internalQueue:
-            count, prio, internalTile = heapq.heappop(internalQueue)
-            if useFullSearch:
-                count = -count
-            # count = -count
-            # internalTile, count, internalVisited = internalQueue.popleft()
-            # internalTile, count = internalQueue.popleft()
-            if count >= nodeCount:
-                continue
-
-            sourceVal = dpValues.raw[internalTile.tile_index][count]
-            curSet = dpBestSets.raw[internalTile.tile_index][count]
-
-            for neighbor in internalTile.movable:
-                nNodeDp = dpValues.raw[neighbor.tile_index]
-                if nNodeDp is None:  #
-                    continue
-
-                # if curSet is None:
-                #     raise Exception(f'curSet null at depth {count} for {internalTile} ???')
-
-                if neighbor in curSet:
-                    continue
-
-                # if visited.raw[neighbor.tile_index]:
-                #     continue
-
-            #     openSet.add(neighbor)
-            #
-            # for neighbor in openSet:
-                if visited.raw[neighbor.tile_index]:
-                    continue
-
-                nNodeDp = dpValues.raw[neighbor.tile_index]
-                nVal = valueMatrix.raw[neighbor.tile_index]
-                newValue = sourceVal + nVal
-                nextCount = count + 1
-                if newValue > nNodeDp[nextCount]:
-                    nNodeDp[nextCount] = newValue
-
-                    nextSet = curSet.copy()
-                    nextSet.add(neighbor)
-                    dpBestSets.raw[neighbor.tile_index][nextCount] = nextSet
-
-                    # internalQueue.append((neighbor, nextCount))
-                    if useFullSearch:
-                        heapq.heappush(internalQueue, (-nextCount, nVal, neighbor))
-                    else:
-                        heapq.heappush(internalQueue, (nextCount, -nVal, neighbor))
-
-        visited.raw[tile.tile_index] = True
-        visCount += 1
-
-        if viewInfo:
-            viewInfo.bottomMidRightGridText.raw[tile.tile_index] = f'v{visCount}'
+        dpValues[tile.tile_index, 1] = value
+        labelTiles[labelCount] = tile.tile_index
+        labelParents[labelCount] = -1
+        dpLabels[tile.tile_index, 1] = labelCount
+        labelCount += 1
+
+    outerOrder = np.empty(len(pq), dtype=np.int64)
+    i = 0
+    while pq:
+        _, tile = heapq.heappop(pq)
+        outerOrder[i] = tile.tile_index
+        i += 1
+
+    labelTiles, labelParents, labelCount = _dp_gather_kernel(
+        _build_movable_adjacency(map),
+        values,
+        armies,
+        included,
+        outerOrder,
+        dpValues,
+        dpLabels,
+        labelTiles,
+        labelParents,
+        labelCount,
+        nodeCount)
 
     timeTaken = time.perf_counter() - start
 
-    for tile in rootTiles:
-        valueMatrix.raw[tile.tile_index] -= 1000
+    if viewInfo:
+        for visCount, tileIdx in enumerate(outerOrder):
+            viewInfo.bottomMidRightGridText.raw[tileIdx] = f'v{visCount + 1}'
 
-    for tile in tilesToInclude:
-        # Update the maximum value found for exactly K nodes
-        tileDpVals = dpValues.raw[tile.tile_index]
-        maxIdx = 0
-        tileMax = -100
-        thisSet = None
-        for i in range(nodeCount - 2, nodeCount + 1):
-            val = tileDpVals[i]
-            thisSet = dpBestSets.raw[tile.tile_index][i]
-
-            if val > tileMax:
-                tileMax = val
-                maxIdx = i
+    # Update the maximum value found for exactly K nodes, out of the last 3 node counts (same window as before, including
+    # python style negative indexing for tiny nodeCounts).
+    window = np.arange(nodeCount - 2, nodeCount + 1)
+    windowVals = dpValues[:, window]
+    windowMaxPos = np.argmax(windowVals, axis=1)
+    windowMax = windowVals[np.arange(numTiles), windowMaxPos]
+    # the set of the LAST index in the window is what gets checked for root containment.
+    lastLabels = dpLabels[:, window[-1]]
 
-                if viewInfo:
-                    viewInfo.bottomRightGridText.raw[tile.tile_index] = f'{tileMax:.1f}'
-                    viewInfo.midRightGridText.raw[tile.tile_index] = f'{valueMatrix.raw[tile.tile_index]:.1f}'
-                    viewInfo.bottomLeftGridText.raw[tile.tile_index] = f'i{maxIdx}'
-                    if thisSet:
-                        viewInfo.bottomMidLeftGridText.raw[tile.tile_index] = f'c{len(thisSet)}'
-
-        if thisSet is None:
+    rootIndexes = [t.tile_index for t in rootTiles]
+    maxValue = 0
+    maxSet = None
+    stamps = np.zeros(numTiles, dtype=np.int64)
+    stamp = 0
+    for tile in tilesToInclude:
+        tileIdx = tile.tile_index
+        tileMax = windowMax[tileIdx]
+        maxIdx = int(window[windowMaxPos[tileIdx]])
+        if tileMax <= -100:
+            tileMax = -100
+            maxIdx = 0
+
+        if viewInfo and tileMax > -100:
+            viewInfo.bottomRightGridText.raw[tileIdx] = f'{tileMax:.1f}'
+            viewInfo.midRightGridText.raw[tileIdx] = f'{valueMatrix.raw[tileIdx]:.1f}'
+            viewInfo.bottomLeftGridText.raw[tileIdx] = f'i{maxIdx}'
+            label = dpLabels[tileIdx, maxIdx]
+            if label >= 0:
+                setLen = 0
+                while label >= 0:
+                    setLen += 1
+                    label = labelParents[label]
+                viewInfo.bottomMidLeftGridText.raw[tileIdx] = f'c{setLen}'
+
+        label = lastLabels[tileIdx]
+        if label < 0:
             logbook.info(f'skipping tile {tile} because none thisSet??')
             continue
 
-        containsRoot = rootTiles.issubset(thisSet)
+        stamp += 1
+        while label >= 0:
+            stamps[labelTiles[label]] = stamp
+            label = labelParents[label]
+        containsRoot = True
+        for rootIdx in rootIndexes:
+            if stamps[rootIdx] != stamp:
+                containsRoot = False
+                break
         if not containsRoot:
             logbook.info(f'skipping tile {tile} because fails to contain the root')
             continue
 
         if tileMax > maxValue:
-            newMaxSet = dpBestSets.raw[tile.tile_index][maxIdx]
+            newMaxSet = _label_chain_to_set(map, labelTiles, labelParents, dpLabels[tileIdx, maxIdx])
             logbook.info(f'found new max {tileMax:.2f} at {tile} (index {maxIdx})')
-            logbook.info(f'     its set len {len(newMaxSet)}: {newMaxSet}')
-            maxValue = tileMax
+            logbook.info(f'     its set len {len(newMaxSet) if newMaxSet else 0}: {newMaxSet}')
+            maxValue = float(tileMax)
             maxSet = newMaxSet
 
-        # # Update the maximum value found for exactly K nodes
-        # tileDpVals = dpValues.raw[tile.tile_index]
-        # maxIdx = 0
-        # tileMax = -100
-        # for index in range(dpSize):
-        #     val = tileDpVals[index]
-        #     if val > tileMax:
-        #         tileMax = val
-        #         maxIdx = index
-        #
-        # if tileMax > maxValue:
-        #     newMaxSet = dpBestSets.raw[tile.tile_index][maxIdx]
-        #     logbook.info(f'found new max {tileMax:.2f} at {tile} (index {maxIdx})')
-        #     logbook.info(f'     its set len {len(newMaxSet)}: {newMaxSet}')
-        #     maxValue = tileMax
-        #     maxSet = newMaxSet
-        #
-        # if viewInfo:
-        #     viewInfo.bottomRightGridText.raw[tile.tile_index] = f'{tileMax:.1f}'
-        #     viewInfo.midRightGridText.raw[tile.tile_index] = f'{valueMatrix.raw[tile.tile_index]:.1f}'
-        #     viewInfo.bottomLeftGridText.raw[tile.tile_index] = f'i{maxIdx}'
-        #     thisSet = dpBestSets.raw[tile.tile_index][maxIdx]
-        #     if thisSet:
-        #         viewInfo.bottomMidLeftGridText.raw[tile.tile_index] = f'c{len(thisSet)}'
-
-    for tile in rootTiles:
-        tileDpVals = dpValues.raw[tile.tile_index]
-        tileDpSets = dpBestSets.raw[tile.tile_index]
-        logbook.info(f'rootTile {tile}:')
-        for idx in range(dpSize):
-            value = tileDpVals[idx]
-            bestSet = tileDpSets[idx]
+    if USE_DEBUG_LOGGING:
+        for tile in rootTiles:
+            logbook.info(f'rootTile {tile}:')
+            for idx in range(dpSize):
+                value = dpValues[tile.tile_index, idx]
+                bestSet = _label_chain_to_set(map, labelTiles, labelParents, dpLabels[tile.tile_index, idx])
 
-            tilesInf = "NONE"
-            if bestSet:
-                tilesInf = f'{len(bestSet)}  {" | ".join([str(t) for t in bestSet])}'
+                tilesInf = "NONE"
+                if bestSet:
+                    tilesInf = f'{len(bestSet)}  {" | ".join([str(t) for t in bestSet])}'
 
-            logbook.info(f'    {idx} val {value:.2f}  tiles {tilesInf}')
+                logbook.info(f'    {idx} val {value:.2f}  tiles {tilesInf}')
 
-    logbook.info(f'Crazy chatGpt fullSearch {useFullSearch} dynamic programming gather in iter {timeTaken:.5f}s full {time.perf_counter() - start:.5f}s with {len(maxSet)} tiles and value {maxValue}')
+    logbook.info(f'Crazy chatGpt fullSearch {useFullSearch} dynamic programming gather in iter {timeTaken:.5f}s full {time.perf_counter() - start:.5f}s with {len(maxSet) if maxSet else 0} tiles and value {maxValue} ({labelCount} dp labels)')
     logbook.info(f'Crazy chatGpt output tiles: {maxSet}')
     return maxValue, maxSet
 
@@ -4,6 +4,7 @@ import typing
 import logbook
 
 from .GatherCapturePlan import *
+from .ChatGptDpGather import cutesy_chatgpt_gather
 from .GatherDebug import USE_DEBUG_LOGGING, USE_DEBUG_ASSERTS, assertConnected
 from Interfaces import TileSet, MapMatrixInterface
 from MapMatrix import MapMatrix, MapMatrixSet
@@ -11,6 +12,229 @@ from ViewInfo import ViewInfo
 from base.client.map import MapBase
 from base.client.tile import Tile
 import heapq
+from collections import deque
+
+
+EXACT_GATHER_CACHE_MAX_ENTRIES: int = 2000
+"""Max proven-optimal results kept in the memo before it is flushed."""
+
+_exactGatherCache: typing.Dict[tuple, typing.Tuple[float, typing.FrozenSet[int]]] = {}
+
+
+class ExactSteinerGatherStats(object):
+    def __init__(self):
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.nodes_searched: int = 0
+        self.timeouts: int = 0
+
+    def __str__(self):
+        return f'hits {self.cache_hits}, misses {self.cache_misses}, nodes {self.nodes_searched}, timeouts {self.timeouts}'
+
+
+exactGatherStats: ExactSteinerGatherStats = ExactSteinerGatherStats()
+
+
+def clear_exact_steiner_gather_cache():
+    _exactGatherCache.clear()
+
+
+def _is_connected_tile_indexes(map: MapBase, tileIndexes: typing.List[int]) -> bool:
+    if len(tileIndexes) <= 1:
+        return True
+    members = set(tileIndexes)
+    visited = {tileIndexes[0]}
+    q = deque()
+    q.append(tileIndexes[0])
+    while q:
+        tileIdx = q.popleft()
+        for mv in map.tiles_by_index[tileIdx].movable:
+            if mv.tile_index in members and mv.tile_index not in visited:
+                visited.add(mv.tile_index)
+                q.append(mv.tile_index)
+
+    return len(visited) == len(members)
+
+
+def find_exact_best_steiner_gather(
+        map: MapBase,
+        targetTurns: int,
+        rootTiles: typing.Set[Tile],
+        searchingPlayer: int,
+        valueMatrix: MapMatrixInterface[float],
+        tilesToInclude: typing.Set[Tile] | None = None,
+        negativeTiles: TileSet | None = None,
+        timeLimit: float = 0.3,
+        useHeuristicIncumbent: bool = True,
+        useCache: bool = True,
+) -> typing.Tuple[float, typing.Set[Tile] | None, bool]:
+    """
+    Exact (bounded) best connected gather set containing all rootTiles, using at most targetTurns non-root tiles.
+    The objective matches recalculate_tree_values_from_matrix: every non-root tile is worth its valueMatrix value
+    (0 for negativeTiles) minus the 1 army left behind on it, and the roots are worth nothing.
+
+    Branch and bound over connected supersets of the roots; every connected set is enumerated exactly once by
+    including frontier tiles in order and banning each tile for the remaining siblings once its include branch is done.
+    The upper bound is the current value plus the best remaining-turns positive tile values that are neither in the set
+    nor banned (after dropping everything further than targetTurns from the roots), and the incumbent is seeded with the
+    heuristic dp gather so that bound bites from the start.
+
+    Proven-optimal results are memoized on the canonical (map dims, turns, roots, (tile, value) pairs) key.
+
+    @param map:
+    @param targetTurns: max number of non-root tiles in the set.
+    @param rootTiles:
+    @param searchingPlayer:
+    @param valueMatrix:
+    @param tilesToInclude: the tiles the set may use, defaults to all pathable tiles.
+    @param negativeTiles: tiles that are worth nothing when included.
+    @param timeLimit: seconds. When exceeded, the best set found so far is returned and flagged as not proven optimal.
+    @param useHeuristicIncumbent: seed the incumbent with cutesy_chatgpt_gather.
+    @param useCache:
+    @return: (value, tiles including the roots, provedOptimal). tiles is None if no connected set containing the roots exists.
+    """
+    start = time.perf_counter()
+    cutoffTime = start + timeLimit
+
+    if tilesToInclude is None:
+        tilesToInclude = map.pathable_tiles
+
+    rootIndexes = sorted(t.tile_index for t in rootTiles)
+    isRoot = set(rootIndexes)
+
+    # drop everything that cannot be reached within targetTurns of the roots through the allowed tiles.
+    allowed: typing.Dict[int, int] = {idx: 0 for idx in rootIndexes}
+    q = deque(rootIndexes)
+    while q:
+        tileIdx = q.popleft()
+        dist = allowed[tileIdx]
+        if dist >= targetTurns:
+            continue
+        for mv in map.tiles_by_index[tileIdx].movable:
+            if mv.tile_index in allowed or mv not in tilesToInclude:
+                continue
+            allowed[mv.tile_index] = dist + 1
+            q.append(mv.tile_index)
+
+    weights: typing.Dict[int, float] = {}
+    for tileIdx in allowed:
+        if tileIdx in isRoot:
+            weights[tileIdx] = 0.0
+        elif negativeTiles is not None and map.tiles_by_index[tileIdx] in negativeTiles:
+            weights[tileIdx] = -1.0
+        else:
+            weights[tileIdx] = valueMatrix.raw[tileIdx] - 1.0
+
+    cacheKey = None
+    if useCache:
+        cacheKey = (map.cols, map.rows, targetTurns, tuple(rootIndexes), tuple(sorted(weights.items())))
+        cached = _exactGatherCache.get(cacheKey, None)
+        if cached is not None:
+            exactGatherStats.cache_hits += 1
+            value, tileIndexes = cached
+            return value, {map.tiles_by_index[i] for i in tileIndexes}, True
+        exactGatherStats.cache_misses += 1
+
+    rootsConnected = _is_connected_tile_indexes(map, rootIndexes)
+
+    bestValue = 0.0 if rootsConnected else -1000000000.0
+    bestIndexes: typing.List[int] | None = list(rootIndexes) if rootsConnected else None
+
+    if useHeuristicIncumbent and targetTurns > 0:
+        _, heurSet = cutesy_chatgpt_gather(map, targetTurns, rootTiles, searchingPlayer, valueMatrix, tilesToInclude=tilesToInclude, negativeTiles=negativeTiles)
+        if heurSet:
+            heurIndexes = [t.tile_index for t in heurSet]
+            if (
+                    all(i in allowed for i in heurIndexes)
+                    and isRoot.issubset(heurIndexes)
+                    and len(heurIndexes) - len(rootIndexes) <= targetTurns
+                    and _is_connected_tile_indexes(map, heurIndexes)
+            ):
+                heurValue = sum(weights[i] for i in heurIndexes)
+                if heurValue > bestValue:
+                    bestValue = heurValue
+                    bestIndexes = heurIndexes
+
+    positiveByValue = sorted((i for i in allowed if weights[i] > 0 and i not in isRoot), key=lambda i: weights[i], reverse=True)
+    adjacency: typing.Dict[int, typing.List[int]] = {
+        i: [mv.tile_index for mv in map.tiles_by_index[i].movable if mv.tile_index in allowed] for i in allowed
+    }
+
+    inSet: typing.Set[int] = set(rootIndexes)
+    banned: typing.Set[int] = set()
+    current: typing.List[int] = list(rootIndexes)
+    nodesSearched = 0
+    timedOut = False
+
+    def upper_bound(value: float, remaining: int) -> float:
+        bound = value
+        for i in positiveByValue:
+            if remaining == 0:
+                break
+            if i in inSet or i in banned:
+                continue
+            bound += weights[i]
+            remaining -= 1
+        return bound
+
+    def search(value: float, frontier: typing.List[int], remaining: int):
+        nonlocal bestValue, bestIndexes, nodesSearched, timedOut
+
+        nodesSearched += 1
+        if nodesSearched & 255 == 0 and time.perf_counter() > cutoffTime:
+            timedOut = True
+        if timedOut:
+            return
+
+        if value > bestValue and (rootsConnected or _is_connected_tile_indexes(map, current)):
+            bestValue = value
+            bestIndexes = current.copy()
+
+        if remaining == 0:
+            return
+
+        bannedHere = []
+        for idx, tileIdx in enumerate(frontier):
+            if timedOut or upper_bound(value, remaining) <= bestValue:
+                break
+
+            rest = frontier[idx + 1:]
+            restSet = set(rest)
+            newFrontier = rest + [n for n in adjacency[tileIdx] if n not in inSet and n not in banned and n not in restSet]
+            newFrontier.sort(key=lambda i: weights[i], reverse=True)
+
+            inSet.add(tileIdx)
+            current.append(tileIdx)
+            search(value + weights[tileIdx], newFrontier, remaining - 1)
+            current.pop()
+            inSet.discard(tileIdx)
+
+            banned.add(tileIdx)
+            bannedHere.append(tileIdx)
+
+        for tileIdx in bannedHere:
+            banned.discard(tileIdx)
+
+    rootFrontier = sorted({n for r in rootIndexes for n in adjacency[r] if n not in isRoot}, key=lambda i: weights[i], reverse=True)
+    search(0.0, rootFrontier, targetTurns)
+
+    exactGatherStats.nodes_searched += nodesSearched
+    provedOptimal = not timedOut
+    if timedOut:
+        exactGatherStats.timeouts += 1
+
+    if provedOptimal and cacheKey is not None and bestIndexes is not None:
+        if len(_exactGatherCache) >= EXACT_GATHER_CACHE_MAX_ENTRIES:
+            _exactGatherCache.clear()
+        _exactGatherCache[cacheKey] = (bestValue, frozenset(bestIndexes))
+
+    if USE_DEBUG_LOGGING:
+        logbook.info(f'exact steiner gather {targetTurns}t over {len(allowed)} tiles, value {bestValue:.2f}, optimal {provedOptimal}, {nodesSearched} nodes in {time.perf_counter() - start:.4f}s')
+
+    if bestIndexes is None:
+        return 0.0, None, provedOptimal
+
+    return bestValue, {map.tiles_by_index[i] for i in bestIndexes}, provedOptimal
 
 
 # TODO THIS IS CHATGPT CODE FROM https://chatgpt.com/g/g-3w1rEXGE0-web-browser/c/4fe68032-e88c-4057-a329-d37a42df465b
@@ -7,7 +7,7 @@ import logbook
 import SearchUtils
 import base.Colors
 from Algorithms import MapSpanningUtils
-from Algorithms.FastDisjointSet import FastDisjointTileSetSum
+from Algorithms.FastDisjointSet import FastDisjointTileIndexSetSum
 from Interfaces.MapMatrixInterface import EmptySet
 from MapMatrix import MapMatrix
 from ViewInfo import TargetStyle, ViewInfo
@@ -201,6 +201,9 @@ def _k_prune_reconnect_greedy(
     bestOuterValue = -1000.0
     bestOuterTurns = -1000
 
+    forest = FastDisjointTileIndexSetSum(map, initialRawValueMatrix)
+    """Reused (via its O(1) reset) by every _reconnect call instead of rebuilding the forest each iteration."""
+
     unelimmed = set(contiguousTiles)
     pruneThreshold = disconnectQueue[0][0]
     pruneThreshInc = 0.5
@@ -264,7 +267,8 @@ def _k_prune_reconnect_greedy(
             disconnectCounts,
             skipTiles,
             initialRawValueMatrix,
-            bareMinTurns)
+            bareMinTurns,
+            forest=forest)
 
         bestRoot = next(iter(rootTiles))
         newBestRootSet, bestVal = forest.subset_with_value(bestRoot)
@@ -375,7 +379,8 @@ def _reconnect(
         valueMatrix: MapMatrixInterface[float],
         bareMinTurns: int,
         # costPer: typing.Dict[Tile, int]
-) -> typing.Tuple[typing.Set[Tile], FastDisjointTileSetSum]:
+        forest: FastDisjointTileIndexSetSum | None = None,
+) -> typing.Tuple[typing.Set[Tile], FastDisjointTileIndexSetSum]:
     """
     Returns set of all those connected, as well as the set of any required that couldn't be connected to the first required tile.
     Prioritizes gathering army, optionally modifying the gather value with the value from the prio matrix
@@ -387,6 +392,7 @@ def _reconnect(
     @param rootTiles:
     @param justDisconnectedTiles: tiles that should be punished
     @param valueMatrix: gather prio values.
+    @param forest: optional forest to reset and reuse rather than allocating a new map-sized one.
     @return:
     """
 
@@ -397,7 +403,10 @@ def _reconnect(
         logbook.info('starting _reconnect')
     # includedSet = set()
 
-    forest = FastDisjointTileSetSum(valueMatrix)
+    if forest is None:
+        forest = FastDisjointTileIndexSetSum(map, valueMatrix)
+    else:
+        forest.reset(valueMatrix)
 
     # missingIncluded = curSet.copy()
     newTiles: typing.Set[Tile] = set()
@@ -435,11 +444,9 @@ def _reconnect(
         # _include_all_adj_required_set_gather(root, , newTiles, usefulStartSet, missingIncluded, valueMatrix)
 
     for t in curSet:
-        for adj in t.movable:
-            if adj in curSet:
-                if forest.merge(t, adj):
-                    # these werent already connected
-                    pass
+        adjInSet = [adj for adj in t.movable if adj in curSet]
+        if adjInSet:
+            forest.merge_many(adjInSet, into=t)
     #
     # for t in rootTiles:
     #     val = forest.subset_value(t)
@@ -585,8 +592,7 @@ def _reconnect(
         # first = path.tileList[0]
         last = path.tileList[-1]
         newTiles.update(path.tileList[1:-1])
-        for tile in path.tileList:
-            forest.merge(tile, last)
+        forest.merge_many(path.tileList, into=last)
 
             # _include_all_adj_required_set_forest(tile, forest, newTiles, usefulStartSet, valueMatrix, last) # , lastTile
             # _include_all_adj_required_set_gather(tile, includedSet, newTiles, usefulStartSet, missingIncluded, valueMatrix) # , lastTile
@@ -684,7 +690,7 @@ def _prune_connected(node: Tile, setToPrune: typing.Set[Tile], valueMatrix: MapM
     return pruned
 
 
-def _include_all_adj_required_set_forest(node: Tile, forest: FastDisjointTileSetSum, newTiles: typing.Set[Tile], usefulStartSet: TileSet, valueMatrix: MapMatrixInterface[float], someRoot: Tile):
+def _include_all_adj_required_set_forest(node: Tile, forest: FastDisjointTileIndexSetSum, newTiles: typing.Set[Tile], usefulStartSet: TileSet, valueMatrix: MapMatrixInterface[float], someRoot: Tile):
     """
     Inlcudes all adjacent required tiles int the
 
@@ -70,6 +70,13 @@ class GatherCapturePlan(TilePlanInterface):
         self.has_more_moves: bool = len(rootNodes) > 0
         self.approximate_capture_tiles: typing.Set[Tile] = set()
         self._move_list: typing.List[Move] | None = None
+        self._calc_settings: typing.Tuple[typing.Set[Tile] | None, typing.List[int], bool, MapMatrixInterface[float] | None, bool, bool] | None = None
+        """(negativeTiles, frPlayers, onlyCalculateFriendlyArmy, priorityMatrix, includeGatherPriorityAsEconValues, includeCapturePriorityAsEconValues) the plan was built with. None if the plan wasn't built by build_from_root_nodes, in which case the aggregates are not maintained incrementally."""
+        self._node_contribs: typing.Dict[int, typing.List] = {}
+        """tile_index -> [ownArmy, ownPoints, ownEcon, ownGatherTurns, prioVal, isStartNode, isFriendly], each tree nodes own contribution to the plan aggregates, so they can be maintained without re-walking the tree."""
+        self._nodes_by_tile_index: typing.Dict[int, GatherTreeNode] = {}
+        self._tile_snapshot: typing.Dict[int, typing.Tuple[int, int]] = {}
+        """tile_index -> (army, player) of the plan tiles when the aggregates were last calculated, for is_dirty."""
 
         if not self.value_func:  # emptyVal value func, gathers based on cityCount then distance from general
             frPlayers = map.get_teammates(asPlayer)
@@ -133,6 +140,12 @@ class GatherCapturePlan(TilePlanInterface):
         if self._tileSet is not None:
             clone._tileSet = self._tileSet.copy()
 
+        clone._calc_settings = self._calc_settings
+        clone._node_contribs = {tileIdx: contrib.copy() for tileIdx, contrib in self._node_contribs.items()}
+        if self._nodes_by_tile_index:
+            GatherTreeNode.foreach_tree_node(clone.root_nodes, lambda n: clone._nodes_by_tile_index.__setitem__(n.tile.tile_index, n))
+        clone._tile_snapshot = self._tile_snapshot.copy()
+
         return clone
 
     @property
@@ -147,6 +160,10 @@ class GatherCapturePlan(TilePlanInterface):
     def econValue(self, econValue: float):
         self._econ_value = econValue
 
+    @property
+    def value_per_turn(self) -> float:
+        return self._econ_value / max(1, self._turns)
+
     @property
     def tileSet(self) -> typing.Set[Tile]:
         if self._tileSet is None:
@@ -193,11 +210,168 @@ class GatherCapturePlan(TilePlanInterface):
     def pop_first_move(self) -> Move | None:
         if self.value_func:
             move = GatherPrune.get_tree_move(self.root_nodes, self.value_func, pop=True)
-            self._move_list = None
+            if self._move_list and move is not None and self._move_list[0] == move:
+                self._move_list = self._move_list[1:]
+            else:
+                self._move_list = None
+            if move is not None and self._calc_settings is not None:
+                self._apply_popped_leaf(move)
             return move
         else:
             raise AssertionError(f'cannot call pop move when value_func is None (after pickling)')
 
+    def _apply_popped_leaf(self, move: Move):
+        """
+        The leafs army moves onto its parent, so the value the rest of the plan will gather is unchanged; it just takes
+        one less turn. The leafs own contribution is folded into the parent so later subtree removals stay correct.
+        """
+        leaf = self._nodes_by_tile_index.pop(move.source.tile_index, None)
+        contrib = self._node_contribs.pop(move.source.tile_index, None)
+        if leaf is None or contrib is None:
+            return
+
+        self._turns -= 1
+        self.gather_turns -= contrib[3]
+
+        parent = leaf.toGather
+        if parent is not None:
+            parentContrib = self._node_contribs.get(parent.tile.tile_index, None)
+            if parentContrib is not None:
+                parentContrib[0] += contrib[0]
+                parentContrib[1] += contrib[1]
+                parentContrib[2] += contrib[2]
+            # the destination is expected to change, dont report it as dirty.
+            self._tile_snapshot.pop(parent.tile.tile_index, None)
+
+        while parent is not None:
+            parent.gatherTurns -= 1
+            parent = parent.toGather
+
+        self._tile_snapshot.pop(move.source.tile_index, None)
+        self._remove_cached_tiles([move.source])
+
+    def remove_subtree(self, node: GatherTreeNode):
+        """
+        Removes node and all its children from the plan, updating the plan aggregates and the ancestors values in
+        O(subtree size + depth) instead of recalculating the whole plan.
+
+        @param node: a node in this plans tree.
+        """
+        if self._calc_settings is None:
+            raise AssertionError(f'cannot incrementally remove subtrees from a plan that was not built by build_from_root_nodes')
+
+        parent = node.toGather
+        if parent is None:
+            self.root_nodes.remove(node)
+        else:
+            parent.children.remove(node)
+
+        removedTiles = []
+        frPlayers = self._calc_settings[1]
+        for n in GatherTreeNode.iterate_tree_nodes([node]):
+            tileIdx = n.tile.tile_index
+            removedTiles.append(n.tile)
+            self._nodes_by_tile_index.pop(tileIdx, None)
+            self._tile_snapshot.pop(tileIdx, None)
+            contrib = self._node_contribs.pop(tileIdx, None)
+            if contrib is None:
+                continue
+            self.gathered_army -= contrib[0]
+            self.gather_capture_points -= contrib[1]
+            self._econ_value -= contrib[2]
+            self.gather_turns -= contrib[3]
+            if n.tile.isCity and (not self._calc_settings[0] or n.tile not in self._calc_settings[0]):
+                if n.tile.player in frPlayers:
+                    if not contrib[5]:
+                        self.friendly_city_count -= 1
+                elif n.tile.player >= 0:
+                    self.enemy_city_count -= 1
+
+        self._turns -= node.gatherTurns
+        while parent is not None:
+            parent.value -= node.value
+            parent.points -= node.points
+            parent.gatherTurns -= node.gatherTurns
+            parent = parent.toGather
+
+        self._move_list = None
+        self._remove_cached_tiles(removedTiles)
+        self.has_more_moves = len(self.root_nodes) > 0
+
+    def update_priority_values(self, priorityMatrix: MapMatrixInterface[float], tiles: typing.Iterable[Tile] | None = None):
+        """
+        Applies a new priority matrix to the plan aggregates (points / econ) and the node points, only touching the
+        nodes whose priority actually changed.
+
+        @param priorityMatrix: the new priority matrix.
+        @param tiles: if provided, only these tiles are assumed to have changed priority.
+        """
+        if self._calc_settings is None:
+            raise AssertionError(f'cannot incrementally update values of a plan that was not built by build_from_root_nodes')
+
+        negativeTiles, frPlayers, onlyFriendly, _, includeGatherPrio, includeCapturePrio = self._calc_settings
+        self._calc_settings = (negativeTiles, frPlayers, onlyFriendly, priorityMatrix, includeGatherPrio, includeCapturePrio)
+
+        if tiles is None:
+            tileIndexes = list(self._node_contribs.keys())
+        else:
+            tileIndexes = [t.tile_index for t in tiles if t.tile_index in self._node_contribs]
+
+        for tileIdx in tileIndexes:
+            contrib = self._node_contribs[tileIdx]
+            newPrio = priorityMatrix.raw[tileIdx]
+            delta = newPrio - contrib[4]
+            if delta == 0:
+                continue
+            contrib[4] = newPrio
+            isStartNode = contrib[5]
+            isFriendly = contrib[6]
+
+            if (isFriendly and includeGatherPrio and not isStartNode) or (not isFriendly and includeCapturePrio):
+                contrib[2] += delta
+                self._econ_value += delta
+
+            if isStartNode:
+                continue
+
+            contrib[1] += delta
+            self.gather_capture_points += delta
+            node = self._nodes_by_tile_index.get(tileIdx, None)
+            while node is not None:
+                node.points += delta
+                node = node.toGather
+
+    def is_dirty(self) -> bool:
+        """
+        True if any plan tile's army or owner changed since the aggregates were calculated (excluding the tiles
+        involved in moves already popped from the plan). Cheap compared to rebuilding the plan to find out.
+        """
+        tiles = self._map.tiles_by_index
+        for tileIdx, (army, player) in self._tile_snapshot.items():
+            tile = tiles[tileIdx]
+            if tile.army != army or tile.player != player:
+                return True
+        return False
+
+    def mark_clean(self):
+        """Re-snapshots the plan tiles for is_dirty, for when the caller has accepted the current map state."""
+        self._tile_snapshot = {tileIdx: (n.tile.army, n.tile.player) for tileIdx, n in self._nodes_by_tile_index.items()}
+
+    def _remove_cached_tiles(self, tiles: typing.List[Tile]):
+        if self._tileSet is None and self._tileList is None:
+            return
+        if len(tiles) > 4:
+            self._tileSet = None
+            self._tileList = None
+            return
+        for tile in tiles:
+            if tile in self.approximate_capture_tiles:
+                continue
+            if self._tileSet is not None:
+                self._tileSet.discard(tile)
+            if self._tileList is not None and tile in self._tileList:
+                self._tileList.remove(tile)
+
     def get_move_list(self) -> typing.List[Move]:
         if self._move_list is not None:
             return self._move_list
@@ -228,6 +402,10 @@ class GatherCapturePlan(TilePlanInterface):
         if '_map' in state:
             del state['_map']
 
+        # the incremental bookkeeping references the live map / matrices and doesn't survive the trip anyway (no value_func to pop moves with).
+        state['_calc_settings'] = None
+        state['_nodes_by_tile_index'] = {}
+
         if 'start' in state:
             raise Exception('wtf why')
             del state['start']
@@ -313,8 +491,10 @@ class GatherCapturePlan(TilePlanInterface):
         )
         plan._turns = 0
         frPlayers = map.get_teammates(searchingPlayer)
+        plan._calc_settings = (negativeTiles, frPlayers, onlyCalculateFriendlyArmy, priorityMatrix, includeGatherPriorityAsEconValues, includeCapturePriorityAsEconValues)
 
         for currentNode in rootNodes:
+            currentNode.toGather = None
             GatherCapturePlan._recalculate_gather_plan_values(
                 plan,
                 # logEntries,
@@ -331,6 +511,7 @@ class GatherCapturePlan(TilePlanInterface):
         #prunes invalid gather nodes.
         rootNodes = GatherPrune.prune_mst_to_army(rootNodes, 1000000000, searchingPlayer, map.team_ids_by_player_index, map.turn, viewInfo)
         plan.root_nodes = rootNodes
+        plan._nodes_by_tile_index = {n.tile.tile_index: n for n in GatherTreeNode.iterate_tree_nodes(rootNodes)}
 
         # plan.gathered_army += currentNode.value
         for currentNode in rootNodes:
@@ -389,6 +570,7 @@ class GatherCapturePlan(TilePlanInterface):
                     viewInfo.bottomLeftGridText.raw[currentTile.tile_index] = f'vt{rawValPerTurn:.1f}'
 
         plan.leaves = leaves
+        plan.mark_clean()
 
         return plan
 
@@ -467,10 +649,21 @@ class GatherCapturePlan(TilePlanInterface):
         plan.gathered_army += sumArmy
         plan.econValue += econValue
         plan.gather_capture_points += sumPoints
-        if isTileFriendly:
-            plan.gather_turns += turns
+        ownGatherTurns = turns if isTileFriendly else 0
+        plan.gather_turns += ownGatherTurns
+        plan._node_contribs[currentTile.tile_index] = [
+            sumArmy,
+            sumPoints,
+            econValue,
+            ownGatherTurns,
+            priorityMatrix.raw[currentTile.tile_index] if priorityMatrix else 0.0,
+            isStartNode,
+            isTileFriendly,
+        ]
+        plan._nodes_by_tile_index[currentTile.tile_index] = currentNode
 
         for child in currentNode.children:
+            child.toGather = currentNode
             GatherCapturePlan._recalculate_gather_plan_values(
                 plan,
                 child,
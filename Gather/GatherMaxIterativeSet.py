@@ -25,6 +25,10 @@ from base.client.map import MapBase
 from base.client.tile import Tile
 
 
+def _is_past_cutoff(cutoffTime: float | None) -> bool:
+    return cutoffTime is not None and time.perf_counter() > cutoffTime
+
+
 def _knapsack_max_set_gather_iteration(
         turns: int,
         valuePerTurnPathPerTile: typing.Dict[Tile, typing.List[Path]],
@@ -743,6 +747,33 @@ def _knapsack_max_set_gather_iterative_prune(
 
             totalTurns = turnsUsedByNewPaths + turnsSoFar
 
+            # record the best-so-far before any early cutoff break below, so running out of time still returns a plan.
+            rootForestSubset = set()
+            gatherVal = 0
+            armySum = 0
+            for rootTile in rootTiles:
+                if rootTile in forest:
+                    recon, (thisRootGath, thisRootArmy) = forest.subset_with_values(rootTile)
+                    rootForestSubset.update(recon)
+                    gatherVal += thisRootGath
+                    armySum += thisRootArmy
+
+            curTurns = len(rootForestSubset) - len(rootTiles)
+            if totalTurns > 0:
+                if bestVal < gatherVal:
+                    bestVal = gatherVal
+                    bestSet = rootForestSubset.copy()
+                    bestStart = newStartTilesDict.copy()
+                    bestTurns = curTurns
+
+                if bestVal / max(1, bestTurns) > gatherVal * 1.04 / max(1, curTurns):
+                    msg = f'  -- overriding poor re-plan {gatherVal:.1f}/{len(rootForestSubset)} back to bestVal {bestVal:.1f}/{len(bestSet)}'
+                    logEntries.append(msg)
+                    if liveRenderer:
+                        liveRenderer.view_info.add_info_line(msg)
+                    newStartTilesDict = bestStart.copy()
+                    rootForestSubset = bestSet.copy()
+
             if not liveRenderer:
                 now = time.perf_counter()
                 if now > cutoffTime:
@@ -799,35 +830,16 @@ def _knapsack_max_set_gather_iterative_prune(
             ogTotalTurns = totalTurns
             overpruneCutoff = max(pruneToTurns // 2, lastPrunedTo - maxPerIteration)
 
-            rootForestSubset = set()
-            gatherVal = 0
-            armySum = 0
-            for rootTile in rootTiles:
-                if rootTile in forest:
-                    recon, (thisRootGath, thisRootArmy) = forest.subset_with_values(rootTile)
-                    rootForestSubset.update(recon)
-                    gatherVal += thisRootGath
-                    armySum += thisRootArmy
-
-            curTurns = len(rootForestSubset) - len(rootTiles)
-            if totalTurns > 0:
-                if bestVal < gatherVal:
-                    bestVal = gatherVal
-                    bestSet = rootForestSubset.copy()
-                    bestStart = newStartTilesDict.copy()
-                    bestTurns = curTurns
-
-                if bestVal / max(1, bestTurns) > gatherVal * 1.04 / max(1, curTurns):
-                    msg = f'  -- overriding poor re-plan {gatherVal:.1f}/{len(rootForestSubset)} back to bestVal {bestVal:.1f}/{len(bestSet)}'
-                    logEntries.append(msg)
-                    if liveRenderer:
-                        liveRenderer.view_info.add_info_line(msg)
-                    newStartTilesDict = bestStart.copy()
-                    rootForestSubset = bestSet.copy()
-
             if pruneToTurns == fullTurns:
                 break
 
+            reconnectCutoff = None
+            if not liveRenderer:
+                # give this iteration's reconnect its share of whatever budget is left, so one slow reconnect cant eat the remaining iterations.
+                now = time.perf_counter()
+                estRemainingIterations = max(1, (fullTurns - pruneToTurns) // maxPerIteration + 1)
+                reconnectCutoff = now + max(0.0, cutoffTime - now) / estRemainingIterations
+
             totalTurns, totalValue, prunedSet = prune_set_to_turns_and_reconnect_with_values(
                 map,
                 rootTiles,
@@ -848,6 +860,7 @@ def _knapsack_max_set_gather_iterative_prune(
                 overpruneCutoff=overpruneCutoff,
                 liveRenderer=liveRenderer,
                 pruneReconnectCountMatrix=pruneReconnectCountMatrix,
+                cutoffTime=reconnectCutoff,
                 # This WAS here to update the start dist
                 # parentPruneFunc=lambda t, prunedNode: _start_tiles_prune_helper(startTilesDict, t, prunedNode)
             )
@@ -1236,6 +1249,7 @@ def prune_set_to_turns_and_reconnect_with_values(
         overpruneCutoff: int | None = None,
         logEntries: typing.List[str] | None = None,
         liveRenderer: DebugLiveViewerHost | None = None,
+        cutoffTime: float | None = None,
 ) -> typing.Tuple[int, float, typing.Set[Tile]]:  # FastDisjointTileSetMultiSum
     """
     Prunes bad nodes from a set, and then rejoins them.
@@ -1248,6 +1262,8 @@ def prune_set_to_turns_and_reconnect_with_values(
     @param tileDictToPrune: Optionally, also prune tiles out of this dictionary
     @param invalidMoveFunc: func(GatherTreeNode) -> bool, return true if you want a leaf GatherTreeNode to always be pruned. By emptyVal, if none is passed, then gather nodes that begin at an enemy tile or that are 1's will always be pruned as invalid.
     @param parentPruneFunc: func(Tile, GatherTreeNode) When a node is pruned this function will be called for each parent tile above the node being pruned and passed the node being pruned.
+    @param cutoffTime: optional perf_counter deadline for the reconnect. The reconnect strategies are anytime; once the deadline
+     passes they stop improving and return the best reconnection found so far (at worst, the part of the set still connected to the roots).
 
     @return: gatherTurns, gatherValue, rootNodes
     """
@@ -1300,7 +1316,8 @@ def prune_set_to_turns_and_reconnect_with_values(
             overpruneCutoff,
             baseCaseFunc,
             tileDictToPrune,
-            liveRenderer)
+            liveRenderer,
+            cutoffTime)
         logEntries.append(f'   steiner {len(reconnectedSubset)}')
     elif desiredTotalNodes / finalTargetTurns > 0.85 and iteration & 2 != 0:  #  and iteration & 2 != 0
         gathVal, rawArmy, reconnectedSubset = _reconnect_dynamic_find_forest(
@@ -1316,7 +1333,8 @@ def prune_set_to_turns_and_reconnect_with_values(
             overpruneCutoff,
             baseCaseFunc,
             tileDictToPrune,
-            liveRenderer)
+            liveRenderer,
+            cutoffTime)
         logEntries.append(f'   dynamic forest {len(reconnectedSubset)}')
 
     else:
@@ -1335,7 +1353,8 @@ def prune_set_to_turns_and_reconnect_with_values(
             baseCaseFunc,
             tileDictToPrune,
             baselineValuePerTurn,
-            liveRenderer)
+            liveRenderer,
+            cutoffTime)
         logEntries.append(f'   pcst {len(reconnectedSubset)}')
 
     prePruneCount = len(reconnectedSubset)
@@ -1398,10 +1417,13 @@ def _reconnect_steiner_subprune(
         overpruneCutoff,
         baseCaseFunc,
         tileDictToPrune,
-        liveRenderer
+        liveRenderer,
+        cutoffTime: float | None = None,
 ) -> typing.Tuple[float, float, typing.Set[Tile]]:
     """
     Reconnects a partially disconnected set and returns the valueSum / armySum of the reconnected set.
+    The networkx steiner tree cant be interrupted, so if the deadline passes before (or while building the graph for) it,
+     this falls back to the dynamic forest reconnect which returns its best-so-far at the deadline.
 
     @param map:
     @param someRoot:
@@ -1416,14 +1438,21 @@ def _reconnect_steiner_subprune(
     @param baseCaseFunc:
     @param tileDictToPrune:
     @param liveRenderer:
+    @param cutoffTime: optional perf_counter deadline.
     @return:
     """
+    if _is_past_cutoff(cutoffTime):
+        return _reconnect_dynamic_find_forest(map, someRoot, rootTiles, toReconnect, valueMatrix, armyCostMatrix, pruneReconnectCountMatrix, skipTiles, reconnectTargetTurns, overpruneCutoff, baseCaseFunc, tileDictToPrune, liveRenderer, cutoffTime)
+
     # steinerGraph = NetworkXHelpers.build_networkX_graph_flat_weight_mod_subtract(
     #     map, valueMatrix, baseWeight=1000, bannedTiles=skipTiles
     # )
     steinerGraph = NetworkXHelpers.build_networkX_graph_flat_weight_mod_scale(
         map, valueMatrix, bannedTiles=skipTiles
     )
+    if _is_past_cutoff(cutoffTime):
+        return _reconnect_dynamic_find_forest(map, someRoot, rootTiles, toReconnect, valueMatrix, armyCostMatrix, pruneReconnectCountMatrix, skipTiles, reconnectTargetTurns, overpruneCutoff, baseCaseFunc, tileDictToPrune, liveRenderer, cutoffTime)
+
     reconnectedSubset = GatherSteiner.build_network_x_steiner_tree_from_arbitrary_nx_graph(map, steinerGraph, requiredTiles=toReconnect)
     reconnectionTiles = []
     gathVal = 0
@@ -1461,10 +1490,12 @@ def _reconnect_fast_pcst(
         baseCaseFunc,
         tileDictToPrune,
         baselineValuePerTurn,
-        liveRenderer
+        liveRenderer,
+        cutoffTime: float | None = None,
 ) -> typing.Tuple[float, float, typing.Set[Tile]]:
     """
     Reconnects a partially disconnected set and returns the valueSum / armySum of the reconnected set.
+    If the deadline has already passed, falls back to the dynamic forest reconnect which returns its best-so-far immediately.
 
     @param map:
     @param someRoot:
@@ -1479,8 +1510,12 @@ def _reconnect_fast_pcst(
     @param baseCaseFunc:
     @param tileDictToPrune:
     @param liveRenderer:
+    @param cutoffTime: optional perf_counter deadline.
     @return:
     """
+    if _is_past_cutoff(cutoffTime):
+        return _reconnect_dynamic_find_forest(map, someRoot, rootTiles, toReconnect, valueMatrix, armyCostMatrix, pruneReconnectCountMatrix, skipTiles, reconnectTargetTurns, overpruneCutoff, baseCaseFunc, tileDictToPrune, liveRenderer, cutoffTime)
+
     reconnectedSubset = GatherSteiner.get_prize_collecting_gather_mapmatrix_single_iteration(
         map,
         valueMatrix,
@@ -1543,10 +1578,12 @@ def _reconnect_dynamic_find_forest(
         overpruneCutoff,
         baseCaseFunc,
         tileDictToPrune,
-        liveRenderer
+        liveRenderer,
+        cutoffTime: float | None = None,
 ) -> typing.Tuple[float, float, typing.Set[Tile]]:
     """
     Reconnects a partially disconnected set and returns the valueSum / armySum of the reconnected set.
+    Anytime; every reconnect path found grows the root-connected subset, and at the deadline whatever is connected to the roots is returned.
 
     @param map:
     @param someRoot:
@@ -1561,6 +1598,7 @@ def _reconnect_dynamic_find_forest(
     @param baseCaseFunc:
     @param tileDictToPrune:
     @param liveRenderer:
+    @param cutoffTime: optional perf_counter deadline.
     @return:
     """
     reconnectionTiles, forest = _reconnect_iterative_heuristic(
@@ -1574,6 +1612,7 @@ def _reconnect_dynamic_find_forest(
         bareMinTurns=overpruneCutoff,  # TODO
         doNotAllowExtraTurns=False,
         liveRenderer=liveRenderer,
+        cutoffTime=cutoffTime,
     )
 
     reconnectedSubset = set()
@@ -1631,9 +1670,11 @@ def _reconnect_iterative_heuristic(
         liveRenderer: DebugLiveViewerHost | None = None,
         # costPer: typing.Dict[Tile, int]
         logEntries: typing.List[str] | None = None,
+        cutoffTime: float | None = None,
 ) -> typing.Tuple[typing.Set[Tile], FastDisjointTileSetMultiSum]:
     """
     Returns the set of newly added tiles used to reconnect, and a forest with values (sumValueMatrix, sumArmyCost) that has been partially reconnected.
+    Each reconnect path strictly grows the root subset, so stopping at cutoffTime leaves the forest holding the best reconnection found so far.
 
     @param map:
     @param pruneTo: limit the number of turns we can potentially use. This isn't guaranteed and may cause the gather to not connect all nodes or something?
@@ -1641,6 +1682,7 @@ def _reconnect_iterative_heuristic(
     @param skipTiles:
     @param rootTiles:
     @param valueMatrix: gather prio values.
+    @param cutoffTime: optional perf_counter deadline after which no more reconnect paths are searched for.
     @return:
     """
 
@@ -1754,6 +1796,11 @@ def _reconnect_iterative_heuristic(
     iteration = 0
     # while len(missingIncluded) > 0:
     while forest.subset_size(someRoot) < pruneTo:
+        if _is_past_cutoff(cutoffTime):
+            if logEntries is not None:
+                logEntries.append(f'  reconnect hit cutoff with {forest.n_subsets - 1} subsets still disconnected, returning best-so-far')
+            break
+
         # iter += 1
         if GatherDebug.USE_DEBUG_LOGGING and logEntries:
             logEntries.append(f'missingIncluded iter {iteration}')
@@ -8,9 +8,13 @@ import SearchUtils
 from Interfaces import MapMatrixInterface
 from Models import GatherTreeNode, Move
 from . import GatherDebug
+from .GatherTreeArray import GatherTreeArray, ArmyPruneObjective, MaxArmyPerTurnPruneObjective
 from ViewInfo import ViewInfo
 from base.client.tile import Tile
 
+USE_ARRAY_GATHER_TREES = True
+"""When True, pruning and value recalculation run over a flat GatherTreeArray instead of walking the GatherTreeNodes, whenever no debug / viewInfo / custom callback output is requested."""
+
 
 def get_tree_moves(
         gathers: typing.List[GatherTreeNode],
@@ -205,6 +209,19 @@ def prune_mst_to_turns_with_values(
     if logEntries is None:
         logEntries = []
 
+    if USE_ARRAY_GATHER_TREES and invalidMoveFunc is None and not forcePrunePreferPrune and noLog and viewInfo is None:
+        tree = GatherTreeArray.from_nodes(rootNodes)
+        gathTurns, gathVal = tree.prune_to_turns(
+            turns,
+            searchingPlayer,
+            overpruneCutoff=overpruneCutoff if overpruneCutoff is not None else turns,
+            preferPrune=preferPrune,
+            allowNegative=allowNegative,
+            parentPruneFunc=parentPruneFunc,
+        )
+        tree.write_back_to_nodes(gatherTreeNodeLookupToPrune, tileDictToPrune)
+        return gathTurns, gathVal, rootNodes
+
     if invalidMoveFunc is None:
         def invalid_move_func(node: GatherTreeNode):
             if node.tile.army <= 1:
@@ -448,6 +465,16 @@ def prune_mst_to_army_with_values(
     """
     start = time.perf_counter()
 
+    if USE_ARRAY_GATHER_TREES and invalidMoveFunc is None and viewInfo is None:
+        tree = GatherTreeArray.from_nodes(rootNodes)
+        prunedTurns, gathValue = tree.prune_until(
+            ArmyPruneObjective(army, searchingPlayer, teams, turn, additionalIncrement, pruneLargeTilesFirst),
+            preferPrune=preferPrune,
+            allowNegative=allowNegative,
+        )
+        tree.write_back_to_nodes(gatherTreeNodeLookupToPrune)
+        return prunedTurns, gathValue, rootNodes
+
     turnIncFactor = (1 + turn) & 1
 
     cityCounter = SearchUtils.Counter(0 - additionalIncrement)
@@ -658,6 +685,16 @@ def prune_mst_to_max_army_per_turn_with_values(
     if totalValue < minArmy:
         return totalTurns, totalValue, rootNodes
 
+    if USE_ARRAY_GATHER_TREES and invalidMoveFunc is None and viewInfo is None:
+        tree = GatherTreeArray.from_nodes(rootNodes)
+        prunedTurns, gathValue = tree.prune_until(
+            MaxArmyPerTurnPruneObjective(minArmy, searchingPlayer, teams, additionalIncrement, allowBranchPrune, minTurns),
+            preferPrune=preferPrune,
+            allowNegative=allowNegative,
+        )
+        tree.write_back_to_nodes(gatherTreeNodeLookupToPrune)
+        return prunedTurns, gathValue, rootNodes
+
     def cityCounterFunc(node: GatherTreeNode):
         if (node.tile.isGeneral or node.tile.isCity) and not node.tile.isNeutral and node.tile not in citySkipTiles:
             if teams[node.tile.player] == teams[searchingPlayer]:
@@ -1078,6 +1115,13 @@ def recalculate_tree_values(
     @param shouldAssert:
     @return:
     """
+    if USE_ARRAY_GATHER_TREES and not shouldAssert and viewInfo is None and not GatherDebug.USE_DEBUG_ASSERTS:
+        tree = GatherTreeArray.from_nodes(rootNodes)
+        tree.recalculate_own_values_from_tiles(negativeTiles, searchingPlayer, teams, onlyCalculateFriendlyArmy, priorityMatrix)
+        totalTurns, totalValue = tree.recalculate_values()
+        tree.write_back_to_nodes(writeTrunkValues=True)
+        return totalTurns, totalValue
+
     totalValue = 0
     totalTurns = 0
     # logEntries.append('recalcing treenodes....')
@@ -1237,6 +1281,13 @@ def recalculate_tree_values_from_matrix(
     @param shouldAssert:
     @return:
     """
+    if USE_ARRAY_GATHER_TREES and not shouldAssert and viewInfo is None and not GatherDebug.USE_DEBUG_ASSERTS:
+        tree = GatherTreeArray.from_nodes(rootNodes)
+        tree.recalculate_own_values_from_matrix(valueMatrix, negativeTiles)
+        totalTurns, totalValue = tree.recalculate_values()
+        tree.write_back_to_nodes(writeTrunkValues=True)
+        return totalTurns, totalValue
+
     totalValue = 0
     totalTurns = 0
     # logEntries.append('recalcing treenodes....')
@@ -0,0 +1,719 @@
+from __future__ import annotations
+
+import heapq
+import typing
+from abc import ABC, abstractmethod
+from collections import deque
+
+import logbook
+
+from Interfaces import MapMatrixInterface
+from Models import GatherTreeNode
+from base.client.tile import Tile
+from . import GatherDebug
+
+
+class GatherTreeArray(object):
+    """
+    Flat, index based encoding of a GatherTreeNode forest.
+
+    Nodes are laid out in BFS order from the roots, so every nodes children occupy the contiguous
+    range [childStart[i], childStart[i] + childCount[i]) and every parent index is lower than its childrens.
+    That lets value recalculation run as a single reverse sweep (post-order) and trunk recalculation as a single forward
+    sweep, with no recursion and no per-node allocation. Pruning only flips entries in the prune mask; the
+    GatherTreeNode objects are only touched again by write_back_to_nodes.
+    """
+
+    __slots__ = (
+        'nodes',
+        'tiles',
+        'root_count',
+        'parent',
+        'child_start',
+        'child_count',
+        'live_child_count',
+        'own_value',
+        'value',
+        'turns',
+        'trunk_value',
+        'trunk_distance',
+        'pruned',
+        'prune_order',
+        'root_of',
+        'version',
+        'aggregates',
+    )
+
+    def __init__(self):
+        self.nodes: typing.List[GatherTreeNode] = []
+        """The original GatherTreeNodes, in BFS order."""
+
+        self.tiles: typing.List[Tile] = []
+
+        self.root_count: int = 0
+        """The first root_count entries are the root nodes."""
+
+        self.parent: typing.List[int] = []
+        """Index of the parent node, or -1 for roots."""
+
+        self.child_start: typing.List[int] = []
+        self.child_count: typing.List[int] = []
+
+        self.live_child_count: typing.List[int] = []
+        """Number of children not yet pruned."""
+
+        self.own_value: typing.List[float] = []
+        """The value this node contributes by itself, IE value minus the value of all of its children."""
+
+        self.value: typing.List[float] = []
+        self.turns: typing.List[int] = []
+        self.trunk_value: typing.List[float] = []
+        self.trunk_distance: typing.List[int] = []
+
+        self.pruned: bytearray = bytearray()
+        """The prune mask. 1 for every node that is no longer part of the tree (including descendants of pruned nodes)."""
+
+        self.prune_order: typing.List[int] = []
+        """The nodes that were directly pruned off of their (unpruned) parent, in prune order."""
+
+        self.root_of: typing.List[int] = []
+        """Index of the root each node hangs off of."""
+
+        self.version: typing.List[int] = []
+        """Bumped every time a nodes value / turns / aggregates change, so stale heap entries can be detected lazily."""
+
+        self.aggregates: typing.List[typing.List[float]] = []
+        """Extra per-subtree sums requested by the prune objective, maintained alongside value and turns."""
+
+    @staticmethod
+    def from_nodes(rootNodes: typing.List[GatherTreeNode]) -> GatherTreeArray:
+        """
+        Flattens the (unpruned) tree. The nodes are not modified.
+
+        @param rootNodes:
+        @return:
+        """
+        tree = GatherTreeArray()
+        nodes = tree.nodes
+        parent = tree.parent
+        childStart = tree.child_start
+        childCount = tree.child_count
+
+        visited: typing.Set[int] = set()
+        for n in rootNodes:
+            if id(n) in visited:
+                raise AssertionError(f'GatherTreeArray.from_nodes found root {str(n)} more than once.')
+            visited.add(id(n))
+            nodes.append(n)
+            parent.append(-1)
+
+        tree.root_count = len(rootNodes)
+
+        i = 0
+        while i < len(nodes):
+            node = nodes[i]
+            childStart.append(len(nodes))
+            childCount.append(len(node.children))
+            for child in node.children:
+                if id(child) in visited:
+                    raise AssertionError(f'GatherTreeArray.from_nodes found a cycle, {str(child)} is reachable from {str(node)} but was already visited.')
+                visited.add(id(child))
+                nodes.append(child)
+                parent.append(i)
+            i += 1
+
+        nodeCount = len(nodes)
+        tree.tiles = [n.tile for n in nodes]
+        tree.live_child_count = childCount.copy()
+        tree.value = [n.value for n in nodes]
+        tree.turns = [n.gatherTurns for n in nodes]
+        tree.trunk_value = [n.trunkValue for n in nodes]
+        tree.trunk_distance = [n.trunkDistance for n in nodes]
+        tree.pruned = bytearray(nodeCount)
+
+        return tree
+
+    def _build_own_values(self):
+        ownValue = self.value.copy()
+        value = self.value
+        parent = self.parent
+        for idx in range(self.root_count, len(self.nodes)):
+            ownValue[parent[idx]] -= value[idx]
+        self.own_value = ownValue
+
+    def _build_root_of(self):
+        parent = self.parent
+        rootOf = list(range(len(self.nodes)))
+        for idx in range(self.root_count, len(self.nodes)):
+            rootOf[idx] = rootOf[parent[idx]]
+        self.root_of = rootOf
+
+    def recalculate_values(self) -> typing.Tuple[int, float]:
+        """
+        Recomputes value and turns for every unpruned node from own_value, leaves first.
+
+        @return: totalTurns, totalValue of the roots.
+        """
+        if len(self.own_value) != len(self.nodes):
+            self._build_own_values()
+
+        parent = self.parent
+        value = self.value
+        turns = self.turns
+        pruned = self.pruned
+        nodes = self.nodes
+
+        for idx in range(len(nodes)):
+            value[idx] = self.own_value[idx]
+            turns[idx] = 0 if nodes[idx].toTile is None else 1
+
+        for idx in range(len(nodes) - 1, self.root_count - 1, -1):
+            if pruned[idx]:
+                continue
+            p = parent[idx]
+            value[p] += value[idx]
+            turns[p] += turns[idx]
+
+        return self._get_root_totals()
+
+    def recalculate_own_values_from_tiles(
+            self,
+            negativeTiles: typing.Set[Tile] | None,
+            searchingPlayer: int,
+            teams: typing.List[int],
+            onlyCalculateFriendlyArmy: bool = False,
+            priorityMatrix: MapMatrixInterface[float] | None = None,
+    ):
+        """Sets own_value the same way GatherPrune.recalculate_tree_values does, and the trunk values along with it."""
+        nodes = self.nodes
+        tiles = self.tiles
+        ownValue = [0] * len(nodes)
+        self.own_value = ownValue
+        trunkDelta = [0] * len(nodes)
+        searchingTeam = teams[searchingPlayer]
+        for idx in range(len(nodes)):
+            tile = tiles[idx]
+            armyVal = 0
+            if not negativeTiles or tile not in negativeTiles:
+                if teams[tile.player] == searchingTeam:
+                    armyVal = tile.army
+                elif not onlyCalculateFriendlyArmy:
+                    armyVal = 0 - tile.army
+
+            trunkDelta[idx] = armyVal - 1
+            if nodes[idx].toTile is None:
+                ownValue[idx] = 0
+                continue
+
+            own = armyVal - 1
+            if priorityMatrix:
+                own += priorityMatrix.raw[tile.tile_index]
+            ownValue[idx] = own
+
+        self._recalculate_trunk_values(trunkDelta)
+
+    def recalculate_own_values_from_matrix(
+            self,
+            valueMatrix: MapMatrixInterface[float],
+            negativeTiles: typing.Set[Tile] | None,
+    ):
+        """Sets own_value the same way GatherPrune.recalculate_tree_values_from_matrix does, and the trunk values along with it."""
+        nodes = self.nodes
+        tiles = self.tiles
+        ownValue = [0] * len(nodes)
+        self.own_value = ownValue
+        raw = valueMatrix.raw
+        for idx in range(len(nodes)):
+            if nodes[idx].toTile is None:
+                ownValue[idx] = 0
+                continue
+
+            tile = tiles[idx]
+            own = -1
+            if negativeTiles is None or tile not in negativeTiles:
+                own += raw[tile.tile_index]
+            ownValue[idx] = own
+
+        # the matrix trunk calc excludes negative tiles with a truthiness check rather than a None check, match it.
+        trunkDelta = [0] * len(nodes)
+        for idx in range(self.root_count, len(nodes)):
+            tile = tiles[idx]
+            delta = -1
+            if not negativeTiles or tile not in negativeTiles:
+                delta += raw[tile.tile_index]
+            trunkDelta[idx] = delta
+
+        self._recalculate_trunk_values(trunkDelta)
+
+    def _recalculate_trunk_values(self, trunkDelta: typing.List[float]):
+        parent = self.parent
+        trunkValue = self.trunk_value
+        trunkDistance = self.trunk_distance
+        for idx in range(self.root_count):
+            trunkValue[idx] = 0
+            trunkDistance[idx] = 0
+
+        for idx in range(self.root_count, len(self.nodes)):
+            p = parent[idx]
+            trunkValue[idx] = trunkValue[p] + trunkDelta[idx]
+            trunkDistance[idx] = trunkDistance[p] + 1
+
+    def prune_until(
+            self,
+            objective: GatherTreePruneObjective,
+            preferPrune: typing.Set[Tile] | None = None,
+            allowNegative: bool = True,
+            parentPruneFunc: typing.Callable[[Tile, GatherTreeNode], None] | None = None,
+    ) -> typing.Tuple[int, float]:
+        """
+        Array equivalent of GatherPrune.prune_mst_until, driven by a GatherTreePruneObjective instead of callbacks.
+        O(n*log(n)): every node enters the heap once (plus once more when it becomes a leaf), pruning a node only walks its
+        ancestor path to update value / turns / objective aggregates, and heap entries are invalidated lazily through the
+        version stamps rather than by rescanning the tree.
+        Only updates the arrays; call write_back_to_nodes to apply the result to the GatherTreeNodes.
+
+        @param objective: decides prune order, when to stop, and which nodes are invalid.
+        @param preferPrune: tiles that should be pruned before any other tile of equal validity.
+        @param allowNegative: if False, nodes whose prune would leave their root gathering negative value are kept.
+        @param parentPruneFunc: func(Tile, GatherTreeNode) called for each ancestor of a pruned node.
+        @return: gatherTurns, gatherValue
+        """
+        nodes = self.nodes
+        tiles = self.tiles
+        parent = self.parent
+        value = self.value
+        turnsArr = self.turns
+        liveChildCount = self.live_child_count
+        childStart = self.child_start
+        childCount = self.child_count
+        pruned = self.pruned
+        self.version = [0] * len(nodes)
+        version = self.version
+        if not allowNegative:
+            self._build_root_of()
+        rootOf = self.root_of
+
+        self.aggregates = objective.get_own_aggregates(self)
+        aggregates = self.aggregates
+        for agg in aggregates:
+            for idx in range(len(nodes) - 1, self.root_count - 1, -1):
+                agg[parent[idx]] += agg[idx]
+
+        pruneBranches = objective.prune_branches
+        isInvalid = objective.is_invalid
+        prio = objective.priority
+
+        pruneHeap = []
+        for idx in range(len(nodes)):
+            if nodes[idx].toTile is None or (liveChildCount[idx] > 0 and not pruneBranches):
+                continue
+            validMove = not (liveChildCount[idx] == 0 and isInvalid(self, idx))
+            pruneHeap.append((validMove, preferPrune is None or tiles[idx] not in preferPrune, prio(self, idx), idx, 0))
+        heapq.heapify(pruneHeap)
+
+        count = len(nodes) - self.root_count
+        curValue = 0
+        for idx in range(self.root_count):
+            curValue += value[idx]
+
+        objective.on_prune_start(self, count, curValue)
+
+        initialCount = len(nodes)
+        iter = 0
+        subtreeQueue = deque()
+        while pruneHeap:
+            validMove, notPreferPrune, prioObj, idx, entryVersion = heapq.heappop(pruneHeap)
+            iter += 1
+            if iter > initialCount * 3:
+                logbook.error('GatherTreeArray PRUNE WENT INFINITE, BREAKING')
+                break
+
+            if pruned[idx] or nodes[idx].toTile is None:
+                continue
+
+            validMove = not isInvalid(self, idx)
+            if validMove or liveChildCount[idx] > 0:
+                if objective.should_stop(self, idx, count, curValue):
+                    continue
+
+            if objective.should_skip(self, idx, count, curValue):
+                continue
+
+            if not allowNegative and value[rootOf[idx]] - value[idx] < 0:
+                continue
+
+            # lazy invalidation; the entry only needs re-checking if something below this node was pruned since it was queued.
+            if validMove and entryVersion != version[idx]:
+                newPrio = prio(self, idx)
+                if newPrio > prioObj:
+                    heapq.heappush(pruneHeap, (validMove, notPreferPrune, newPrio, idx, version[idx]))
+                    continue
+
+            nodeValue = value[idx]
+            nodeTurns = turnsArr[idx]
+            curValue -= nodeValue
+            p = parent[idx]
+            liveChildCount[p] -= 1
+            self.prune_order.append(idx)
+            if parentPruneFunc is not None:
+                node = nodes[idx]
+                node.value = nodeValue
+                node.gatherTurns = nodeTurns
+
+            while p >= 0:
+                value[p] -= nodeValue
+                turnsArr[p] -= nodeTurns
+                for agg in aggregates:
+                    agg[p] -= agg[idx]
+                version[p] += 1
+                if parentPruneFunc is not None:
+                    parentPruneFunc(tiles[p], nodes[idx])
+                if nodes[p].toTile is None:
+                    break
+                p = parent[p]
+
+            subtreeQueue.append(idx)
+            while subtreeQueue:
+                toDrop = subtreeQueue.popleft()
+                if pruned[toDrop]:
+                    continue
+                pruned[toDrop] = 1
+                count -= 1
+                start = childStart[toDrop]
+                for child in range(start, start + childCount[toDrop]):
+                    subtreeQueue.append(child)
+
+            p = parent[idx]
+            if liveChildCount[p] == 0 and nodes[p].toTile is not None:
+                heapq.heappush(pruneHeap, (not isInvalid(self, p), preferPrune is None or tiles[p] not in preferPrune, prio(self, p), p, version[p]))
+
+        totalValue = 0
+        for idx in range(self.root_count):
+            totalValue += value[idx]
+
+        return count, objective.get_final_value(self, count, totalValue)
+
+    def prune_to_turns(
+            self,
+            turns: int,
+            searchingPlayer: int,
+            overpruneCutoff: int,
+            preferPrune: typing.Set[Tile] | None = None,
+            allowNegative: bool = True,
+            parentPruneFunc: typing.Callable[[Tile, GatherTreeNode], None] | None = None,
+    ) -> typing.Tuple[int, float]:
+        """
+        The array equivalent of GatherPrune.prune_mst_to_turns_with_values with the default invalidMoveFunc (branch pruning, lowest value per turn first).
+
+        @return: gatherTurns, gatherValue
+        """
+        return self.prune_until(
+            TurnsPruneObjective(turns, searchingPlayer, overpruneCutoff),
+            preferPrune=preferPrune,
+            allowNegative=allowNegative,
+            parentPruneFunc=parentPruneFunc,
+        )
+
+    def write_back_to_nodes(
+            self,
+            gatherTreeNodeLookupToPrune: typing.Dict[Tile, typing.Any] | None = None,
+            tileDictToPrune: typing.Dict[Tile, typing.Any] | None = None,
+            writeTrunkValues: bool = False,
+    ):
+        """
+        Applies the array state back onto the GatherTreeNodes. Pruned nodes are moved from their parents children to
+        their parents pruned list (in prune order), and are removed from the optional lookups.
+        """
+        nodes = self.nodes
+        value = self.value
+        turns = self.turns
+        for idx in range(len(nodes)):
+            node = nodes[idx]
+            node.value = value[idx]
+            node.gatherTurns = turns[idx]
+
+        if writeTrunkValues:
+            trunkValue = self.trunk_value
+            trunkDistance = self.trunk_distance
+            for idx in range(len(nodes)):
+                node = nodes[idx]
+                node.trunkValue = trunkValue[idx]
+                node.trunkDistance = trunkDistance[idx]
+
+        parent = self.parent
+        for idx in self.prune_order:
+            node = nodes[idx]
+            parentNode = nodes[parent[idx]]
+            parentNode.children.remove(node)
+            parentNode.pruned.append(node)
+
+        if gatherTreeNodeLookupToPrune is not None or tileDictToPrune is not None:
+            pruned = self.pruned
+            tiles = self.tiles
+            for idx in range(len(nodes)):
+                if pruned[idx]:
+                    if gatherTreeNodeLookupToPrune is not None:
+                        gatherTreeNodeLookupToPrune.pop(tiles[idx], None)
+                    if tileDictToPrune is not None:
+                        tileDictToPrune.pop(tiles[idx], None)
+
+    def _get_root_totals(self) -> typing.Tuple[int, float]:
+        totalTurns = 0
+        totalValue = 0
+        for idx in range(self.root_count):
+            totalTurns += self.turns[idx]
+            totalValue += self.value[idx]
+        return totalTurns, totalValue
+
+
+class GatherTreePruneObjective(ABC):
+    """
+    Pluggable prune criteria for GatherTreeArray.prune_until. Mirrors the untilFunc / pruneOrderFunc / invalidMoveFunc /
+    pruneOverrideFunc callbacks of GatherPrune.prune_mst_until, but works on node indexes.
+    """
+
+    prune_branches: bool = False
+    """If true, mid-branch nodes are prune candidates too, not just leaves."""
+
+    @abstractmethod
+    def priority(self, tree: GatherTreeArray, idx: int) -> typing.Tuple:
+        """Min are pruned first."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def should_stop(self, tree: GatherTreeArray, idx: int, turnsLeft: int, curValue: float) -> bool:
+        """Return False to prune idx, True to keep it."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def is_invalid(self, tree: GatherTreeArray, idx: int) -> bool:
+        """Return True for leaves that should always be pruned."""
+        raise NotImplementedError()
+
+    def should_skip(self, tree: GatherTreeArray, idx: int, turnsLeft: int, curValue: float) -> bool:
+        """If True, idx is not pruned even though should_stop allowed it."""
+        return False
+
+    def get_own_aggregates(self, tree: GatherTreeArray) -> typing.List[typing.List[float]]:
+        """Per-node values to be summed per subtree and kept up to date as nodes are pruned. Read them back via tree.aggregates."""
+        return []
+
+    def on_prune_start(self, tree: GatherTreeArray, turnsLeft: int, curValue: float):
+        pass
+
+    def get_final_value(self, tree: GatherTreeArray, turns: int, value: float) -> float:
+        return value
+
+
+class TurnsPruneObjective(GatherTreePruneObjective):
+    """Prune lowest value-per-turn nodes (branches included) until the tree fits in the target turns. See prune_mst_to_turns_with_values."""
+
+    prune_branches = True
+
+    def __init__(self, turns: int, searchingPlayer: int, overpruneCutoff: int):
+        self.turns: int = turns
+        self.searching_player: int = searchingPlayer
+        self.overprune_cutoff: int = overpruneCutoff
+
+    def priority(self, tree: GatherTreeArray, idx: int) -> typing.Tuple:
+        turns = tree.turns[idx]
+        value = tree.value[idx]
+        return (value / turns if turns > 0 else -100), value, 0 - tree.trunk_distance[idx]
+
+    def should_stop(self, tree: GatherTreeArray, idx: int, turnsLeft: int, curValue: float) -> bool:
+        return turnsLeft <= self.turns
+
+    def should_skip(self, tree: GatherTreeArray, idx: int, turnsLeft: int, curValue: float) -> bool:
+        return turnsLeft - tree.turns[idx] < self.overprune_cutoff
+
+    def is_invalid(self, tree: GatherTreeArray, idx: int) -> bool:
+        tile = tree.tiles[idx]
+        return tile.army <= 1 or (tile.player != self.searching_player and tree.live_child_count[idx] == 0)
+
+
+class ArmyPruneObjective(GatherTreePruneObjective):
+    """
+    Prune leaves until pruning any more would drop the gathered army (including city increment over the gather) below
+    the target. See prune_mst_to_army_with_values. The city counters are kept as subtree aggregates so checking a
+    candidate no longer walks its whole subtree.
+    """
+
+    prune_branches = False
+
+    _FRIENDLY_CITIES = 0
+    _FRIENDLY_CITY_DEPTH = 1
+    _ENEMY_CITIES = 2
+    _ENEMY_CITY_DEPTH = 3
+
+    def __init__(
+            self,
+            army: int,
+            searchingPlayer: int,
+            teams: typing.List[int],
+            turn: int,
+            additionalIncrement: int = 0,
+            pruneLargeTilesFirst: bool = False,
+    ):
+        self.army: int = army
+        self.searching_player: int = searchingPlayer
+        self.teams: typing.List[int] = teams
+        self.turn_inc_factor: int = (1 + turn) & 1
+        self.prune_large_tiles_first: bool = pruneLargeTilesFirst
+        self.city_counter: int = 0 - additionalIncrement
+        self.city_gather_depth_counter: int = 0
+
+    def get_own_aggregates(self, tree: GatherTreeArray) -> typing.List[typing.List[float]]:
+        nodeCount = len(tree.nodes)
+        friendlyCities = [0] * nodeCount
+        friendlyDepth = [0] * nodeCount
+        enemyCities = [0] * nodeCount
+        enemyDepth = [0] * nodeCount
+        searchingTeam = self.teams[self.searching_player]
+        for idx in range(nodeCount):
+            tile = tree.tiles[idx]
+            if (tile.isCity or tile.isGeneral) and not tile.isNeutral:
+                if self.teams[tile.player] == searchingTeam:
+                    friendlyCities[idx] = 1
+                    friendlyDepth[idx] = tree.trunk_distance[idx]
+                else:
+                    enemyCities[idx] = 1
+                    enemyDepth[idx] = tree.trunk_distance[idx]
+
+        return [friendlyCities, friendlyDepth, enemyCities, enemyDepth]
+
+    def on_prune_start(self, tree: GatherTreeArray, turnsLeft: int, curValue: float):
+        aggs = tree.aggregates
+        for idx in range(tree.root_count):
+            self._add_subtree(aggs, idx)
+
+    def _add_subtree(self, aggs: typing.List[typing.List[float]], idx: int):
+        self.city_counter += aggs[self._FRIENDLY_CITIES][idx] - aggs[self._ENEMY_CITIES][idx]
+        # each time we add one of these we must gather all the other cities in the tree first too so we lose that many increment turns + that
+        self.city_gather_depth_counter += aggs[self._FRIENDLY_CITY_DEPTH][idx] + aggs[self._ENEMY_CITY_DEPTH][idx]
+
+    def _remove_subtree(self, aggs: typing.List[typing.List[float]], idx: int):
+        self.city_counter -= aggs[self._FRIENDLY_CITIES][idx] - aggs[self._ENEMY_CITIES][idx]
+        self.city_gather_depth_counter += aggs[self._ENEMY_CITY_DEPTH][idx] - aggs[self._FRIENDLY_CITY_DEPTH][idx]
+
+    def get_current_city_inc_amount(self, gatherTurnsLeft: int) -> int:
+        cityIncrementAmount = (self.city_counter * (gatherTurnsLeft - self.turn_inc_factor)) // 2  # +1 here definitely causes it to under-gather
+        cityIncrementAmount -= self.city_gather_depth_counter // 2
+        return cityIncrementAmount
+
+    def priority(self, tree: GatherTreeArray, idx: int) -> typing.Tuple:
+        trunkDistance = tree.trunk_distance[idx]
+        trunkValuePerTurn = tree.trunk_value[idx] / trunkDistance if trunkDistance > 0 else 0
+        if self.prune_large_tiles_first:
+            return 0 - tree.value[idx], trunkValuePerTurn, trunkDistance
+        return tree.value[idx] / tree.turns[idx], trunkValuePerTurn, trunkDistance
+
+    def should_stop(self, tree: GatherTreeArray, idx: int, turnsLeft: int, curValue: float) -> bool:
+        turnsLeftIfPruned = turnsLeft - tree.turns[idx]
+
+        # act as though we're pruning the city so we can calculate the gather value without it
+        self._remove_subtree(tree.aggregates, idx)
+
+        cityIncrementAmount = self.get_current_city_inc_amount(turnsLeftIfPruned)
+        armyLeftIfPruned = curValue - tree.value[idx] + cityIncrementAmount
+        if armyLeftIfPruned < self.army:
+            # not pruning here, put the city increments back
+            self._add_subtree(tree.aggregates, idx)
+            return True
+
+        return False
+
+    def is_invalid(self, tree: GatherTreeArray, idx: int) -> bool:
+        tile = tree.tiles[idx]
+        return tile.army <= 1 or tile.player != self.searching_player
+
+    def get_final_value(self, tree: GatherTreeArray, turns: int, value: float) -> float:
+        return value + self.get_current_city_inc_amount(turns)
+
+
+class MaxArmyPerTurnPruneObjective(GatherTreePruneObjective):
+    """Prune while doing so raises the army gathered per turn, without going under minArmy or minTurns. See prune_mst_to_max_army_per_turn_with_values."""
+
+    def __init__(
+            self,
+            minArmy: int,
+            searchingPlayer: int,
+            teams: typing.List[int],
+            additionalIncrement: int = 0,
+            allowBranchPrune: bool = True,
+            minTurns: int = 0,
+    ):
+        self.min_army: int = minArmy
+        self.searching_player: int = searchingPlayer
+        self.teams: typing.List[int] = teams
+        self.prune_branches: bool = allowBranchPrune
+        self.min_turns: int = minTurns
+        self.city_counter: int = 0 - additionalIncrement
+        self.city_gather_depth_counter: int = 0
+        self.cur_value_per_turn: float = 0.0
+
+    def on_prune_start(self, tree: GatherTreeArray, turnsLeft: int, curValue: float):
+        totalTurns = 0
+        for idx in range(tree.root_count):
+            totalTurns += tree.turns[idx]
+        self.cur_value_per_turn = curValue / totalTurns
+
+        teams = self.teams
+        searchingTeam = teams[self.searching_player]
+        citySkipTiles = set()
+        for idx in range(tree.root_count):
+            tile = tree.tiles[idx]
+            if (tile.isCity or tile.isGeneral) and not tile.isNeutral and teams[tile.player] == searchingTeam:
+                citySkipTiles.add(tile)
+
+        for idx in range(len(tree.nodes)):
+            if tree.pruned[idx]:
+                continue
+            tile = tree.tiles[idx]
+            if (tile.isGeneral or tile.isCity) and not tile.isNeutral and tile not in citySkipTiles:
+                if teams[tile.player] == searchingTeam:
+                    self.city_counter += 1
+                    # each time we add one of these we must gather all the other cities in the tree first too so we lose that many increment turns + that
+                    self.city_gather_depth_counter += tree.trunk_distance[idx]
+                else:
+                    self.city_counter -= 1
+            if tile.isSwamp and not tile.isNeutral:
+                self.city_counter -= 1
+
+    def priority(self, tree: GatherTreeArray, idx: int) -> typing.Tuple:
+        turns = tree.turns[idx]
+        trunkDistance = tree.trunk_distance[idx]
+        if turns == 0 or trunkDistance == 0:
+            if tree.nodes[idx].toTile is not None:
+                msg = f'ERRPRUNE {repr(tree.nodes[idx])} td {trunkDistance} or gathTurns {turns}'
+                logbook.info(msg)
+                if GatherDebug.USE_DEBUG_ASSERTS:
+                    raise AssertionError(msg)
+            return -1, -1, -1
+        return tree.value[idx] / turns, tree.trunk_value[idx] / trunkDistance, trunkDistance
+
+    def should_stop(self, tree: GatherTreeArray, idx: int, turnsLeft: int, curValue: float) -> bool:
+        turnsLeftIfPruned = turnsLeft - tree.turns[idx]
+        if turnsLeftIfPruned <= self.min_turns:
+            return True
+        cityIncrementAmount = self.city_counter * ((turnsLeftIfPruned - 1) // 2)
+        cityIncrementAmount -= self.city_gather_depth_counter // 2
+        armyLeftIfPruned = curValue - tree.value[idx] + cityIncrementAmount
+        pruneValPerTurn = armyLeftIfPruned / turnsLeftIfPruned
+        if pruneValPerTurn < self.cur_value_per_turn or armyLeftIfPruned < self.min_army:
+            return True
+
+        tile = tree.tiles[idx]
+        if self.teams[tile.player] == self.teams[self.searching_player]:
+            if tile.isCity or tile.isGeneral:
+                self.city_gather_depth_counter -= tree.trunk_distance[idx]
+                self.city_counter -= 1
+            elif tile.isSwamp:
+                self.city_gather_depth_counter -= tree.trunk_distance[idx]
+                self.city_counter += 1
+
+        self.cur_value_per_turn = pruneValPerTurn
+        return False
+
+    def is_invalid(self, tree: GatherTreeArray, idx: int) -> bool:
+        tile = tree.tiles[idx]
+        return tile.army <= 1 or tile.player != self.searching_player
@@ -7,6 +7,7 @@ from .GatherDepthIterative import *
 from .GatherMaxIterative import *
 from .GatherMaxIterativeSet import *
 from .ChatGptDpGather import *
+from .ExactPerfectSteinerGather import find_exact_best_steiner_gather, clear_exact_steiner_gather_cache
 from .GatherUtils import *
 from .GathSetPruneReconnect import *
 # from .GatherPrizeSteiner import *
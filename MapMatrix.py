@@ -3,6 +3,8 @@ from __future__ import annotations
 import typing
 from typing import TypeVar
 
+import numpy
+
 from Interfaces import MapMatrixInterface, TileSet
 from base.client.map import Tile, MapBase
 
@@ -261,3 +263,26 @@ class MapMatrixSet(object):
 
     def __repr__(self) -> str:
         return str(self)
+
+    def to_bits(self) -> int:
+        """The set as an int bitset, where bit tile_index is set for every tile in the set."""
+        return flags_to_bits(bytes(self.raw))
+
+    def add_bits(self, bits: int):
+        """Adds every tile whose tile_index bit is set in bits."""
+        raw = self.raw
+        for tileIndex in iterate_bits(bits):
+            raw[tileIndex] = True
+
+
+def flags_to_bits(flags: bytes | bytearray) -> int:
+    """Packs a 0/1 byte per tile_index (e.g. bytes(MapMatrixSet.raw)) into an int bitset."""
+    return int.from_bytes(numpy.packbits(numpy.frombuffer(flags, dtype=numpy.uint8), bitorder='little').tobytes(), 'little')
+
+
+def iterate_bits(bits: int) -> typing.Iterable[int]:
+    """Yields the index of every set bit in bits, lowest first. Costs one step per set bit rather than per tile."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
@@ -7,19 +7,24 @@ from __future__ import annotations
 
 import logbook
 import math
+import multiprocessing
 import random
+import threading
 import time
 import typing
+from collections import deque
 from enum import Enum
 
-from numba import jit, float32, int32
+from numba import jit, float32, float64, int32, int64, void
 
 import numpy
 from scipy.special import expit
 
 from Models import Move, MoveBase
+from Engine.ArmyEngineBatchRollout import BatchRolloutEngine
 from Engine.ArmyEngineModels import ArmySimState, ArmySimEvaluationParams
-from PerformanceTelemetry import PerformanceTelemetry
+from Engine.TranspositionTable import TranspositionTable
+from PerformanceTelemetry import PerformanceTelemetry, TelemetryMode
 from PerformanceTimer import PerformanceTimer
 
 
@@ -35,7 +40,22 @@ from PerformanceTimer import PerformanceTimer
 # @author Dennis Soemers, translated to python by Travis Drake
 
 
+NO_MOVE_FOUND = 10000
+
 NO_KILLER_VALUE_TUPLE = (0, 0.0)
+NO_KILLER_AVERAGES = numpy.empty(0, dtype=numpy.float64)
+"""Passed to MctsDUCT.select_ucb1_jit when the killer move blend is off."""
+
+MCTS_TELEMETRY_MODE: TelemetryMode = TelemetryMode.Disabled
+"""
+How new MctsDUCTs time their search loop. Off by default for full search throughput; benchmarks that want the
+per step breakdown set this to Full or Sampled (or assign their own PerformanceTelemetry to the engine).
+"""
+MCTS_TELEMETRY_SAMPLE_INTERVAL: int = 16
+"""In Sampled mode, one in this many search iterations is timed and scaled up."""
+
+_root_parallel_lock = threading.Lock()
+"""Held while a root parallel search has worker processes out, so that a concurrent search runs in-process instead of piling more processes onto the cores."""
 
 
 class BoardMoves(object):
@@ -79,7 +99,7 @@ class MctsDUCT(object):
         self.killer_move_cache: typing.List[typing.Dict[MoveBase | None, typing.Tuple[int, float]]] = [{}, {}]
         """MCTS Node style cache from move to (visitCount, scoreSum)"""
 
-        self.performance_telemetry: PerformanceTelemetry = PerformanceTelemetry()
+        self.performance_telemetry: PerformanceTelemetry = PerformanceTelemetry(MCTS_TELEMETRY_MODE, MCTS_TELEMETRY_SAMPLE_INTERVAL)
 
         self.logAll: bool = False
         self.player = 0
@@ -106,6 +126,55 @@ class MctsDUCT(object):
 
         self.killer_move_exploit_ratio: float = 0.2
         self.use_killer_move: bool = False
+
+        self.use_transposition_table: bool = False
+        """If true, children reached by different move orders that produce the same board state share one node (and its stats), making the tree a DAG."""
+        self.transposition_table_size: int = 20000
+        self.transposition_key_includes_move_history: bool = False
+        """Exact keys almost never transpose at the depths MCTS reaches in the time budget, so by default nodes are shared on position alone (see ArmySimState.get_transposition_key)."""
+        self.transposition_table: TranspositionTable | None = None
+
+        self.use_tree_reuse: bool = False
+        """
+        If true, the trees from previous searches are kept, and a search starting from a board state that one of their
+        roots (or root children, e.g. last turn's predicted moves) reached continues from that node instead of from scratch.
+        """
+        self.tree_reuse_max_nodes: int = 3000
+        """The most nodes carried over into a reused tree. The rest of the old tree is discarded."""
+        self.tree_reuse_max_time_ratio: float = 0.25
+        """The most of a searches maxTime that can be spent re-applying the moves of a reused tree to the new board state."""
+        self._previous_roots: typing.Deque[MctsNode] = deque(maxlen=3)
+
+        self.root_parallel_workers: int = 1
+        """
+        How many independent searches to run from the root, including this process's own. Above 1, the extra searches run
+        in forked worker processes with their own RNG seeds, and their root visit counts / score sums are merged in before
+        the best moves are picked.
+        """
+        self.root_parallel_min_time: float = 0.1
+        """Searches with less time than this stay in-process, as forking the workers would eat too much of the budget."""
+        self.root_parallel_result_grace: float = 0.02
+        """How long past the search stop time to wait for a worker's root stats before giving up on it."""
+
+        self.rollout_batch_size: int = 1
+        """
+        Above 1, each iteration selects this many leaves (using virtual loss to spread them out), plays all their rollouts
+        together through Game.playout_batch, then backpropagates them. Forced pre-expansions still run one leaf at a time.
+        """
+        self.rollout_batch_virtual_loss: float = 1.0
+        """The loss temporarily credited to moves on the path of a leaf awaiting its batched rollout."""
+
+        self.use_progressive_widening: bool = False
+        """
+        If true, each node orders every player's moves by a cheap prior (Game.get_move_heuristic_value, then the killer
+        move cache average) and UCB only considers the first progressive_widening_coefficient * visits ^ progressive_widening_exponent
+        of them, so more moves are admitted as the node's visit count grows.
+        """
+        self.progressive_widening_min_moves: int = 2
+        """The fewest moves per player a node considers, even before it has been visited."""
+        self.progressive_widening_coefficient: float = 1.0
+        self.progressive_widening_exponent: float = 0.7
+
         self._killer_move_calculated_anti_ratio: float = self._calculate_killer_anti_ratio()
         # 4 outperformed 6 in 52-37 games, but might've been the flipped a-b
         # after fixing a-b and other tuning, 6 beat 4 28-21
@@ -148,11 +217,88 @@ class MctsDUCT(object):
             forcedPreExpansions: typing.List[typing.List[MoveBase | None]] | None = None,
             # maxDepth: int,  # he didn't use this
     ) -> MctsEngineSummary:
-        # Start out by creating a new root node (no tree reuse in this example)
-        root: MctsNode = MctsNode(None, context)
+        self.transposition_table = None
+        if self.use_transposition_table:
+            self.transposition_table = TranspositionTable(self.transposition_table_size)
+
+        root: MctsNode | None = None
+        reusedNodes = 0
+        reusedVisits = 0
+        if self.use_tree_reuse:
+            with self.performance_telemetry.monitor_telemetry('tree reuse'):
+                root, reusedNodes = self._try_reuse_tree(context, time.perf_counter() + maxTime * self.tree_reuse_max_time_ratio)
+            if root is not None:
+                reusedVisits = root.totalVisitCount
+
+        if root is None:
+            # Start out by creating a new root node
+            root = MctsNode(None, context)
+            if self.transposition_table is not None:
+                self.transposition_table.store(context.board_state.get_transposition_key(self.transposition_key_includes_move_history), root)
 
         self._killer_move_calculated_anti_ratio = self._calculate_killer_anti_ratio()
 
+        # We'll respect any limitations on max seconds and max iterations (don't care about max depth)
+        startTime = time.perf_counter()
+        stopTime: float = startTime + maxTime
+        if maxTime <= 0.0:
+            stopTime += 10000.0
+        maxIts: int = maxIterations
+        if maxIts < 0:
+            maxIts = 1000000000
+
+        parallelIterations = 0
+        parallelWorkers = 0
+        workers = self._start_root_parallel_workers(game, context, stopTime, maxIts, forcedPreExpansions)
+        try:
+            numIterations = self._run_search_iterations(root, game, context, stopTime, maxIts, forcedPreExpansions)
+
+            if workers:
+                with self.performance_telemetry.monitor_telemetry('root parallel merge'):
+                    parallelWorkers, parallelIterations = self._merge_root_parallel_results(root, workers, stopTime)
+        finally:
+            if workers:
+                MctsDUCT._stop_root_parallel_workers(workers)
+
+        duration = time.perf_counter() - startTime
+        self._iterations = numIterations
+
+        # Return the move we wish to play
+        summary = self.get_best_moves(root)
+        summary.duration = duration
+        summary.iterations = self._iterations
+        summary.trials_performed = self._trials_performed
+        summary.backprop_iter = self._backprop_iter
+        summary.nodes_explored = self._nodes_explored
+        summary.rollout_expansions = root.context.game._rollout_expansions
+        summary.biased_rollout_expansions = root.context.game._biased_rollout_expansions
+        if self.transposition_table is not None:
+            summary.transposition_lookups = self.transposition_table.lookups
+            summary.transposition_hits = self.transposition_table.hits
+        summary.reused_nodes = reusedNodes
+        summary.reused_visits = reusedVisits
+        summary.parallel_workers = parallelWorkers
+        summary.parallel_iterations = parallelIterations
+
+        if self.use_tree_reuse:
+            self._previous_roots.append(root)
+
+        self.last_summary = summary
+
+        return summary
+
+    def _run_search_iterations(
+            self,
+            root: MctsNode,
+            game: Game,
+            context: Context,
+            stopTime: float,
+            maxIts: int,
+            forcedPreExpansions: typing.List[typing.List[MoveBase | None]] | None,
+    ) -> int:
+        """
+        Runs MCTS iterations from root until the time or iteration limit, returning the number of iterations run.
+        """
         requiredPreExpansionExplorations = self.pre_expansion_minimum_forced_expansions
         preExpansionExplorationCounts = []
         remainingPreExpansionExplores = []
@@ -163,15 +309,6 @@ class MctsDUCT(object):
             preExpansionExplorationCounts = [0 for _ in remainingPreExpansionExplores]
             forcingPreExpands = True
 
-        # We'll respect any limitations on max seconds and max iterations (don't care about max depth)
-        startTime = time.perf_counter()
-        stopTime: float = startTime + maxTime
-        if maxTime <= 0.0:
-            stopTime += 10000.0
-        maxIts: int = maxIterations
-        if maxIts < 0:
-            maxIts = 1000000000
-
         numIterations: int = 0
 
         # Our main loop through MCTS iterations
@@ -180,8 +317,15 @@ class MctsDUCT(object):
             and ((numIterations & 3) != 0 or time.perf_counter() < stopTime)           # Respect time limit
             # and not self.wantsInterrupt()              # Respect GUI user clicking the pause button
         ):
+            self.performance_telemetry.begin_iteration()
+            if self.rollout_batch_size > 1 and not forcingPreExpands:
+                numIterations += self._run_batched_search_iterations(root, game, min(self.rollout_batch_size, maxIts - numIterations))
+                continue
+
             # Start in root node
             currentNode: MctsNode = root
+            # with transpositions a node can have several parents, so backprop follows the path actually taken rather than .parent
+            path: typing.List[MctsNode] = [root]
 
             with self.performance_telemetry.monitor_telemetry('root start pre-expand setup'):
                 forcedMoves = None
@@ -234,6 +378,7 @@ class MctsDUCT(object):
                     key = 'select_or_expand + force'
                 with self.performance_telemetry.monitor_telemetry(key):
                     currentNode = self.select_or_expand_child_node(currentNode, forcingPlayer, forcedMove)
+                path.append(currentNode)
                 if self.logAll and forcedMove is not None:
                     logbook.info(f'forced p{forcingPlayer} turn {currentNode.context.turn} move {str(forcedMove)} (actual moves {str(prevNode.legalMovesPerPlayer[0][prevNode.lastSelectedMovesPerPlayer[0]])} / {str(prevNode.legalMovesPerPlayer[1][prevNode.lastSelectedMovesPerPlayer[1]])})')
 
@@ -272,19 +417,14 @@ class MctsDUCT(object):
 
             # Backpropagate utilities through the tree
             with self.performance_telemetry.monitor_telemetry('backprop all inclusive'):
-                while currentNode is not None:
+                for currentNode in reversed(path):
                     if currentNode.totalVisitCount > 0:  # -1...?
                         # This node was not newly expanded in this iteration
                         for p, lastSelMove in enumerate(currentNode.lastSelectedMovesPerPlayer):
                             # logbook.info(f'backpropogating {str(contextEnd.board_state)} at t{contextEnd.turn} up through the tree to {str(currentNode.context.board_state)} t{currentNode.context.turn}')
                             if lastSelMove != NO_MOVE_FOUND:
                                 with self.performance_telemetry.monitor_telemetry('backprop normal node vals'):
-                                    if lastSelMove == len(currentNode.visitCounts[p]):
-                                        currentNode.visitCounts[p].append(0)
-                                        currentNode.scoreSums[p].append(0.0)
-
-                                    currentNode.visitCounts[p][lastSelMove] += 1
-                                    currentNode.scoreSums[p][lastSelMove] += utilities[p]
+                                    MctsDUCT.backprop_move_stats_jit(currentNode.visitCounts[p], currentNode.scoreSums[p], lastSelMove, utilities[p])
 
                                 curMove = currentNode.legalMovesPerPlayer[p][lastSelMove]
                                 if self.use_killer_move:
@@ -297,27 +437,299 @@ class MctsDUCT(object):
 
                     self._backprop_iter += 1
                     currentNode.totalVisitCount += 1
-                    currentNode = currentNode.parent
 
             # Increment iteration count
             numIterations += 1
 
-        duration = time.perf_counter() - startTime
-        self._iterations = numIterations
+        self.performance_telemetry.end_iterations()
+        return numIterations
 
-        # Return the move we wish to play
-        summary = self.get_best_moves(root)
-        summary.duration = duration
-        summary.iterations = self._iterations
-        summary.trials_performed = self._trials_performed
-        summary.backprop_iter = self._backprop_iter
-        summary.nodes_explored = self._nodes_explored
-        summary.rollout_expansions = root.context.game._rollout_expansions
-        summary.biased_rollout_expansions = root.context.game._biased_rollout_expansions
+    def _run_batched_search_iterations(self, root: MctsNode, game: Game, batchSize: int) -> int:
+        """
+        Selects batchSize leaves, plays their rollouts together and backpropagates the results.
+        Until its rollout comes back, each leaf's path is credited a visit and rollout_batch_virtual_loss, so the
+        following selections in the batch spread out instead of all descending to the same leaf.
 
-        self.last_summary = summary
+        @return: the number of iterations run.
+        """
+        virtualLoss = self.rollout_batch_virtual_loss
+        leaves: typing.List[typing.Tuple[typing.List[MctsNode], typing.List[typing.Tuple[int, ...]]]] = []
+        for _ in range(batchSize):
+            currentNode: MctsNode = root
+            path: typing.List[MctsNode] = [root]
+            selections: typing.List[typing.Tuple[int, ...]] = []
+            while not currentNode.context.trial.over():
+                with self.performance_telemetry.monitor_telemetry('select_or_expand'):
+                    nextNode = self.select_or_expand_child_node(currentNode)
+                selections.append(tuple(currentNode.lastSelectedMovesPerPlayer))
+                currentNode = nextNode
+                path.append(currentNode)
+                if currentNode.totalVisitCount == 0:
+                    break
 
-        return summary
+            with self.performance_telemetry.monitor_telemetry('batch virtual loss'):
+                for node, selected in zip(path, selections):
+                    for p, lastSelMove in enumerate(selected):
+                        if lastSelMove != NO_MOVE_FOUND:
+                            MctsDUCT.backprop_move_stats_jit(node.visitCounts[p], node.scoreSums[p], lastSelMove, -virtualLoss)
+                    node.totalVisitCount += 1
+
+            leaves.append((path, selections))
+
+        rolloutContexts = [path[-1].context for path, _ in leaves if not path[-1].context.trial.over()]
+        rolloutValues = []
+        if rolloutContexts:
+            with self.performance_telemetry.monitor_telemetry('playout batch'):
+                rolloutValues = game.playout_batch(
+                    rolloutContexts,
+                    maxNumBiasedActions=self.biased_playouts_allowed_per_trial,
+                    biasedMoveRatio=self.biased_move_ratio_while_available,
+                    maxNumPlayoutActions=self.rollout_depth,
+                    minRandomInitialMoves=self.min_random_playout_moves_initial
+                )
+            self._trials_performed += len(rolloutContexts)
+
+        rolloutIdx = 0
+        with self.performance_telemetry.monitor_telemetry('backprop all inclusive'):
+            for path, selections in leaves:
+                leafBoardState = path[-1].context.board_state
+                if path[-1].context.trial.over():
+                    value = leafBoardState.calculate_value_int()
+                else:
+                    value = rolloutValues[rolloutIdx]
+                    rolloutIdx += 1
+                utilities = self.get_player_utilities_n1_1_from_value(value, leafBoardState.initial_differential)
+
+                for node, selected in zip(path, selections):
+                    for p, lastSelMove in enumerate(selected):
+                        if lastSelMove == NO_MOVE_FOUND:
+                            continue
+                        node.scoreSums[p][lastSelMove] += utilities[p] + virtualLoss
+
+                        if self.use_killer_move:
+                            curMove = node.legalMovesPerPlayer[p][lastSelMove]
+                            moveVisits, moveScoreSum = self.killer_move_cache[p].get(curMove, NO_KILLER_VALUE_TUPLE)
+                            self.killer_move_cache[p][curMove] = (moveVisits + 1, moveScoreSum + utilities[p])
+                    self._backprop_iter += 1
+
+                # the leaf itself didn't get a virtual visit, so that it stays a leaf for the rest of the batch
+                path[-1].totalVisitCount += 1
+                self._backprop_iter += 1
+
+        return len(leaves)
+
+    def _start_root_parallel_workers(
+            self,
+            game: Game,
+            context: Context,
+            stopTime: float,
+            maxIts: int,
+            forcedPreExpansions: typing.List[typing.List[MoveBase | None]] | None,
+    ) -> typing.List[typing.Tuple[multiprocessing.Process, typing.Any]] | None:
+        """
+        Forks root_parallel_workers - 1 extra searches from the same context. Being forked, the workers inherit the map,
+        engine and board state instead of having them serialized, and only send their root stats back.
+
+        @return: the (process, result connection) of each worker, or None if the search should just run in-process,
+         because root parallelism is off, fork isn't available, there isn't enough time, or another search holds the workers.
+        """
+        numWorkers = self.root_parallel_workers - 1
+        if numWorkers <= 0 or stopTime - time.perf_counter() < self.root_parallel_min_time:
+            return None
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return None
+
+        if not _root_parallel_lock.acquire(blocking=False):
+            if self.should_log:
+                logbook.info('MCTS root parallel workers busy, searching in-process only')
+            return None
+
+        workers = []
+        try:
+            mpContext = multiprocessing.get_context('fork')
+            for _ in range(numWorkers):
+                resultConn, workerConn = mpContext.Pipe(duplex=False)
+                proc = mpContext.Process(
+                    target=_run_root_parallel_worker,
+                    args=(workerConn, self, game, context, stopTime, maxIts, forcedPreExpansions, random.randrange(2 ** 31)),
+                    daemon=True)
+                proc.start()
+                workerConn.close()
+                workers.append((proc, resultConn))
+        except Exception as ex:
+            logbook.error(f'MCTS failed to start root parallel workers, searching in-process only: {ex}')
+            MctsDUCT._stop_root_parallel_workers(workers)
+            return None
+
+        return workers
+
+    def _merge_root_parallel_results(
+            self,
+            root: MctsNode,
+            workers: typing.List[typing.Tuple[multiprocessing.Process, typing.Any]],
+            stopTime: float
+    ) -> typing.Tuple[int, int]:
+        """
+        Adds each worker's root visit counts and score sums into root. Workers that don't report back by the stop time
+        (plus root_parallel_result_grace) are ignored.
+
+        @return: the number of workers merged and the number of iterations they ran.
+        """
+        indexesByPlayer = [{MctsDUCT._get_move_key(move): i for i, move in enumerate(moves)} for moves in root.legalMovesPerPlayer]
+
+        mergedWorkers = 0
+        parallelIterations = 0
+        for proc, resultConn in workers:
+            try:
+                if not resultConn.poll(max(0.0, stopTime - time.perf_counter()) + self.root_parallel_result_grace):
+                    continue
+                result = resultConn.recv()
+            except (EOFError, OSError):
+                continue
+
+            if result is None:
+                continue
+
+            numIterations, moveKeys, visitCounts, scoreSums, totalVisitCount = result
+            for p, playerMoveKeys in enumerate(moveKeys):
+                rootVisits = root.visitCounts[p]
+                rootScores = root.scoreSums[p]
+                for moveKey, visits, scoreSum in zip(playerMoveKeys, visitCounts[p], scoreSums[p]):
+                    idx = indexesByPlayer[p].get(moveKey, -1)
+                    if idx < 0 or idx >= len(rootVisits):
+                        continue
+                    rootVisits[idx] += visits
+                    rootScores[idx] += scoreSum
+
+            root.totalVisitCount += totalVisitCount
+            mergedWorkers += 1
+            parallelIterations += numIterations
+
+        return mergedWorkers, parallelIterations
+
+    @staticmethod
+    def _stop_root_parallel_workers(workers: typing.List[typing.Tuple[multiprocessing.Process, typing.Any]]):
+        try:
+            for proc, resultConn in workers:
+                resultConn.close()
+                if proc.is_alive():
+                    proc.terminate()
+                proc.join(0.1)
+        finally:
+            _root_parallel_lock.release()
+
+    @staticmethod
+    def _get_move_key(move: MoveBase | None) -> typing.Tuple[int, int, bool] | None:
+        if move is None:
+            return None
+        return move.source.tile_index, move.dest.tile_index, move.move_half
+
+    def _try_reuse_tree(self, context: Context, deadline: float) -> typing.Tuple[MctsNode | None, int]:
+        """
+        Looks for a node in the previous searches' trees (their roots, or the root children for when the game has
+        advanced a turn) whose board state matches the new context, and turns it into the new root.
+
+        @param context: the context the new search starts from.
+        @param deadline: the time after which the rest of the reused tree is discarded rather than rebased.
+        @return: the new root (or None if nothing matched) and the number of nodes reused.
+        """
+        matchKey = MctsDUCT._get_tree_reuse_match_key(context.board_state)
+        for prevRoot in reversed(self._previous_roots):
+            candidates = [prevRoot]
+            candidates.extend(prevRoot.children.values())
+            for candidate in candidates:
+                if candidate.totalVisitCount == 0 or MctsDUCT._get_tree_reuse_match_key(candidate.context.board_state) != matchKey:
+                    continue
+
+                # the rest of the old tree can no longer be reached.
+                self._previous_roots.remove(prevRoot)
+                reusedNodes = self._rebase_reused_tree(candidate, context, deadline)
+                if self.should_log:
+                    logbook.info(f'MCTS reusing {reusedNodes} nodes with {candidate.totalVisitCount} visits from t{prevRoot.context.turn} tree for t{context.turn}')
+                return candidate, reusedNodes
+
+        return None, 0
+
+    @staticmethod
+    def _get_tree_reuse_match_key(boardState: ArmySimState) -> typing.Tuple:
+        return (
+            boardState.turn,
+            frozenset((tileIdx, simTile.army, simTile.player) for tileIdx, simTile in boardState.friendly_living_armies.items()),
+            frozenset((tileIdx, simTile.army, simTile.player) for tileIdx, simTile in boardState.enemy_living_armies.items()),
+        )
+
+    def _rebase_reused_tree(self, root: MctsNode, context: Context, deadline: float) -> int:
+        """
+        Re-applies the moves along every kept edge of a reused tree starting from the new root context, so that the
+        reused stats sit on board states derived from the actual board rather than from the old prediction of it.
+        The stats themselves are kept as-is, so they stay relative to the old root's value; close enough for move selection.
+        Edges whose moves are no longer legal, and everything past tree_reuse_max_nodes or the deadline, are dropped.
+
+        @return: the number of nodes kept.
+        """
+        root.parent = None
+        root.context = context
+        self._remap_reused_node_moves(root)
+
+        keptNodes = 1
+        seen = {id(root)}
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            if self.transposition_table is not None:
+                self.transposition_table.store(node.context.board_state.get_transposition_key(self.transposition_key_includes_move_history), node)
+
+            outOfBudget = keptNodes >= self.tree_reuse_max_nodes or time.perf_counter() > deadline
+            for boardMoves, child in list(node.children.items()):
+                if id(child) in seen:
+                    continue
+                if outOfBudget:
+                    del node.children[boardMoves]
+                    continue
+
+                childContext = Context(node.context)
+                childContext.game.apply(childContext, boardMoves, noClone=True)
+                child.parent = node
+                child.context = childContext
+                self._remap_reused_node_moves(child)
+
+                seen.add(id(child))
+                keptNodes += 1
+                queue.append(child)
+
+        return keptNodes
+
+    def _remap_reused_node_moves(self, node: MctsNode):
+        """
+        Regenerates the legal moves of a reused node from its (new) context and lines its per-move stats and children
+        up with them. Moves that are new get empty stats, moves that are no longer legal lose their stats and children.
+        """
+        boardState = node.context.board_state
+        newLegalMoves = [boardState.generate_friendly_moves(), boardState.generate_enemy_moves()]
+        for p, newMoves in enumerate(newLegalMoves):
+            oldVisits = node.visitCounts[p]
+            oldScores = node.scoreSums[p]
+            oldIndexes = {move: i for i, move in enumerate(node.legalMovesPerPlayer[p]) if i < len(oldVisits)}
+            newVisits = numpy.zeros(len(newMoves), dtype=numpy.int64)
+            newScores = numpy.zeros(len(newMoves), dtype=numpy.float64)
+            for i, move in enumerate(newMoves):
+                oldIdx = oldIndexes.get(move, -1)
+                if oldIdx >= 0:
+                    newVisits[i] = oldVisits[oldIdx]
+                    newScores[i] = oldScores[oldIdx]
+
+            node.legalMovesPerPlayer[p] = newMoves
+            node.visitCounts[p] = newVisits
+            node.scoreSums[p] = newScores
+            node.lastSelectedMovesPerPlayer[p] = NO_MOVE_FOUND
+        node.moves_ordered_by_prior = False
+
+        frMoves = set(newLegalMoves[0])
+        enMoves = set(newLegalMoves[1])
+        for boardMoves in list(node.children.keys()):
+            if boardMoves.playerMoves[0] not in frMoves or boardMoves.playerMoves[1] not in enMoves:
+                del node.children[boardMoves]
 
     def bench_random_stuff(self):
         # for i in range(-100, 100, 10):
@@ -354,6 +766,44 @@ class MctsDUCT(object):
         for entry in sorted(timer.current_move.event_list, key=lambda e: e.get_duration(), reverse=True):
             logbook.info(f'{entry.get_duration():.3f} {entry.event_name}'.lstrip('0'))
 
+    def get_progressive_widening_move_count(self, visitCount: int) -> int:
+        """
+        @param visitCount: the total visit count of the node being selected from.
+        @return: how many of each player's prior-ordered moves UCB may choose between.
+        """
+        return max(self.progressive_widening_min_moves, math.ceil(self.progressive_widening_coefficient * visitCount ** self.progressive_widening_exponent))
+
+    def _order_moves_by_prior(self, node: MctsNode):
+        """
+        Sorts each player's legal moves (and their stats) so that progressive widening admits the moves with the best
+        capture heuristic first, breaking ties by the killer move cache average. Ties beyond that keep generation order.
+        """
+        boardState = node.context.board_state
+        game = node.context.game
+        players = [game.friendly_player, game.enemy_player]
+        for p, moves in enumerate(node.legalMovesPerPlayer):
+            player = players[p]
+            otherPlayer = players[1 - p]
+            killerCache = self.killer_move_cache[p]
+
+            def prior(i: int) -> typing.Tuple[int, float]:
+                move = moves[i]
+                if move is None:
+                    return -1, 0.0
+                heuristicVal = Game.get_move_heuristic_value(player, otherPlayer, game.teams, move, boardState)
+                killerVisits, killerScoreSum = killerCache.get(move, NO_KILLER_VALUE_TUPLE)
+                if killerVisits > 0:
+                    return heuristicVal, killerScoreSum / killerVisits
+                return heuristicVal, 0.0
+
+            order = sorted(range(len(moves)), key=prior, reverse=True)
+            node.legalMovesPerPlayer[p] = [moves[i] for i in order]
+            node.visitCounts[p] = node.visitCounts[p][order]
+            node.scoreSums[p] = node.scoreSums[p][order]
+
+        node.lastSelectedMovesPerPlayer = [NO_MOVE_FOUND] * len(node.legalMovesPerPlayer)
+        node.moves_ordered_by_prior = True
+
     """
      * Selects child of the given "current" node according to UCB1 equation.
      * This method also implements the "Expansion" phase of MCTS, and creates
@@ -375,6 +825,12 @@ class MctsDUCT(object):
 
         twoParentLog: float = MctsDUCT.two_parent_log_jit(self.explore_factor, current.totalVisitCount)
 
+        numAdmitted: int = 1000000000
+        if self.use_progressive_widening and forcingPlayer < 0:
+            if not current.moves_ordered_by_prior:
+                self._order_moves_by_prior(current)
+            numAdmitted = self.get_progressive_widening_move_count(current.totalVisitCount)
+
         for p in range(numPlayers):
             bestMove: MoveBase | None = None
             bestValue: float = -1000000000  # negative inf
@@ -432,42 +888,34 @@ class MctsDUCT(object):
                                 f't{current.context.turn} p{p} NONE, index added {newNoneIndex} forced due to other player forcing.')
 
                         current.legalMovesPerPlayer[p].append(None)
+                        current.visitCounts[p] = numpy.append(current.visitCounts[p], 0)
+                        current.scoreSums[p] = numpy.append(current.scoreSums[p], 0.0)
                         numBestFound = 1
                         current.lastSelectedMovesPerPlayer[p] = newNoneIndex
 
             if numBestFound == 0:
-                for i, move in enumerate(current.legalMovesPerPlayer[p]):
-                    exploit: float = 1.0
-                    curMoveVisits = current.visitCounts[p][i]
-                    curMoveSumScore = -10000
-                    if curMoveVisits != 0:
-                        curMoveSumScore = current.scoreSums[p][i]
-                        exploit = curMoveSumScore / curMoveVisits
-
-                    if self.use_killer_move and move is not None:
-                        globalMoveVisits, globalMoveSumScore = self.killer_move_cache[p].get(move, NO_KILLER_VALUE_TUPLE)
-                        if globalMoveVisits > 0:
-                            exploit = exploit * self._killer_move_calculated_anti_ratio
-                            exploit += self.killer_move_exploit_ratio * (globalMoveSumScore / globalMoveVisits)
-
-                    explore: float = MctsDUCT.two_parent_log_explore(twoParentLog, childVisitCount=curMoveVisits)
-
-                    ucb1Value: float = exploit + explore
-
-                    if self.logAll:
-                        logbook.info(f't{current.context.turn} p{p} move {str(move)}, oit {exploit:.3f}, ore {explore:.3f}, ucb1 {ucb1Value:.3f} vs {bestValue:.3f} (exploit was scoreSum {curMoveSumScore} / visits {curMoveVisits})')
-                    if ucb1Value >= bestValue:
-                        if ucb1Value == bestValue:
-                            numBestFound += 1
-                            if self.get_rand_int() % numBestFound == 0:
-                                # this case implements random tie-breaking
-                                bestMove = move
-                                current.lastSelectedMovesPerPlayer[p] = i
-                        else:
-                            bestValue = ucb1Value
-                            bestMove = move
-                            numBestFound = 1
-                            current.lastSelectedMovesPerPlayer[p] = i
+                moves = current.legalMovesPerPlayer[p]
+                killerAverages = NO_KILLER_AVERAGES
+                if self.use_killer_move:
+                    killerAverages = self.get_killer_move_averages(p, moves, numAdmitted)
+
+                bestIdx = MctsDUCT.select_ucb1_jit(
+                    current.visitCounts[p],
+                    current.scoreSums[p],
+                    min(numAdmitted, len(moves)),
+                    twoParentLog,
+                    killerAverages,
+                    self.killer_move_exploit_ratio,
+                    self._killer_move_calculated_anti_ratio,
+                    self.get_rand_int())
+                current.lastSelectedMovesPerPlayer[p] = bestIdx
+                if bestIdx != NO_MOVE_FOUND:
+                    bestMove = moves[bestIdx]
+
+                if self.logAll and bestIdx != NO_MOVE_FOUND:
+                    visits = current.visitCounts[p][bestIdx]
+                    exploit = 1.0 if visits == 0 else current.scoreSums[p][bestIdx] / visits
+                    logbook.info(f't{current.context.turn} p{p} move {str(bestMove)}, index {bestIdx} selected (exploit {exploit:.3f} over {visits} visits)')
 
             if current.lastSelectedMovesPerPlayer[p] == NO_MOVE_FOUND:
                 logbook.error(f'NO MOVE FOUND p{p}, FORCING MOVE {str(forcedMove)}, LEGAL MOVES {str(current.legalMovesPerPlayer[p])}')
@@ -497,7 +945,19 @@ class MctsDUCT(object):
             context: Context = Context(current.context)  # clone
             context.game.apply(context, combinedMove, noClone=True)  # this board state is already cloned by the context ctor above.
 
+            transpositionKey = None
+            if self.transposition_table is not None:
+                transpositionKey = context.board_state.get_transposition_key(self.transposition_key_includes_move_history)
+                transposed: MctsNode | None = self.transposition_table.get(transpositionKey)
+                if transposed is not None:
+                    if self.logAll:
+                        logbook.info(f'transposed into existing node t{transposed.context.turn} board move {str(combinedMove)}  (node {str(transposed.context)})')
+                    current.children[combinedMove] = transposed
+                    return transposed
+
             newNode: MctsNode = MctsNode(current, context)
+            if transpositionKey is not None:
+                self.transposition_table.store(transpositionKey, newNode)
             current.children[combinedMove] = newNode
             self._nodes_explored += 1
 
@@ -729,6 +1189,83 @@ class MctsDUCT(object):
     def two_parent_log_explore(twoParentLog: float, childVisitCount: int) -> float:
         return math.sqrt(twoParentLog / max(1, childVisitCount))
 
+    @staticmethod
+    @jit(int64(int64[:], float64[:], int64, float64, float64[:], float64, float64, int64), nopython=True)
+    def select_ucb1_jit(
+            visitCounts: numpy.ndarray,
+            scoreSums: numpy.ndarray,
+            numMoves: int,
+            twoParentLog: float,
+            killerAverages: numpy.ndarray,
+            killerExploitRatio: float,
+            killerAntiRatio: float,
+            randInt: int,
+    ) -> int:
+        """
+        Scores the first numMoves moves of one player at a node with UCB1 and returns the index of the best one,
+        breaking exact ties uniformly with randInt. Returns NO_MOVE_FOUND if there are no moves to pick from.
+
+        @param killerAverages: empty to skip the killer move blend, otherwise per move the killer move cache average score, NaN where the cache has nothing.
+        """
+        if numMoves <= 0:
+            return NO_MOVE_FOUND
+
+        bestValue = -1000000000.0
+        numBestFound = 0
+        ucb1Values = numpy.empty(numMoves, dtype=numpy.float64)
+        useKiller = len(killerAverages) > 0
+        for i in range(numMoves):
+            visits = visitCounts[i]
+            exploit = 1.0
+            if visits != 0:
+                exploit = scoreSums[i] / visits
+
+            if useKiller and not math.isnan(killerAverages[i]):
+                exploit = exploit * killerAntiRatio + killerExploitRatio * killerAverages[i]
+
+            ucb1Value = exploit + math.sqrt(twoParentLog / max(1, visits))
+            ucb1Values[i] = ucb1Value
+            if ucb1Value > bestValue:
+                bestValue = ucb1Value
+                numBestFound = 1
+            elif ucb1Value == bestValue:
+                numBestFound += 1
+
+        if numBestFound == 0:
+            # every value was NaN
+            return NO_MOVE_FOUND
+
+        tieIdx = randInt % numBestFound
+        for i in range(numMoves):
+            if ucb1Values[i] == bestValue:
+                if tieIdx == 0:
+                    return i
+                tieIdx -= 1
+
+        return NO_MOVE_FOUND
+
+    @staticmethod
+    @jit(void(int64[:], float64[:], int64, float64), nopython=True)
+    def backprop_move_stats_jit(visitCounts: numpy.ndarray, scoreSums: numpy.ndarray, moveIdx: int, utility: float):
+        visitCounts[moveIdx] += 1
+        scoreSums[moveIdx] += utility
+
+    def get_killer_move_averages(self, p: int, moves: typing.List[MoveBase | None], numMoves: int) -> numpy.ndarray:
+        """
+        @return: the killer move cache average score of each of the first numMoves moves of player p, NaN where there is none.
+        """
+        killerCache = self.killer_move_cache[p]
+        averages = numpy.full(min(numMoves, len(moves)), numpy.nan, dtype=numpy.float64)
+        for i in range(len(averages)):
+            move = moves[i]
+            if move is None:
+                continue
+            globalMoveVisits, globalMoveSumScore = killerCache.get(move, NO_KILLER_VALUE_TUPLE)
+            if globalMoveVisits > 0:
+                averages[i] = globalMoveSumScore / globalMoveVisits
+
+        return averages
+
     def get_player_utilities_n1_1(self, boardState: ArmySimState) -> typing.List[float]:
         """
         Returns a list of floats (per player) between 1.0 and -1.0 where winning player is 1.0 and losing player is -1.0 and all players in between are in the range.
@@ -736,9 +1273,18 @@ class MctsDUCT(object):
         @param boardState:
         @return:
         """
-        netDifferential = boardState.calculate_value_int()
+        return self.get_player_utilities_n1_1_from_value(boardState.calculate_value_int(), boardState.initial_differential)
+
+    def get_player_utilities_n1_1_from_value(self, netDifferential: float, initialDifferential: int) -> typing.List[float]:
+        """
+        get_player_utilities_n1_1 for a board state value already calculated, eg by the batch rollout engine.
+
+        @param netDifferential: the calculate_value_int() of the board state.
+        @param initialDifferential: the initial_differential of the board state.
+        @return:
+        """
         if self.offset_initial_differential:
-            netDifferential -= boardState.initial_differential * 10
+            netDifferential -= initialDifferential * 10
 
         compressed = MctsDUCT.fast_tanh_scaled_jit(netDifferential, self.utility_compression_ratio)
         return [compressed, 0 - compressed]
@@ -775,6 +1321,41 @@ class MctsDUCT(object):
         return 1.0 - self.killer_move_exploit_ratio
 
 
+def _run_root_parallel_worker(
+        resultConn,
+        mcts: MctsDUCT,
+        game: Game,
+        context: Context,
+        stopTime: float,
+        maxIts: int,
+        forcedPreExpansions: typing.List[typing.List[MoveBase | None]] | None,
+        seed: int,
+):
+    """Runs in a forked child process; sends back (iterations, root move keys, visit counts, score sums, total visits), or None on failure."""
+    try:
+        random.seed(seed)
+        numpy.random.seed(seed)
+        mcts.should_log = False
+        mcts.logAll = False
+        mcts.use_tree_reuse = False
+        mcts.performance_telemetry.set_mode(TelemetryMode.Disabled)
+        mcts.reset()
+
+        root = MctsNode(None, Context(context))
+        if mcts.use_transposition_table:
+            mcts.transposition_table = TranspositionTable(mcts.transposition_table_size)
+            mcts.transposition_table.store(root.context.board_state.get_transposition_key(mcts.transposition_key_includes_move_history), root)
+
+        numIterations = mcts._run_search_iterations(root, game, root.context, stopTime, maxIts, forcedPreExpansions)
+
+        moveKeys = [[MctsDUCT._get_move_key(move) for move in moves] for moves in root.legalMovesPerPlayer]
+        resultConn.send((numIterations, moveKeys, root.visitCounts, root.scoreSums, root.totalVisitCount))
+    except BaseException:
+        resultConn.send(None)
+    finally:
+        resultConn.close()
+
+
 class MctsEngineSummary(object):
     def __init__(
             self,
@@ -889,8 +1470,24 @@ class MctsEngineSummary(object):
         self.nodes_explored: int = 0
         self.rollout_expansions = 0
         self.biased_rollout_expansions: int = 0
+        self.transposition_lookups: int = 0
+        self.transposition_hits: int = 0
+        self.reused_nodes: int = 0
+        """How many nodes were carried over from a previous search's tree."""
+        self.reused_visits: int = 0
+        """How many visits the root already had from a previous search's tree before this search started."""
+        self.parallel_workers: int = 0
+        """How many root parallel worker searches had their root stats merged into this one."""
+        self.parallel_iterations: int = 0
+        """How many iterations the merged root parallel workers ran, on top of iterations."""
         self.expanded_expected_score: float = score
 
+    @property
+    def transposition_hit_rate(self) -> float:
+        if self.transposition_lookups == 0:
+            return 0.0
+        return self.transposition_hits / self.transposition_lookups
+
     def __str__(self):
         return f'[{self.expected_score:.3f} : {self.expanded_expected_score:.3f} : {str(self.expanded_best_result_state)} : {str(self.best_result_state)}]'
 
@@ -898,9 +1495,6 @@ class MctsEngineSummary(object):
         return str(self)
 
 
-NO_MOVE_FOUND = 10000
-
-
 class MctsNode(object):
     def __init__(
             self,
@@ -938,11 +1532,11 @@ class MctsNode(object):
 
         self.legalMovesPerPlayer[1] = self.context.board_state.generate_enemy_moves()
 
-        self.visitCounts: typing.List[typing.List[int]] = [[0] * len(playerMoves) for playerMoves in self.legalMovesPerPlayer]
-        """ For every player, for every child move, a visit count """
+        self.visitCounts: typing.List[numpy.ndarray] = [numpy.zeros(len(playerMoves), dtype=numpy.int64) for playerMoves in self.legalMovesPerPlayer]
+        """ For every player, for every child move, a visit count (int64 array, see MctsDUCT.select_ucb1_jit) """
 
-        self.scoreSums: typing.List[typing.List[float]] = [[0.0] * len(playerMoves) for playerMoves in self.legalMovesPerPlayer]
-        """ For every player, for every child move, a sum of backpropagated scores """
+        self.scoreSums: typing.List[numpy.ndarray] = [numpy.zeros(len(playerMoves), dtype=numpy.float64) for playerMoves in self.legalMovesPerPlayer]
+        """ For every player, for every child move, a sum of backpropagated scores (float64 array) """
 
         self.lastSelectedMovesPerPlayer: typing.List[int] = [NO_MOVE_FOUND] * numPlayers
         """
@@ -950,6 +1544,9 @@ class MctsNode(object):
         that player in this node in the last (current) MCTS iteration.
         """
 
+        self.moves_ordered_by_prior: bool = False
+        """ Whether legalMovesPerPlayer has been sorted for progressive widening (see MctsDUCT._order_moves_by_prior) """
+
     def __str__(self):
         return str(self.context)
 
@@ -1049,6 +1646,8 @@ class Game(object):
 
         self._disablePositionalWinDetectionInRollouts: bool = disablePositionalWinDetectionInRollouts
 
+        self._batch_rollout_engine: BatchRolloutEngine | None = None
+
     def playout(
         self,
         context: Context,
@@ -1125,6 +1724,50 @@ class Game(object):
 
         return trial
 
+    def playout_batch(
+        self,
+        contexts: typing.List[Context],
+        maxNumBiasedActions: int,
+        maxNumPlayoutActions: int,
+        biasedMoveRatio: float,
+        minRandomInitialMoves: int
+    ) -> numpy.ndarray:
+        """
+        Runs one rollout from each context, with the same parameters as playout, but plays them all together in the
+        BatchRolloutEngine. Does NOT modify the contexts.
+        Falls back to running playout on a clone of each context when the rollouts need positional win detection,
+        which the batch engine doesn't model.
+
+        @param contexts:
+        @param maxNumBiasedActions:
+        @param maxNumPlayoutActions:
+        @param biasedMoveRatio:
+        @param minRandomInitialMoves:
+        @return: the calculate_value_int() of each rollout's final board state.
+        """
+        engine = contexts[0].engine
+        if not self._disablePositionalWinDetectionInRollouts and (engine.friendly_has_kill_threat or engine.enemy_has_kill_threat):
+            values = []
+            for context in contexts:
+                trial = self.playout(Context(context), maxNumBiasedActions, maxNumPlayoutActions, biasedMoveRatio, minRandomInitialMoves)
+                values.append(trial.context.board_state.calculate_value_int())
+            return numpy.array(values, dtype=numpy.float64)
+
+        if self._batch_rollout_engine is None or self._batch_rollout_engine.engine is not engine:
+            with self.telemetry.monitor_telemetry('batch rollout engine setup'):
+                self._batch_rollout_engine = BatchRolloutEngine(engine, self.teams)
+
+        with self.telemetry.monitor_telemetry('batch rollout'):
+            result = self._batch_rollout_engine.run(
+                [context.board_state for context in contexts],
+                maxNumBiasedActions=maxNumBiasedActions,
+                maxNumPlayoutActions=maxNumPlayoutActions,
+                biasedMoveRatio=biasedMoveRatio,
+                minRandomInitialMoves=minRandomInitialMoves)
+
+        self._rollout_expansions += result.expansions
+        return result.values
+
     def apply(self, context: Context, combinedMove: BoardMoves, noClone: bool = False):
         """
         Applies moves to a context, updating its turn and current board state.
@@ -1251,33 +1894,7 @@ class Game(object):
             if move is None:
                 continue  # none already covered by the existing bestVal = 0 and best = None
 
-            val = 2  # cap neutral
-            st = boardState.sim_tiles.get(move.dest.tile_index, None)
-
-            # new logic
-            p = move.dest.player
-            a = move.dest.army
-            if move.dest.isCity and not move.dest.isNeutral:
-                a += boardState.depth // 2  # TODO minus simTile.captured_turn, we're overestimating city amount when contesting cities in scrim
-            if st:
-                # then we're playing within the already scrimmed tiles. These are less valuable than running off into new territory.
-                val -= 2
-                p = st.player
-                a = st.army
-
-            if teams[p] == teams[player]:
-                val = 1
-            elif teams[p] == teams[otherPlayer]:
-                val = 6
-                if move.dest.isCity or move.dest.isGeneral:
-                    src = boardState.sim_tiles[move.source.tile_index]
-                    if src.army - 1 > a:
-                        val += 10
-                        if move.dest.isGeneral:
-                            val += 20
-            elif move.dest.isCity:
-                # else this is indeed a neutral capture, dont cap neutral cities
-                val = -20
+            val = Game.get_move_heuristic_value(player, otherPlayer, teams, move, boardState)
 
             if bestVal < val:
                 bestVal = val
@@ -1290,3 +1907,42 @@ class Game(object):
                     best = move
 
         return best
+
+    @staticmethod
+    def get_move_heuristic_value(
+        player: int,
+        otherPlayer: int,
+        teams: typing.List[int],
+        move: MoveBase,
+        boardState: ArmySimState,
+    ) -> int:
+        """The cheap capture-value heuristic that pick_best_move_heuristic maximizes. Higher is better."""
+        val = 2  # cap neutral
+        st = boardState.sim_tiles.get(move.dest.tile_index, None)
+
+        # new logic
+        p = move.dest.player
+        a = move.dest.army
+        if move.dest.isCity and not move.dest.isNeutral:
+            a += boardState.depth // 2  # TODO minus simTile.captured_turn, we're overestimating city amount when contesting cities in scrim
+        if st:
+            # then we're playing within the already scrimmed tiles. These are less valuable than running off into new territory.
+            val -= 2
+            p = st.player
+            a = st.army
+
+        if teams[p] == teams[player]:
+            val = 1
+        elif teams[p] == teams[otherPlayer]:
+            val = 6
+            if move.dest.isCity or move.dest.isGeneral:
+                src = boardState.sim_tiles[move.source.tile_index]
+                if src.army - 1 > a:
+                    val += 10
+                    if move.dest.isGeneral:
+                        val += 20
+        elif move.dest.isCity:
+            # else this is indeed a neutral capture, dont cap neutral cities
+            val = -20
+
+        return val
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import time
 import typing
+from enum import Enum
 
 
 NS_CONVERTER = (10 ** 9)
@@ -9,35 +10,96 @@ NS_CONVERTER = (10 ** 9)
 NO_ENTRY = (0, 0.0)
 
 
+class TelemetryMode(Enum):
+    Disabled = 0
+    """monitor_telemetry returns a shared scope that records nothing."""
+
+    Sampled = 1
+    """Only every sample_interval'th iteration (see begin_iteration) is timed, and its counts / durations are scaled up by sample_interval."""
+
+    Full = 2
+    """Every scope is timed."""
+
+
 class PerfScope(object):
-    def __init__(self, event_name: str, telemetry: PerformanceTelemetry):
+    def __init__(self, event_name: str, telemetry: PerformanceTelemetry, weight: int = 1):
         self.event_name = event_name
         self.event_start_time: float = time.time_ns() / NS_CONVERTER
         self.event_end_time: float | None = None
         self.parent: PerformanceTelemetry = telemetry
+        self.weight: int = weight
 
     def __enter__(self):
         return self
 
     def __exit__(self, *args, **kwargs):
-        self.parent.increment_key(self.event_name, time.time_ns() / NS_CONVERTER - self.event_start_time)
+        self.parent.increment_key(self.event_name, time.time_ns() / NS_CONVERTER - self.event_start_time, self.weight)
+
+
+class NoOpPerfScope(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        pass
+
+
+NO_OP_SCOPE = NoOpPerfScope()
 
 
 class PerformanceTelemetry(object):
-    def __init__(self):
+    def __init__(self, mode: TelemetryMode = TelemetryMode.Full, sampleInterval: int = 16):
         self.key_data: typing.Dict[str, typing.Tuple[int, float]] = {}
 
-    def monitor_telemetry(self, event_description: str) -> PerfScope:
+        self.mode: TelemetryMode = mode
+        self.sample_interval: int = sampleInterval
+        """In Sampled mode, one in this many iterations is timed."""
+
+        self._iteration: int = 0
+        self._recording: bool = True
+        self._weight: int = 1
+        self.set_mode(mode, sampleInterval)
+
+    def set_mode(self, mode: TelemetryMode, sampleInterval: int | None = None):
+        self.mode = mode
+        if sampleInterval is not None:
+            self.sample_interval = max(1, sampleInterval)
+        self._iteration = 0
+        self._recording = mode != TelemetryMode.Disabled
+        self._weight = 1
+
+    def begin_iteration(self):
+        """Marks the start of a hot loop iteration. In Sampled mode, decides whether this iteration's scopes are timed."""
+        if self.mode != TelemetryMode.Sampled:
+            return
+
+        self._iteration += 1
+        self._recording = self._iteration % self.sample_interval == 0
+        self._weight = self.sample_interval
+
+    def end_iterations(self):
+        """Marks the end of the hot loop, so that scopes outside of it are timed normally again in Sampled mode."""
+        if self.mode != TelemetryMode.Sampled:
+            return
+
+        self._recording = True
+        self._weight = 1
+
+    def monitor_telemetry(self, event_description: str) -> PerfScope | NoOpPerfScope:
         """
         @param event_description:
         @return:
         """
+        if not self._recording:
+            return NO_OP_SCOPE
 
-        return PerfScope(event_description, self)
+        return PerfScope(event_description, self, self._weight)
 
-    def increment_key(self, event_description: str, duration: float):
+    def increment_key(self, event_description: str, duration: float, weight: int = 1):
         curCount, curSumDuration = self.key_data.get(event_description, NO_ENTRY)
-        self.key_data[event_description] = (curCount + 1, curSumDuration + duration)
+        self.key_data[event_description] = (curCount + weight, curSumDuration + duration * weight)
 
     def get_data_sorted(self) -> typing.List[typing.Tuple[str, int, float]]:
         data = []
@@ -57,3 +119,20 @@ class PerformanceTelemetry(object):
         sorted = self.get_data_sorted()
         return '\n' + '\n'.join([f'{totalTime:00.4f} {count} - {eventName}' for eventName, count, totalTime in sorted])
 
+
+class NoOpPerformanceTelemetry(object):
+    """Stateless stand in for a Disabled PerformanceTelemetry. Has no set_mode, so a shared instance can't be switched on for everyone using it."""
+    __slots__ = ()
+
+    def begin_iteration(self):
+        pass
+
+    def end_iterations(self):
+        pass
+
+    def monitor_telemetry(self, event_description: str) -> NoOpPerfScope:
+        return NO_OP_SCOPE
+
+
+NO_OP_TELEMETRY = NoOpPerformanceTelemetry()
+"""Shared telemetry for callers that don't collect any, e.g. as a default argument."""
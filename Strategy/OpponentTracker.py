@@ -4,7 +4,7 @@ import logbook
 import typing
 
 from ArmyTracker import Army
-from StrategyModels import CycleStatsData, PlayerMoveCategory
+from StrategyModels import CycleStatsData, CycleStatsHistory, PlayerMoveCategory
 from ViewInfo import ViewInfo, TargetStyle
 from base.client.map import MapBase, TeamStats, Tile, Player, PLAYER_CHAR_BY_INDEX
 
@@ -294,7 +294,8 @@ class OpponentTracker(object):
         self.last_team_scores: typing.List[TeamStats | None] = [None for i in range(SAFE_PLAYERS_CAP)]
         """Track the last (or during scan, two turns ago) data for diffing what happened since two turns ago, useful for things like city changes since army increments only tick on even turns."""
 
-        self.team_cycle_stats_history: typing.List[typing.Dict[int, CycleStatsData | None]] = [None for i in range(SAFE_PLAYERS_CAP)]
+        self.team_cycle_stats_history: typing.List[CycleStatsHistory | None] = [None for i in range(SAFE_PLAYERS_CAP)]
+        """Per team, the CycleStatsData recorded at each cycle end turn. Bounded, see CycleStatsHistory."""
 
         self.current_team_cycle_stats: typing.List[CycleStatsData] = [None for i in range(SAFE_PLAYERS_CAP)]
 
@@ -340,7 +341,7 @@ class OpponentTracker(object):
             turn0Stats = CycleStatsData(team, teamPlayers)
             self.team_score_data_history[team][0] = TeamStats(0, 0, 0, len(turn0Stats.players), 0, 0, team, teamPlayers, teamPlayers, self.map.turn - 1, 0)
             self.current_team_cycle_stats[team] = turn0Stats
-            self.team_cycle_stats_history[team] = {}
+            self.team_cycle_stats_history[team] = CycleStatsHistory(team, teamPlayers)
             self._team_indexes.append(team)
             self.current_team_scores[team] = None
             self.last_team_scores[team] = None
@@ -3,6 +3,8 @@ from __future__ import annotations
 import typing
 from enum import Enum
 
+import numpy
+
 
 class CycleStatsData:
     def __init__(self, team: int, players: typing.List[int]):
@@ -96,6 +98,112 @@ class CycleStatsData:
         return f't{self.team} ({"+".join([str(p) for p in self.players])}) - {str(self)}'
 
 
+CYCLE_STATS_SCALAR_FIELDS: typing.List[str] = [
+    'tiles_gained',
+    'score_gained',
+    'cities_gained',
+    'moves_spent_capturing_fog_tiles',
+    'moves_spent_capturing_visible_tiles',
+    'moves_spent_gathering_fog_tiles',
+    'moves_spent_gathering_visible_tiles',
+    'approximate_army_gathered_this_cycle',
+    'army_annihilated_visible',
+    'army_annihilated_fog',
+    'army_annihilated_total',
+    'approximate_fog_army_available_total',
+    'approximate_fog_army_available_total_true',
+    'number_assumed_two_expansions_that_may_be_fog_distance',
+    'approximate_fog_city_army',
+]
+"""Every int stat on CycleStatsData, in CycleStatsHistory column order."""
+
+
+class CycleStatsHistory(object):
+    def __init__(self, team: int, players: typing.List[int], fullWindow: int = 6, capacity: int = 64):
+        """
+        One teams CycleStatsData by cycle end turn. The most recent fullWindow cycles are kept as the actual CycleStatsData
+        objects. Older cycles are archived as their scalar stats into a fixed size numpy ring buffer (and rebuilt as new
+        CycleStatsData when read), and anything older than capacity archived cycles is dropped, so a marathon game's
+        history stays bounded. Supports the dict operations OpponentTracker uses on it.
+
+        @param team:
+        @param players:
+        @param fullWindow: How many of the most recent cycles keep their full CycleStatsData objects.
+        @param capacity: How many older cycles the ring buffer keeps.
+        """
+        self.team: int = team
+        self.players: typing.List[int] = players
+        self.full_window: int = fullWindow
+
+        self._full_by_turn: typing.Dict[int, CycleStatsData] = {}
+        self._archived_turns: numpy.ndarray = numpy.full(capacity, -1, dtype=numpy.int64)
+        self._archived_stats: numpy.ndarray = numpy.zeros((capacity, len(CYCLE_STATS_SCALAR_FIELDS)), dtype=numpy.int64)
+        self._next_archive_slot: int = 0
+
+    def __setitem__(self, turn: int, stats: CycleStatsData):
+        slot = self._find_archive_slot(turn)
+        if slot >= 0:
+            if len(self._full_by_turn) >= self.full_window and turn < min(self._full_by_turn):
+                self._write_archive_slot(slot, turn, stats)
+                return
+            self._archived_turns[slot] = -1
+
+        self._full_by_turn[turn] = stats
+        if len(self._full_by_turn) > self.full_window:
+            oldestTurn = min(self._full_by_turn)
+            self._archive(oldestTurn, self._full_by_turn.pop(oldestTurn))
+
+    def __getitem__(self, turn: int) -> CycleStatsData:
+        stats = self.get(turn)
+        if stats is None:
+            raise KeyError(turn)
+        return stats
+
+    def __contains__(self, turn: int) -> bool:
+        return turn in self._full_by_turn or self._find_archive_slot(turn) >= 0
+
+    def __len__(self) -> int:
+        return len(self._full_by_turn) + int(numpy.count_nonzero(self._archived_turns >= 0))
+
+    def get(self, turn: int, default: CycleStatsData | None = None) -> CycleStatsData | None:
+        stats = self._full_by_turn.get(turn, None)
+        if stats is not None:
+            return stats
+
+        slot = self._find_archive_slot(turn)
+        if slot < 0:
+            return default
+
+        stats = CycleStatsData(self.team, self.players)
+        for field, val in zip(CYCLE_STATS_SCALAR_FIELDS, self._archived_stats[slot].tolist()):
+            setattr(stats, field, val)
+        return stats
+
+    def keys(self) -> typing.List[int]:
+        archived = self._archived_turns[self._archived_turns >= 0].tolist()
+        return sorted(archived + list(self._full_by_turn.keys()))
+
+    def items(self) -> typing.List[typing.Tuple[int, CycleStatsData]]:
+        return [(turn, self.get(turn)) for turn in self.keys()]
+
+    def _find_archive_slot(self, turn: int) -> int:
+        if turn is None or turn < 0:
+            return -1
+        slots = numpy.flatnonzero(self._archived_turns == turn)
+        if len(slots) == 0:
+            return -1
+        return int(slots[0])
+
+    def _archive(self, turn: int, stats: CycleStatsData):
+        slot = self._next_archive_slot
+        self._write_archive_slot(slot, turn, stats)
+        self._next_archive_slot = (slot + 1) % len(self._archived_turns)
+
+    def _write_archive_slot(self, slot: int, turn: int, stats: CycleStatsData):
+        self._archived_turns[slot] = turn
+        self._archived_stats[slot] = [getattr(stats, field) for field in CYCLE_STATS_SCALAR_FIELDS]
+
+
 class PlayerMoveCategory(Enum):
     FogGather = 1
     FogCapture = 2
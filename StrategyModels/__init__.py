@@ -1,2 +1,2 @@
-from .OpponentTrackerModels import CycleStatsData, PlayerMoveCategory
+from .OpponentTrackerModels import CycleStatsData, CycleStatsHistory, PlayerMoveCategory, CYCLE_STATS_SCALAR_FIELDS
 from .ExpansionPotential import *
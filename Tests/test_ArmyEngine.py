@@ -1,3 +1,4 @@
+import itertools
 import logbook
 import random
 import time
@@ -5,12 +6,15 @@ import traceback
 import typing
 from unittest import mock
 
+import numpy
+
 import SearchUtils
 from ArmyEngine import ArmyEngine, ArmySimResult
 from ArmyTracker import Army
 from BoardAnalyzer import BoardAnalyzer
-from Models import Move
-from Engine.ArmyEngineModels import calc_value_int, calc_econ_value, ArmySimState
+from Models import Move, MoveBase
+from Engine.ArmyEngineModels import calc_value_int, calc_econ_value, ArmySimState, SimTile, get_zobrist_key
+from Engine.ZeroSumSolver import ZeroSumSolver, prune_dominated
 from MctsLudii import MctsDUCT, MoveSelectionFunction
 from Path import Path
 from Sim.GameSimulator import GameSimulatorHost, GameSimulator
@@ -528,6 +532,83 @@ bTiles=20
                                 debug=debugMode
                             )
 
+    def test_engine__board_state_zobrist_hash_should_stay_consistent_through_random_playouts(self):
+        map, general, allyGen, enemyGen, enemyAllyGen = self.load_map_and_generals_2v2_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, 100)
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        frArmies = [Army(t) for t in map.players[general.player].tiles]
+        enArmies = [Army(t) for t in map.players[enemyGen.player].tiles]
+        armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=MctsDUCT())
+        armyEngine.allow_friendly_no_op = True
+        armyEngine.allow_enemy_no_op = True
+
+        baseState = armyEngine.get_base_board_state()
+        self.assertEqual(baseState.zobrist_hash, baseState.recalculate_zobrist_hash())
+
+        rand = random.Random(5)
+        for playout in range(30):
+            state = baseState
+            for depth in range(12):
+                frMove = armyEngine.generate_random_friendly_move(state)
+                enMove = armyEngine.generate_random_enemy_move(state)
+                parentHash = state.zobrist_hash
+                parentTiles = {idx: (st.army, st.player) for idx, st in state.sim_tiles.items()}
+
+                state = armyEngine.get_next_board_state(state.turn + 1, state, frMove, enMove, noClone=rand.random() < 0.2 and state is not baseState)
+                self.assertEqual(state.zobrist_hash, state.recalculate_zobrist_hash())
+                if state.parent_board is not None and state.parent_board.zobrist_hash == parentHash:
+                    # the parent must not have been touched by the child.
+                    self.assertEqual(parentTiles, {idx: (st.army, st.player) for idx, st in state.parent_board.sim_tiles.items()})
+
+        self.assertEqual(baseState.zobrist_hash, baseState.recalculate_zobrist_hash())
+
+        clone = baseState.clone()
+        self.assertEqual(baseState.zobrist_hash, clone.zobrist_hash)
+        self.assertEqual(baseState.friendly_living_armies_l, clone.friendly_living_armies_l)
+
+    def test_zobrist_keys_should_be_stable_and_distinct_per_tile_army_and_player(self):
+        keys = set()
+        for tileIdx in [0, 1, 1023, 1500]:
+            for player in [-1, 0, 1, 15]:
+                for army in itertools.chain(range(0, 300), [511, 512, 513, 1000, 5000, 100000]):
+                    key = get_zobrist_key(tileIdx, army, player)
+                    self.assertEqual(key, get_zobrist_key(tileIdx, army, player))
+                    self.assertGreaterEqual(key, 0)
+                    self.assertLess(key, 1 << 64)
+                    keys.add(key)
+
+        self.assertEqual(4 * 4 * 306, len(keys))
+
+    def test_engine__board_state_zobrist_hash_should_match_across_move_orders_and_revert_on_restore(self):
+        map, general, allyGen, enemyGen, enemyAllyGen = self.load_map_and_generals_2v2_from_string(SIM_VS_ENGINE_ALL_TILE_TYPES_TEST_MAP, 100)
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        frArmies = [Army(t) for t in map.players[general.player].tiles]
+        enArmies = [Army(t) for t in map.players[enemyGen.player].tiles]
+        armyEngine = ArmyEngine(map, frArmies, enArmies, boardAnalysis, mctsRunner=MctsDUCT())
+
+        baseState = armyEngine.get_base_board_state()
+        tileIdxs = list(baseState.sim_tiles.keys())[:3]
+        originals = [baseState.sim_tiles[idx] for idx in tileIdxs]
+        replacements = [SimTile(st.source_tile, st.army + 300 * (i + 1), st.player) for i, st in enumerate(originals)]
+
+        forward = baseState.clone()
+        backward = baseState.clone()
+        for idx, simTile in zip(tileIdxs, replacements):
+            forward.set_sim_tile(idx, simTile)
+        for idx, simTile in reversed(list(zip(tileIdxs, replacements))):
+            backward.set_sim_tile(idx, simTile)
+
+        self.assertNotEqual(baseState.zobrist_hash, forward.zobrist_hash)
+        self.assertEqual(forward.zobrist_hash, backward.zobrist_hash)
+        self.assertEqual(forward.zobrist_hash, forward.clone().recalculate_zobrist_hash())
+
+        for idx, simTile in zip(tileIdxs, originals):
+            forward.set_sim_tile(idx, simTile)
+        self.assertEqual(baseState.zobrist_hash, forward.zobrist_hash)
+
     def test_engine__validate_all_tile_types__test_one_off__two_deep(self):
         debugMode = not TestBase.GLOBAL_BYPASS_REAL_TIME_TEST and True
         turn = 100
@@ -2196,6 +2277,359 @@ bTiles=20
         for aMove, bMove in result.expected_best_moves:
             self.assertIsNotNone(bMove)
 
+    def test__brute_force_transposition_table_should_not_change_result(self):
+        openMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        cityMap = """
+|    |    |    |    |    
+          aG1          
+                    
+     aC5       C30  
+                    
+     a25       bC3     
+          C5   b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+
+        for mapName, rawMap in [('open', openMap), ('cities', cityMap)]:
+            for turn in [0, 1]:
+                with self.subTest(mapName=mapName, turn=turn):
+                    # the generated player tiles are random, so both searches need to run on the same map.
+                    map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102 + turn)
+                    self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+                    aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+                    boardAnalysis = BoardAnalyzer(map, general)
+                    boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                    results = []
+                    tables = []
+                    for useTable in [False, True]:
+                        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis)
+                        armyEngine.time_limit = 100000000000000.0
+                        armyEngine.allow_friendly_no_op = True
+                        armyEngine.allow_enemy_no_op = True
+                        armyEngine.use_brute_force_transposition_table = useTable
+                        results.append(armyEngine.scan(4, mcts=False))
+                        tables.append(armyEngine.brute_force_transposition_table)
+
+                    noTable, withTable = results
+                    self.assertIsNone(tables[0])
+                    if mapName == 'open':
+                        # the city scenario can finish 4 turns without ever revisiting a position, only require hits on the open map.
+                        self.assertGreater(tables[1].hits, 0)
+                    self.assertEqual(noTable.best_result_state.calculate_value_int(), withTable.best_result_state.calculate_value_int())
+                    self.assertEqual(noTable.net_economy_differential, withTable.net_economy_differential)
+                    # equal-valued lines tie-break nondeterministically so the lines themselves can differ, but a transposed
+                    # result must still be re-parented onto a line starting from the root (the scan throws on a discontinuous one).
+                    self.assertGreater(len(withTable.expected_best_moves), 0)
+                    curBoard = withTable.best_result_state
+                    while curBoard.parent_board is not None:
+                        self.assertEqual(curBoard.depth - 1, curBoard.parent_board.depth)
+                        curBoard = curBoard.parent_board
+                    self.assertEqual(0, curBoard.depth)
+
+    def test__brute_force_alpha_beta_should_match_exhaustive_value_with_fewer_iterations(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+     aC5       C30  
+                    
+     a25       bC3     
+          C5   b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+
+        for turn, useTable in [(0, False), (1, False), (0, True), (1, True)]:
+            with self.subTest(turn=turn, useTable=useTable):
+                # the generated player tiles are random, so both searches need to run on the same map.
+                map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102 + turn)
+                self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+                aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+                boardAnalysis = BoardAnalyzer(map, general)
+                boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+                results = []
+                iterations = []
+                for useAlphaBeta in [False, True]:
+                    armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis)
+                    armyEngine.time_limit = 100000000000000.0
+                    armyEngine.allow_friendly_no_op = True
+                    armyEngine.allow_enemy_no_op = True
+                    armyEngine.use_brute_force_transposition_table = useTable
+                    armyEngine.use_brute_force_alpha_beta = useAlphaBeta
+                    results.append(armyEngine.scan(4, mcts=False))
+                    iterations.append(armyEngine.iterations)
+                    if useAlphaBeta:
+                        self.assertEqual(4, armyEngine.brute_force_completed_depth)
+
+                exhaustive, alphaBeta = results
+                self.assertEqual(exhaustive.best_result_state.calculate_value_int(), alphaBeta.best_result_state.calculate_value_int())
+                self.assertEqual(exhaustive.net_economy_differential, alphaBeta.net_economy_differential)
+                self.assertEqual(4, len(alphaBeta.expected_best_moves))
+                # every iterative deepening iteration included, alpha-beta still visits fewer nodes.
+                self.assertLess(iterations[1], iterations[0])
+
+    def test__brute_force_alpha_beta_should_return_deepest_completed_iteration_at_deadline(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis)
+        armyEngine.time_limit = 0.05
+        armyEngine.allow_friendly_no_op = True
+        armyEngine.allow_enemy_no_op = True
+        armyEngine.use_brute_force_alpha_beta = True
+        result = armyEngine.scan(30, mcts=False)
+
+        completedDepth = armyEngine.brute_force_completed_depth
+        self.assertGreaterEqual(completedDepth, 1)
+        self.assertLess(completedDepth, 30)
+        self.assertEqual(completedDepth, len(result.expected_best_moves))
+        self.assertEqual(completedDepth, result.best_result_state_depth)
+
+    def test__zero_sum_solver_should_find_equilibria_and_prune_dominated_moves(self):
+        solver = ZeroSumSolver()
+
+        # rock paper scissors plus a row dominated by paper and a column dominated by rock
+        payoffs = numpy.array([
+            [0, -1, 1, 2],
+            [1, 0, -1, 3],
+            [-1, 1, 0, 1],
+            [0, -1, -2, 2],
+        ])
+        rows, cols = prune_dominated(payoffs)
+        self.assertEqual([0, 1, 2], list(rows))
+        self.assertEqual([0, 1, 2], list(cols))
+
+        solution = solver.solve(payoffs)
+        self.assertAlmostEqual(0.0, solution.value, places=6)
+        for rowProb, colProb in zip(solution.row_strategy[:3], solution.col_strategy[:3]):
+            self.assertAlmostEqual(1 / 3, rowProb, places=6)
+            self.assertAlmostEqual(1 / 3, colProb, places=6)
+        self.assertEqual(0.0, solution.row_strategy[3])
+        self.assertEqual(0.0, solution.col_strategy[3])
+        self.assertEqual(1, solver.linear_programs)
+
+        self.assertIs(solution, solver.solve(payoffs.copy()))
+        self.assertEqual(1, solver.cache_hits)
+
+        saddle = solver.solve(numpy.array([[3, 1], [4, 2]]))
+        self.assertEqual([0.0, 1.0], list(saddle.row_strategy))
+        self.assertEqual([0.0, 1.0], list(saddle.col_strategy))
+        self.assertEqual(2.0, saddle.value)
+        self.assertEqual(1, solver.linear_programs)
+
+    def test__brute_force_zero_sum_nash_solver_should_match_nashpy_result(self):
+        rawMap = """
+|    |    |    |    |
+          aG1
+
+     aC5       C30
+
+     a25       bC3
+          C5   b25
+
+
+
+          bG1
+|    |    |    |    |
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        # the generated player tiles are random, so both searches need to run on the same map.
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        results = []
+        for useZeroSumSolver in [False, True]:
+            armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis)
+            armyEngine.time_limit = 100000000000000.0
+            armyEngine.allow_friendly_no_op = True
+            armyEngine.allow_enemy_no_op = True
+            armyEngine.nash_depth = 2
+            armyEngine.use_zero_sum_nash_solver = useZeroSumSolver
+            results.append(armyEngine.scan(3, mcts=False))
+            if useZeroSumSolver:
+                self.assertGreater(armyEngine.zero_sum_solver.solves, 1)
+
+        nashpyResult, zeroSumResult = results
+        self.assertEqual(nashpyResult.best_result_state.calculate_value_int(), zeroSumResult.best_result_state.calculate_value_int())
+        self.assertEqual(nashpyResult.net_economy_differential, zeroSumResult.net_economy_differential)
+
+    def test__move_tables_should_intern_filtered_moves_and_reset_per_scan(self):
+        rawMap = """
+|    |    |    |    |
+          aG1
+
+
+
+     a25
+               b25
+
+
+
+          bG1
+|    |    |    |    |
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis)
+        armyEngine.allow_friendly_no_op = True
+        armyEngine.allow_enemy_no_op = False
+        armyEngine.force_enemy_towards = boardAnalysis.intergeneral_analysis.aMap
+        armyEngine.time_limit = 0.05
+        armyEngine.scan(1, mcts=True)
+
+        boardState = armyEngine.get_base_board_state()
+        frMoves = armyEngine.generate_friendly_moves(boardState)
+        enMoves = armyEngine.generate_enemy_moves(boardState)
+
+        expectedFr = [MoveBase(aArmy.tile, d) for d in aArmy.tile.movable if not d.isObstacle] + [None]
+        expectedEn = [MoveBase(bArmy.tile, d) for d in bArmy.tile.movable if not d.isObstacle and boardAnalysis.intergeneral_analysis.aMap[d] < boardAnalysis.intergeneral_analysis.aMap[bArmy.tile]]
+        self.assertEqual(expectedFr, frMoves)
+        self.assertEqual(expectedEn, enMoves)
+
+        # the same move objects come back, in fresh lists.
+        frMovesAgain = armyEngine.generate_friendly_moves(boardState)
+        self.assertIsNot(frMoves, frMovesAgain)
+        for move, moveAgain in zip(frMoves, frMovesAgain):
+            self.assertIs(move, moveAgain)
+
+        for _ in range(50):
+            frMove = armyEngine.generate_random_friendly_move(boardState)
+            enMove = armyEngine.generate_random_enemy_move(boardState)
+            self.assertTrue(any(m is frMove for m in frMoves))
+            self.assertTrue(any(m is enMove for m in enMoves))
+
+        armyEngine.allow_enemy_no_op = True
+        armyEngine.scan(1, mcts=True)
+        self.assertEqual(expectedEn + [None], armyEngine.generate_enemy_moves(boardState))
+
+    def test__mcts_transposition_table_should_share_nodes_and_report_hit_rate(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        mcts: MctsDUCT = MctsDUCT()
+        mcts.use_transposition_table = True
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+        armyEngine.time_limit = 100000000000000.0
+        armyEngine.iteration_limit = 1500
+        armyEngine.allow_friendly_no_op = True
+        armyEngine.allow_enemy_no_op = True
+        armyEngine.scan(4, mcts=True)
+
+        summary = mcts.last_summary
+        self.assertGreater(summary.transposition_hits, 0)
+        self.assertGreater(summary.transposition_hit_rate, 0.0)
+        self.assertLessEqual(summary.transposition_hit_rate, 1.0)
+        # every iteration passes through the root exactly once even when child nodes are shared between parents.
+        self.assertEqual(summary.iterations, summary.root_node.totalVisitCount)
+
+        sharedNodes = {}
+        toVisit = [summary.root_node]
+        while toVisit:
+            node = toVisit.pop()
+            for child in node.children.values():
+                if id(child) in sharedNodes:
+                    sharedNodes[id(child)] += 1
+                    continue
+                sharedNodes[id(child)] = 1
+                toVisit.append(child)
+        self.assertTrue(any(count > 1 for count in sharedNodes.values()))
+
     def test__mcts_respects_time_limit(self):
         debugMode = not TestBase.GLOBAL_BYPASS_REAL_TIME_TEST and False
         mapFile = 'GameContinuationEntries/army_scrim_defense_should_not_avoid_kill_threat___rgNPA7Zan---b--388.txtmap'
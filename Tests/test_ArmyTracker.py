@@ -7,6 +7,7 @@ import logbook
 import Gather
 import SearchUtils
 from Algorithms import MapSpanningUtils
+from MapMatrix import MapMatrix
 from Models import Move
 from Path import Path
 from Sim.GameSimulator import GameSimulatorHost, GameSimulator
@@ -2525,4 +2526,76 @@ a1   b1   b1   bG1
         self.assertEqual(frTo, frFrom.delta.toTile)
         self.assertEqual(frFrom, frTo.delta.fromTile)
         self.assertEqual(enTo, frTo.delta.toTile)
-        self.assertEqual(frTo, enTo.delta.fromTile)
\ No newline at end of file
+        self.assertEqual(frTo, enTo.delta.fromTile)
+    def test_valid_general_position_bits__should_match_raw_positions_and_limit_by_elimination(self):
+        mapFile = 'GameContinuationEntries/should_not_duplicate_fog_emergence_neutral_army___FUmJfZrMo---1--426.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 426, fill_out_tiles=True)
+
+        rawMap, _ = self.load_map_and_general(mapFile, respect_undiscovered=True, turn=426)
+
+        self.enable_search_time_limits_and_disable_debug_asserts()
+        simHost = GameSimulatorHost(map, player_with_viewer=general.player, playerMapVision=rawMap, allAfkExceptMapPlayer=True)
+        bot = self.get_debug_render_bot(simHost, general.player)
+        tracker = bot.armyTracker
+        playerMap = simHost.get_player_map(general.player)
+        enPlayer = enemyGeneral.player
+
+        validPositions = tracker.valid_general_positions_by_player[enPlayer]
+        before = [t for t in playerMap.tiles_by_index if validPositions.raw[t.tile_index]]
+        self.assertGreater(len(before), 1)
+        self.assertEqual(sum(1 << t.tile_index for t in before), tracker.get_valid_general_position_bits(enPlayer))
+
+        emergenceTile = next(t for t in playerMap.get_all_tiles() if t.visible and not t.isObstacle and any(not adj.visible and not adj.isObstacle for adj in t.movable))
+        elims = tracker._limit_general_position_to_within_tiles_and_distance(enPlayer, [emergenceTile], 15, alsoIncreaseEmergence=False)
+
+        after = [t for t in playerMap.tiles_by_index if validPositions.raw[t.tile_index]]
+        self.assertTrue(set(after).issubset(before))
+        self.assertEqual(len(before) - len(after), elims)
+        self.assertEqual(len(after), tracker.get_valid_general_position_bits(enPlayer).bit_count())
+        self.assertGreater(elims, 0)
+
+    def test_emergence_maps__should_scatter_concrete_emergence_and_decay_in_place(self):
+        mapFile = 'GameContinuationEntries/should_not_duplicate_fog_emergence_neutral_army___FUmJfZrMo---1--426.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 426, fill_out_tiles=True)
+
+        rawMap, _ = self.load_map_and_general(mapFile, respect_undiscovered=True, turn=426)
+
+        self.enable_search_time_limits_and_disable_debug_asserts()
+        simHost = GameSimulatorHost(map, player_with_viewer=general.player, playerMapVision=rawMap, allAfkExceptMapPlayer=True)
+        bot = self.get_debug_render_bot(simHost, general.player)
+        tracker = bot.armyTracker
+        playerMap = simHost.get_player_map(general.player)
+        enPlayer = enemyGeneral.player
+
+        tracker.emergenceLocationMap[enPlayer] = MapMatrix(playerMap, 1.0)
+        emergence = tracker.emergenceLocationMap[enPlayer]
+
+        emergingTile = next(t for t in playerMap.get_all_tiles() if t.visible and not t.isObstacle and any(not adj.visible and not adj.isObstacle for adj in t.movable))
+        emergingTile.player = enPlayer
+
+        expectedTiles = []
+
+        def foreachFunc(curTile: Tile, dist: int):
+            if dist == 0:
+                return
+            expectedTiles.append(curTile)
+            return curTile.visible and curTile != emergingTile
+
+        SearchUtils.breadth_first_foreach_dist(playerMap, [emergingTile], maxDepth=6, foreachFunc=foreachFunc)
+        self.assertGreater(len(expectedTiles), 0)
+
+        snapshot = tracker.get_emergence_snapshot(enPlayer)
+        tracker.notify_concrete_emergence(6, emergingTile, confidentFromGeneral=True)
+
+        expected = [1.0 / 5.0] * len(snapshot)
+        for tile in expectedTiles:
+            expected[tile.tile_index] += 500 / len(expectedTiles)
+        self.assertIs(emergence.raw, tracker.emergenceLocationMap[enPlayer].raw, 'decay should happen in place.')
+        for tileIndex, val in enumerate(expected):
+            self.assertAlmostEqual(val, emergence.raw[tileIndex])
+            self.assertEqual(1.0, snapshot[tileIndex], 'snapshots should not see later updates.')
+        self.assertAlmostEqual(0.2 + 500 / len(expectedTiles), tracker.get_tile_emergence_for_player(expectedTiles[0], enPlayer))
+
+        tracker.scale_emergence(enPlayer, 0.5)
+        for tileIndex, val in enumerate(expected):
+            self.assertAlmostEqual(val * 0.5, emergence.raw[tileIndex])
@@ -0,0 +1,159 @@
+import random
+
+from Algorithms.FastDisjointSet import FastDisjointSet, FastDisjointTileSetSum, FastDisjointTileIndexSetSum, FastDisjointTileSetMultiSum, FastDisjointTileIndexSetMultiSum
+from MapMatrix import MapMatrix
+from TestBase import TestBase
+
+
+class FastDisjointSetTests(TestBase):
+    def load_test_map(self):
+        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 250)
+        valueMatrix = MapMatrix(map, 0.0)
+        costMatrix = MapMatrix(map, 0.0)
+        for t in map.get_all_tiles():
+            valueMatrix.raw[t.tile_index] = float(t.army + t.x)
+            costMatrix.raw[t.tile_index] = float(t.y - 3)
+
+        return map, valueMatrix, costMatrix
+
+    def test_tile_index_set_should_find_and_merge(self):
+        map, valueMatrix, costMatrix = self.load_test_map()
+        a = map.GetTile(0, 0)
+        b = map.GetTile(1, 0)
+        c = map.GetTile(2, 0)
+        d = map.GetTile(3, 0)
+
+        forest = FastDisjointTileIndexSetSum(map, valueMatrix)
+        self.assertNotIn(a, forest)
+        self.assertEqual(a, forest[a])
+        self.assertIn(a, forest)
+        self.assertEqual(1, forest.n_subsets)
+
+        self.assertTrue(forest.merge(a, b))
+        self.assertFalse(forest.merge(b, a))
+        self.assertTrue(forest.merge(c, d))
+        self.assertFalse(forest.connected(a, d))
+        self.assertEqual(2, forest.n_subsets)
+
+        self.assertTrue(forest.merge(b, c))
+        self.assertTrue(forest.connected(a, d))
+        self.assertEqual(1, forest.n_subsets)
+        self.assertEqual(4, forest.subset_size(c))
+        self.assertEqual({a, b, c, d}, forest.subset_with_value(d)[0])
+        expectedSum = sum(valueMatrix.raw[t.tile_index] for t in [a, b, c, d])
+        self.assertAlmostEqual(expectedSum, forest.subset_value(a))
+        self.assertEqual([forest.subset_value(a)] * 2, forest.subset_values([b, d]))
+
+        root = forest[a]
+        for t in [a, b, c, d]:
+            self.assertEqual(root, forest[t])
+
+    def test_tile_index_set_should_halve_paths_on_find(self):
+        map, valueMatrix, costMatrix = self.load_test_map()
+        tiles = [map.GetTile(x, 0) for x in range(5)]
+
+        forest = FastDisjointTileIndexSetSum(map, valueMatrix)
+        for t in tiles:
+            forest.add(t)
+
+        # build the degenerate chain 4 -> 3 -> 2 -> 1 -> 0 directly, merge-by-size would never produce one.
+        idxs = [t.tile_index for t in tiles]
+        for child, parent in zip(idxs[1:], idxs):
+            forest._parents[child] = parent
+
+        def depth(i: int) -> int:
+            d = 0
+            while forest._parents[i] != i:
+                i = forest._parents[i]
+                d += 1
+            return d
+
+        self.assertEqual(4, depth(idxs[4]))
+        self.assertEqual(tiles[0], forest[tiles[4]])
+        self.assertEqual(2, depth(idxs[4]))
+        self.assertEqual(tiles[0], forest[tiles[4]])
+        self.assertEqual(1, depth(idxs[4]))
+        for t in tiles:
+            self.assertEqual(tiles[0], forest[t])
+
+    def test_tile_index_set_reset_should_empty_the_set(self):
+        map, valueMatrix, costMatrix = self.load_test_map()
+        a = map.GetTile(0, 0)
+        b = map.GetTile(1, 0)
+
+        forest = FastDisjointTileIndexSetMultiSum(map, [valueMatrix, costMatrix])
+        forest.merge(a, b)
+        self.assertEqual(2, len(forest))
+
+        forest.reset()
+        self.assertEqual(0, len(forest))
+        self.assertEqual(0, forest.n_subsets)
+        self.assertNotIn(a, forest)
+        self.assertFalse(forest.connected(a, b))
+        self.assertEqual(1, forest.subset_size(a))
+        self.assertEqual([valueMatrix.raw[b.tile_index], costMatrix.raw[b.tile_index]], forest.subset_values(b))
+
+    def test_tile_index_sets_should_match_dict_set_connectivity(self):
+        map, valueMatrix, costMatrix = self.load_test_map()
+        allTiles = list(map.get_all_tiles())
+
+        arrayForest = FastDisjointTileIndexSetSum(map, valueMatrix)
+        arrayMultiForest = FastDisjointTileIndexSetMultiSum(map, [valueMatrix, costMatrix])
+        rand = random.Random(6)
+        for iteration in range(30):
+            with self.subTest(iteration=iteration):
+                randTiles = rand.sample(allTiles, k=min(len(allTiles), rand.randint(1, 150)))
+                randSet = set(randTiles)
+
+                intForest = FastDisjointSet()
+                dictForest = FastDisjointTileSetSum(valueMatrix)
+                dictMultiForest = FastDisjointTileSetMultiSum([valueMatrix, costMatrix])
+                arrayForest.reset()
+                arrayMultiForest.reset()
+                for t in randTiles:
+                    intForest.add(t.tile_index)
+                    dictForest.add(t)
+                    dictMultiForest.add(t)
+                    arrayForest.add(t)
+                    arrayMultiForest.add(t)
+
+                for t in randTiles:
+                    adjInSet = [adj for adj in t.movable if adj in randSet]
+                    for adj in adjInSet:
+                        intForest.merge(t.tile_index, adj.tile_index)
+                        dictForest.merge(t, adj)
+                        dictMultiForest.merge(t, adj)
+                    if adjInSet:
+                        if rand.random() < 0.5:
+                            arrayForest.merge_many(adjInSet, into=t)
+                        else:
+                            for adj in adjInSet:
+                                arrayForest.merge(t, adj)
+                        arrayMultiForest.merge_many(adjInSet, into=t)
+
+                self.assertEqual(intForest.n_subsets, arrayForest.n_subsets)
+                self.assertEqual(intForest.n_subsets, arrayMultiForest.n_subsets)
+                self.assertEqual(
+                    sorted(sorted(s) for s in intForest.subsets()),
+                    sorted(sorted(t.tile_index for t in s) for s in arrayForest.subsets()))
+
+                for subset, val in dictForest.subsets_with_values():
+                    tile = next(iter(subset))
+                    arraySubset, arrayVal = arrayForest.subset_with_value(tile)
+                    self.assertEqual(subset, arraySubset)
+                    self.assertAlmostEqual(val, arrayVal, places=5)
+                    self.assertEqual(dictForest[tile], arrayForest[tile])
+
+                for subset, vals in dictMultiForest.subsets_with_values():
+                    tile = next(iter(subset))
+                    arraySubset, arrayVals = arrayMultiForest.subset_with_values(tile)
+                    self.assertEqual(subset, arraySubset)
+                    for val, arrayVal in zip(vals, arrayVals):
+                        self.assertAlmostEqual(val, arrayVal, places=5)
+
+                for _ in range(20):
+                    x = rand.choice(randTiles)
+                    y = rand.choice(randTiles)
+                    self.assertEqual(intForest.connected(x.tile_index, y.tile_index), arrayForest.connected(x, y))
+                    self.assertEqual(intForest.connected(x.tile_index, y.tile_index), arrayMultiForest.connected(x, y))
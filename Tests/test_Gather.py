@@ -1,3 +1,4 @@
+import itertools
 import logbook
 import time
 import typing
@@ -5,10 +6,15 @@ import typing
 import DebugHelper
 import Gather
 import SearchUtils
+from Gather import GatherDebug
+from Gather.GatherTreeArray import GatherTreeArray
+from MapMatrix import MapMatrix
+from Models import GatherTreeNode
 from Path import Path
 from Sim.GameSimulator import GameSimulatorHost
 from TestBase import TestBase
-from base.client.tile import TILE_EMPTY
+from base.client.map import MapBase
+from base.client.tile import TILE_EMPTY, Tile
 from bot_ek0x45 import EklipZBot
 
 
@@ -248,7 +254,111 @@ class GatherTests(TestBase):
                 viewInfo.gatherNodes = postPruneNodes
                 if debugMode:
                     self.render_view_info(map, viewInfo, f"valueGath {valueGathered}")
-    
+
+    def test_array_gather_tree_prune_should_match_node_prune(self):
+        mapFile = 'GameContinuationEntries/random_large_gather_test___reOqoXEp2---g--864.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 864, fill_out_tiles=True)
+
+        self.enable_search_time_limits_and_disable_debug_asserts()
+
+        rawMap, _ = self.load_map_and_general(mapFile, respect_undiscovered=True, turn=864)
+        simHost = GameSimulatorHost(map, player_with_viewer=general.player, playerMapVision=rawMap, allAfkExceptMapPlayer=True)
+        bot = simHost.get_bot(general.player)
+
+        move, valueGathered, turnsUsed, gatherNodes = bot.get_gather_to_target_tiles([general], 0.2, gatherTurns=60)
+        self.assertIsNotNone(gatherNodes)
+
+        teams = MapBase.get_teams_array(map)
+        for pruneTurns in [0, 1, 5, 15, 30, turnsUsed - 1, turnsUsed]:
+            for allowNegative in [True, False]:
+                with self.subTest(pruneTurns=pruneTurns, allowNegative=allowNegative):
+                    nodePruned = GatherTreeNode.clone_nodes(gatherNodes)
+                    arrayPruned = GatherTreeNode.clone_nodes(gatherNodes)
+                    nodeLookup = {n.tile: n for n in GatherTreeNode.iterate_tree_nodes(nodePruned)}
+                    arrayLookup = {n.tile: n for n in GatherTreeNode.iterate_tree_nodes(arrayPruned)}
+
+                    Gather.GatherPrune.USE_ARRAY_GATHER_TREES = False
+                    try:
+                        nodeTurns, nodeValue, _ = Gather.prune_mst_to_turns_with_values(nodePruned, pruneTurns, general.player, allowNegative=allowNegative, gatherTreeNodeLookupToPrune=nodeLookup)
+                        nodeRecalc = Gather.recalculate_tree_values([], nodePruned, None, general.player, teams)
+                    finally:
+                        Gather.GatherPrune.USE_ARRAY_GATHER_TREES = True
+
+                    arrayTurns, arrayValue, _ = Gather.prune_mst_to_turns_with_values(arrayPruned, pruneTurns, general.player, allowNegative=allowNegative, gatherTreeNodeLookupToPrune=arrayLookup)
+                    self.assertEqual(nodeTurns, arrayTurns)
+                    self.assertAlmostEqual(nodeValue, arrayValue, places=4)
+                    self.assertEqual(set(nodeLookup.keys()), set(arrayLookup.keys()))
+                    self.assertEqual(
+                        {n.tile for n in GatherTreeNode.iterate_tree_nodes(nodePruned)},
+                        {n.tile for n in GatherTreeNode.iterate_tree_nodes(arrayPruned)})
+
+                    arrayRecalc = Gather.recalculate_tree_values([], arrayPruned, None, general.player, teams)
+                    self.assertEqual(nodeRecalc[0], arrayRecalc[0])
+                    self.assertAlmostEqual(nodeRecalc[1], arrayRecalc[1], places=4)
+                    for nodeNode, arrayNode in zip(GatherTreeNode.iterate_tree_nodes(nodePruned), GatherTreeNode.iterate_tree_nodes(arrayPruned)):
+                        self.assertEqual(nodeNode.tile, arrayNode.tile)
+                        self.assertEqual(nodeNode.gatherTurns, arrayNode.gatherTurns)
+                        self.assertEqual(nodeNode.trunkDistance, arrayNode.trunkDistance)
+                        self.assertAlmostEqual(nodeNode.trunkValue, arrayNode.trunkValue, places=4)
+
+    def test_array_gather_tree_army_prunes_should_match_node_prunes(self):
+        mapFile = 'GameContinuationEntries/random_large_gather_test___reOqoXEp2---g--864.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 864, fill_out_tiles=True)
+
+        self.enable_search_time_limits_and_disable_debug_asserts()
+
+        rawMap, _ = self.load_map_and_general(mapFile, respect_undiscovered=True, turn=864)
+        simHost = GameSimulatorHost(map, player_with_viewer=general.player, playerMapVision=rawMap, allAfkExceptMapPlayer=True)
+        bot = simHost.get_bot(general.player)
+
+        move, valueGathered, turnsUsed, gatherNodes = bot.get_gather_to_target_tiles([general], 0.2, gatherTurns=60)
+        self.assertIsNotNone(gatherNodes)
+
+        teams = MapBase.get_teams_array(map)
+
+        def prune_army(nodes, army, pruneLargeTilesFirst):
+            return Gather.prune_mst_to_army_with_values(nodes, army, general.player, teams, map.turn, pruneLargeTilesFirst=pruneLargeTilesFirst)
+
+        def prune_army_per_turn(nodes, army, allowBranchPrune):
+            return Gather.prune_mst_to_max_army_per_turn_with_values(nodes, army, general.player, teams, allowBranchPrune=allowBranchPrune)
+
+        for pruneFunc in [prune_army, prune_army_per_turn]:
+            for army in [1, 50, valueGathered // 2, valueGathered - 10]:
+                for flag in [True, False]:
+                    with self.subTest(pruneFunc=pruneFunc.__name__, army=army, flag=flag):
+                        nodePruned = GatherTreeNode.clone_nodes(gatherNodes)
+                        arrayPruned = GatherTreeNode.clone_nodes(gatherNodes)
+
+                        Gather.GatherPrune.USE_ARRAY_GATHER_TREES = False
+                        try:
+                            nodeTurns, nodeValue, _ = pruneFunc(nodePruned, army, flag)
+                        finally:
+                            Gather.GatherPrune.USE_ARRAY_GATHER_TREES = True
+
+                        arrayTurns, arrayValue, _ = pruneFunc(arrayPruned, army, flag)
+                        self.assertEqual(nodeTurns, arrayTurns)
+                        self.assertAlmostEqual(nodeValue, arrayValue, places=4)
+                        self.assertEqual(
+                            {n.tile for n in GatherTreeNode.iterate_tree_nodes(nodePruned)},
+                            {n.tile for n in GatherTreeNode.iterate_tree_nodes(arrayPruned)})
+
+    def test_array_gather_tree_should_flatten_large_trees_and_reject_cycles(self):
+        tiles = [Tile(i % 100, i // 100) for i in range(2500)]
+        nodes = [GatherTreeNode(tiles[0], None)]
+        for i in range(1, len(tiles)):
+            node = GatherTreeNode(tiles[i], tiles[i - 1])
+            node.toGather = nodes[-1]
+            nodes[-1].children.append(node)
+            nodes.append(node)
+
+        tree = GatherTreeArray.from_nodes([nodes[0]])
+        self.assertEqual(len(tiles), len(tree.nodes))
+        self.assertEqual(len(tiles) - 2, tree.parent[-1])
+
+        nodes[-1].children.append(nodes[1000])
+        with self.assertRaises(AssertionError):
+            GatherTreeArray.from_nodes([nodes[0]])
+
     def test_going_all_in_on_army_advantage_should_gather_at_the_opp_general__LARGE_gather(self):
         debugMode = not TestBase.GLOBAL_BYPASS_REAL_TIME_TEST and True
         cases = [
@@ -961,3 +1071,63 @@ b1   b1   b1   b1   b1   b1   bG1
         self.assertNoFriendliesKilled(map, general)
 
         self.assertGatheredNear(simHost, general.player, 4, 15, 3, requiredAvgTileValue=1.4)
+
+    def test_chatgpt_dp_gather_should_return_connected_rooted_set_without_mutating_values(self):
+        mapFile = 'GameContinuationEntries/should_gather_backwards_tiles_first___SeEsqyvhl---0--200.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 200, fill_out_tiles=True)
+
+        valueMatrix = MapMatrix(map, 0.0)
+        for tile in map.pathable_tiles:
+            if tile.player == general.player:
+                valueMatrix.raw[tile.tile_index] = tile.army - 1
+            else:
+                valueMatrix.raw[tile.tile_index] = -1.0
+        valuesBefore = list(valueMatrix.raw)
+
+        for turns in [3, 10, 25]:
+            with self.subTest(turns=turns):
+                value, tiles = Gather.cutesy_chatgpt_gather(map, turns, {general}, general.player, valueMatrix)
+
+                self.assertEqual(valuesBefore, list(valueMatrix.raw))
+                self.assertIn(general, tiles)
+                self.assertLessEqual(len(tiles), turns + 1)
+                self.assertGreater(value, 1000)
+                # the root slot is seeded with a flat 1000, the rest is just the sum of the included non-root tile values
+                self.assertAlmostEqual(value - 1000, sum(valueMatrix.raw[t.tile_index] for t in tiles if t != general))
+                GatherDebug.assertConnected(tiles)
+
+    def test_exact_steiner_gather_should_match_brute_force_on_small_regions(self):
+        mapFile = 'GameContinuationEntries/should_gather_backwards_tiles_first___SeEsqyvhl---0--200.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 200, fill_out_tiles=True)
+
+        region = {general}
+        for _ in range(3):
+            region.update([mv for t in list(region) for mv in t.movable if mv in map.pathable_tiles])
+
+        others = sorted((t for t in region if t != general), key=lambda t: t.tile_index)
+        valueMatrix = MapMatrix(map, 0.0)
+        for i, tile in enumerate(others):
+            valueMatrix.raw[tile.tile_index] = float((i * 7) % 11 - 4)
+
+        Gather.clear_exact_steiner_gather_cache()
+        for turns in [2, 4, 6]:
+            with self.subTest(turns=turns):
+                bruteBest = 0.0
+                for count in range(1, turns + 1):
+                    for combo in itertools.combinations(others, count):
+                        tiles = {general}.union(combo)
+                        try:
+                            GatherDebug.assertConnected(tiles)
+                        except Exception:
+                            continue
+                        bruteBest = max(bruteBest, sum(valueMatrix.raw[t.tile_index] - 1 for t in combo))
+
+                value, tiles, provedOptimal = Gather.find_exact_best_steiner_gather(map, turns, {general}, general.player, valueMatrix, tilesToInclude=region)
+                self.assertTrue(provedOptimal)
+                self.assertEqual(bruteBest, value)
+                self.assertIn(general, tiles)
+                self.assertLessEqual(len(tiles) - 1, turns)
+                GatherDebug.assertConnected(tiles)
+
+                cachedValue, cachedTiles, cachedOptimal = Gather.find_exact_best_steiner_gather(map, turns, {general}, general.player, valueMatrix, tilesToInclude=region)
+                self.assertEqual((value, tiles, True), (cachedValue, cachedTiles, cachedOptimal))
@@ -5,6 +5,8 @@ import typing
 import DebugHelper
 import Gather
 import SearchUtils
+from Gather import GatherDebug
+from MapMatrix import MapMatrix
 from Path import Path
 from Sim.GameSimulator import GameSimulatorHost
 from TestBase import TestBase
@@ -294,4 +296,54 @@ player_index=0
 
                 # gather for 4, need to cap 3 right, need to cap 9 down (we did include en general here)
                 self.assertEqual(19, plan.length)
-                self.assertEqual(round(13 * 2.2, 3), round(plan.econValue, 3))
\ No newline at end of file
+                self.assertEqual(round(13 * 2.2, 3), round(plan.econValue, 3))
+
+    def test_plan_aggregates_should_be_maintained_incrementally(self):
+        mapFile = 'GameContinuationEntries/should_recognize_gather_into_top_path_is_best___wQWfDjiGX---0--250.txtmap'
+        map, general, enemyGeneral = self.load_map_and_generals(mapFile, 250, fill_out_tiles=True)
+        self.enable_search_time_limits_and_disable_debug_asserts()
+
+        negativeTiles = set()
+        value, turns, nodes = Gather.knapsack_max_gather_with_values(
+            map,
+            {general},
+            20,
+            targetArmy=-1,
+            negativeTiles=negativeTiles,
+            searchingPlayer=general.player,
+            useTrueValueGathered=True,
+            includeGatherTreeNodesThatGatherNegative=True,
+            shouldLog=False)
+
+        priorityMatrix = MapMatrix(map, 0.0)
+        plan = Gather.GatherCapturePlan.build_from_root_nodes(map, nodes, negativeTiles, general.player, priorityMatrix=priorityMatrix, includeGatherPriorityAsEconValues=True)
+        self.assertFalse(plan.is_dirty())
+
+        startLength = plan.length
+        startArmy = plan.gathered_army
+        plan.pop_first_move()
+        self.assertEqual(startLength - 1, plan.length)
+        self.assertEqual(startArmy, plan.gathered_army)
+        self.assertEqual(plan.length, sum(n.gatherTurns for n in plan.root_nodes))
+
+        startPoints = plan.gather_capture_points
+        startEcon = plan.econValue
+        nonRoots = [n for n in Gather.GatherTreeNode.iterate_tree_nodes(plan.root_nodes) if n.toGather is not None]
+        for n in nonRoots:
+            priorityMatrix.raw[n.tile.tile_index] = 0.5
+        plan.update_priority_values(priorityMatrix, [n.tile for n in nonRoots])
+        self.assertAlmostEqual(startPoints + 0.5 * len(nonRoots), plan.gather_capture_points)
+        self.assertAlmostEqual(startEcon + 0.5 * len(nonRoots), plan.econValue)
+        self.assertAlmostEqual(plan.gather_capture_points, sum(n.points for n in plan.root_nodes))
+
+        leafParent = next(n for n in nonRoots if n.children)
+        plan.remove_subtree(leafParent)
+        self.assertEqual(plan.length, sum(n.gatherTurns for n in plan.root_nodes))
+        self.assertEqual(plan.gathered_army, sum(n.value for n in plan.root_nodes))
+        self.assertAlmostEqual(plan.gather_capture_points, sum(n.points for n in plan.root_nodes))
+        self.assertNotIn(leafParent.tile, plan.tileSet)
+
+        general.army += 5
+        self.assertTrue(plan.is_dirty())
+        plan.mark_clean()
+        self.assertFalse(plan.is_dirty())
@@ -1,7 +1,11 @@
 from ArmyEngine import ArmyEngine, ArmySimResult
 from BoardAnalyzer import BoardAnalyzer
 from Engine.ArmyEngineModels import SimTile
+from Models import MoveBase
 from MctsLudii import MctsDUCT, Context, Game
+from PerformanceTelemetry import TelemetryMode, NO_OP_TELEMETRY, NO_OP_SCOPE
+import MctsLudii
+import numpy
 from TestBase import TestBase
 
 
@@ -202,3 +206,384 @@ bTiles=20
 
         self.assertEqual(bArmy.tile, bestEn.source)
         self.assertEqual(expectedBDest, bestEn.dest)
+
+    def test_tree_reuse__should_promote_predicted_child_and_rebase_it_onto_new_board_state(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        mcts: MctsDUCT = MctsDUCT()
+        mcts.use_tree_reuse = True
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+        armyEngine.time_limit = 100000000000000.0
+        armyEngine.iteration_limit = 800
+        armyEngine.allow_friendly_no_op = True
+        armyEngine.allow_enemy_no_op = True
+        armyEngine.scan(4, mcts=True)
+
+        firstSummary = mcts.last_summary
+        self.assertEqual(0, firstSummary.reused_visits)
+        predictedMoves = firstSummary.best_moves[0]
+        predictedNode = firstSummary.root_node.children[predictedMoves]
+        oldContexts = {}
+        toVisit = [predictedNode]
+        while toVisit:
+            node = toVisit.pop()
+            oldContexts[id(node.context)] = node.context
+            toVisit.extend(node.children.values())
+
+        # the moves get played for real; the next search starts from a freshly generated board state.
+        baseState = armyEngine.get_base_board_state()
+        nextState = armyEngine.get_next_board_state(baseState.turn + 1, baseState, predictedMoves.playerMoves[0], predictedMoves.playerMoves[1])
+        game = Game(general.player, enemyGen.player, [0, 1], allowRandomRepetitions=False, allowRandomNoOps=False, disablePositionalWinDetectionInRollouts=True, performanceTelemetry=mcts.performance_telemetry)
+        context = Context()
+        context.set_initial_board_state(armyEngine, nextState, game, map.turn + 1)
+
+        mcts.reset()
+        summary = mcts.select_action(game, context, maxTime=100000.0, maxIterations=200)
+
+        self.assertIs(predictedNode, summary.root_node)
+        self.assertIs(context, summary.root_node.context)
+        self.assertGreater(summary.reused_nodes, 1)
+        self.assertGreater(summary.reused_visits, 0)
+        self.assertEqual(summary.reused_visits + summary.iterations, summary.root_node.totalVisitCount)
+
+        toVisit = [summary.root_node]
+        while toVisit:
+            node = toVisit.pop()
+            self.assertNotIn(id(node.context), oldContexts)
+            for p in range(2):
+                self.assertLessEqual(sum(node.visitCounts[p]), node.totalVisitCount)
+            for boardMoves, child in node.children.items():
+                self.assertEqual(node.context.board_state.turn + 1, child.context.board_state.turn)
+                self.assertIn(boardMoves.playerMoves[0], node.legalMovesPerPlayer[0])
+                self.assertIn(boardMoves.playerMoves[1], node.legalMovesPerPlayer[1])
+                toVisit.append(child)
+
+    def test_root_parallel__should_merge_worker_root_stats_and_fall_back_in_process_when_busy(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        mcts: MctsDUCT = MctsDUCT()
+        mcts.root_parallel_workers = 3
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+
+        def run_search():
+            game = Game(general.player, enemyGen.player, [0, 1], allowRandomRepetitions=False, allowRandomNoOps=False, disablePositionalWinDetectionInRollouts=True, performanceTelemetry=mcts.performance_telemetry)
+            context = Context()
+            context.set_initial_board_state(armyEngine, armyEngine.get_base_board_state(), game, map.turn)
+            mcts.reset()
+            return mcts.select_action(game, context, maxTime=100000.0, maxIterations=150)
+
+        summary = run_search()
+        self.assertEqual(2, summary.parallel_workers)
+        self.assertEqual(300, summary.parallel_iterations)
+        root = summary.root_node
+        self.assertEqual(summary.iterations + summary.parallel_iterations, root.totalVisitCount)
+        for p in range(2):
+            self.assertLessEqual(sum(root.visitCounts[p]), root.totalVisitCount)
+            self.assertGreater(sum(root.visitCounts[p]), summary.iterations)
+
+        with MctsLudii._root_parallel_lock:
+            summary = run_search()
+        self.assertEqual(0, summary.parallel_workers)
+        self.assertEqual(0, summary.parallel_iterations)
+        self.assertEqual(summary.iterations, summary.root_node.totalVisitCount)
+
+    def test_playout_batch__moves_played_should_replay_through_the_engine_to_the_same_values(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+     aC5       C30  
+                    
+     a25       bC3     
+          C5   b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        mcts: MctsDUCT = MctsDUCT()
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+        armyEngine.time_limit = 100000000000000.0
+        armyEngine.iteration_limit = 300
+        armyEngine.scan(15, mcts=True)
+
+        # roll out from board states of varying depth throughout the tree
+        contexts = []
+        toVisit = [mcts.last_summary.root_node]
+        while toVisit:
+            node = toVisit.pop()
+            contexts.append(node.context)
+            toVisit.extend(node.children.values())
+        self.assertGreater(len(contexts), 50)
+
+        game = contexts[0].game
+        for biasedMoveRatio in [0.0, 0.5, 1.0]:
+            with self.subTest(biasedMoveRatio=biasedMoveRatio):
+                game._batch_rollout_engine = None
+                values = game.playout_batch(contexts, maxNumBiasedActions=7, maxNumPlayoutActions=30, biasedMoveRatio=biasedMoveRatio, minRandomInitialMoves=1)
+                result = game._batch_rollout_engine.run([c.board_state for c in contexts], maxNumBiasedActions=7, maxNumPlayoutActions=30, biasedMoveRatio=biasedMoveRatio, minRandomInitialMoves=1)
+                self.assertEqual(len(contexts), len(values))
+
+                for r, context in enumerate(contexts):
+                    boardState = context.board_state.clone()
+                    for step in range(result.steps[r]):
+                        moves = []
+                        for src, dest in result.moves[r, step]:
+                            moves.append(None if src < 0 else MoveBase(map.tiles_by_index[src], map.tiles_by_index[dest]))
+                        boardState = armyEngine.get_next_board_state(boardState.turn + 1, boardState, moves[0], moves[1])
+
+                    self.assertEqual(boardState.calculate_value_int(), result.values[r])
+                    self.assertEqual(context.board_state.turn + result.steps[r], boardState.turn)
+                    if result.steps[r] < 30:
+                        self.assertTrue(
+                            boardState.captures_enemy
+                            or boardState.captured_by_enemy
+                            or (boardState.kills_all_friendly_armies and boardState.kills_all_enemy_armies))
+
+    def test_rollout_batch_size__should_backpropagate_every_leaf_and_remove_virtual_loss(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        mcts: MctsDUCT = MctsDUCT()
+        mcts.rollout_batch_size = 8
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+        armyEngine.time_limit = 100000000000000.0
+        armyEngine.iteration_limit = 1000
+        armyEngine.scan(4, mcts=True)
+
+        summary = mcts.last_summary
+        self.assertEqual(1000, summary.iterations)
+        self.assertEqual(1000, summary.root_node.totalVisitCount)
+        self.assertGreater(summary.rollout_expansions, 1000)
+
+        toVisit = [summary.root_node]
+        while toVisit:
+            node = toVisit.pop()
+            for p in range(2):
+                self.assertLessEqual(sum(node.visitCounts[p]), node.totalVisitCount)
+                for visits, scoreSum in zip(node.visitCounts[p], node.scoreSums[p]):
+                    # any virtual loss left behind would drag the average below -1
+                    self.assertLessEqual(abs(scoreSum), visits + 0.0001)
+            toVisit.extend(node.children.values())
+
+    def test_performance_telemetry_modes__should_skip_or_sample_and_extrapolate_search_timing(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        self.assertEqual(MctsLudii.MCTS_TELEMETRY_MODE, MctsDUCT().performance_telemetry.mode)
+
+        for mode in [TelemetryMode.Disabled, TelemetryMode.Sampled, TelemetryMode.Full]:
+            with self.subTest(mode=mode):
+                mcts: MctsDUCT = MctsDUCT()
+                mcts.performance_telemetry.set_mode(mode, sampleInterval=10)
+                armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+                armyEngine.time_limit = 100000000000000.0
+                armyEngine.iteration_limit = 500
+                armyEngine.scan(4, mcts=True)
+
+                keyData = mcts.performance_telemetry.key_data
+                if mode == TelemetryMode.Disabled:
+                    self.assertEqual({}, keyData)
+                    continue
+
+                utilityCalcs, utilityTime = keyData['utilities calc']
+                self.assertGreater(utilityTime, 0.0)
+                # when sampled, 50 of the 500 iterations are timed, each standing in for 10.
+                self.assertEqual(500, utilityCalcs)
+                if mode == TelemetryMode.Sampled:
+                    self.assertEqual(0, keyData['playout'][0] % 10)
+                    # scopes outside the iteration loop are still timed once each.
+                    self.assertEqual(1, keyData['summary build'][0])
+
+        # the shared default telemetry (e.g. get_next_board_state's) must not be switchable on for every caller.
+        self.assertFalse(hasattr(NO_OP_TELEMETRY, 'set_mode'))
+        self.assertIs(NO_OP_SCOPE, NO_OP_TELEMETRY.monitor_telemetry('next board execution'))
+
+    def test_progressive_widening__should_only_visit_admitted_prior_ordered_moves(self):
+        rawMap = """
+|    |    |    |    |    
+          aG1          
+                    
+                    
+                    
+     a25               
+               b25     
+                    
+                    
+                    
+          bG1          
+|    |    |    |    |    
+player_index=0
+bot_target_player=1
+aTiles=20
+bTiles=20
+"""
+        map, general, enemyGen = self.load_map_and_generals_from_string(rawMap, 102)
+        self.ensure_player_tiles_and_scores(map, general, generalTileCount=20)
+        aArmy, bArmy = self.get_test_army_tiles(map, general, enemyGen)
+
+        boardAnalysis = BoardAnalyzer(map, general)
+        boardAnalysis.rebuild_intergeneral_analysis(enemyGen)
+
+        mcts: MctsDUCT = MctsDUCT()
+        mcts.use_progressive_widening = True
+        armyEngine = ArmyEngine(map, [aArmy], [bArmy], boardAnalysis, mctsRunner=mcts)
+        armyEngine.time_limit = 100000000000000.0
+        armyEngine.iteration_limit = 1000
+        armyEngine.scan(4, mcts=True)
+
+        summary = mcts.last_summary
+        root = summary.root_node
+        self.assertEqual(1000, root.totalVisitCount)
+        self.assertTrue(root.moves_ordered_by_prior)
+
+        game = root.context.game
+        players = [game.friendly_player, game.enemy_player]
+        for p in range(2):
+            priors = [-1 if m is None else Game.get_move_heuristic_value(players[p], players[1 - p], game.teams, m, root.context.board_state) for m in root.legalMovesPerPlayer[p]]
+            self.assertEqual(sorted(priors, reverse=True), priors)
+
+        toVisit = [root]
+        while toVisit:
+            node = toVisit.pop()
+            numAdmitted = mcts.get_progressive_widening_move_count(node.totalVisitCount)
+            for p in range(2):
+                for i, visits in enumerate(node.visitCounts[p]):
+                    if i >= numAdmitted:
+                        self.assertEqual(0, visits)
+            toVisit.extend(node.children.values())
+
+        # the widened root still considered more than the minimum number of moves for each player
+        for p in range(2):
+            self.assertGreater(len([v for v in root.visitCounts[p] if v > 0]), mcts.progressive_widening_min_moves)
+
+    def test_select_ucb1_jit__should_match_python_ucb1_with_killer_blend_and_break_ties_evenly(self):
+        visitCounts = numpy.array([4, 0, 10, 2, 0], dtype=numpy.int64)
+        scoreSums = numpy.array([2.0, 0.0, -3.0, 1.5, 0.0], dtype=numpy.float64)
+        killerAverages = numpy.array([numpy.nan, numpy.nan, 0.9, -0.5, numpy.nan], dtype=numpy.float64)
+        twoParentLog = 0.55 * numpy.log(16)
+
+        for killer in [MctsLudii.NO_KILLER_AVERAGES, killerAverages]:
+            for numMoves in [1, 3, 4]:
+                with self.subTest(killer=len(killer) > 0, numMoves=numMoves):
+                    expectedValues = []
+                    for i in range(numMoves):
+                        exploit = 1.0 if visitCounts[i] == 0 else scoreSums[i] / visitCounts[i]
+                        if len(killer) > 0 and not numpy.isnan(killer[i]):
+                            exploit = exploit * 0.8 + 0.2 * killer[i]
+                        expectedValues.append(exploit + numpy.sqrt(twoParentLog / max(1, visitCounts[i])))
+
+                    self.assertEqual(int(numpy.argmax(expectedValues)), MctsDUCT.select_ucb1_jit(visitCounts, scoreSums, numMoves, twoParentLog, killer, 0.2, 0.8, 7))
+
+        # the two unvisited moves tie, each should be picked for half of the random ints
+        picks = [MctsDUCT.select_ucb1_jit(visitCounts, scoreSums, 5, twoParentLog, MctsLudii.NO_KILLER_AVERAGES, 0.2, 0.8, r) for r in range(10)]
+        self.assertEqual(5, picks.count(1))
+        self.assertEqual(5, picks.count(4))
+
+        self.assertEqual(MctsLudii.NO_MOVE_FOUND, MctsDUCT.select_ucb1_jit(visitCounts, scoreSums, 0, twoParentLog, MctsLudii.NO_KILLER_AVERAGES, 0.2, 0.8, 7))
+
+        MctsDUCT.backprop_move_stats_jit(visitCounts, scoreSums, 1, -0.25)
+        self.assertEqual(1, visitCounts[1])
+        self.assertEqual(-0.25, scoreSums[1])
@@ -1,5 +1,6 @@
 from Sim.GameSimulator import GameSimulatorHost
 from Strategy import TeamAttackData
+from StrategyModels import CycleStatsData, CycleStatsHistory, CYCLE_STATS_SCALAR_FIELDS
 from TestBase import TestBase
 
 
@@ -863,3 +864,34 @@ class OpponentTrackerTests(TestBase):
         self.assertEqual(2, bot.opponent_tracker.current_team_cycle_stats[enemyGeneral.player].approximate_fog_army_available_total_true)
         # zero reason to touch city army...
         self.assertEqual(7, bot.opponent_tracker.current_team_cycle_stats[enemyGeneral.player].approximate_fog_city_army)
+
+    def test_cycle_stats_history__should_archive_old_cycles_and_drop_past_capacity(self):
+        history = CycleStatsHistory(1, [1, 3], fullWindow=2, capacity=3)
+        recorded = {}
+        for turn in range(50, 350, 50):
+            stats = CycleStatsData(1, [1, 3])
+            stats.tiles_gained = turn // 10
+            stats.approximate_fog_army_available_total = turn + 1
+            stats.approximate_fog_city_army = -turn
+            history[turn] = stats
+            recorded[turn] = stats
+
+        self.assertEqual([100, 150, 200, 250, 300], history.keys(), 'turn 50 should have been pushed out of the 3 cycle ring buffer.')
+        self.assertEqual(5, len(history))
+        self.assertNotIn(50, history)
+        self.assertIsNone(history.get(50, None))
+
+        self.assertIs(recorded[300], history[300], 'the most recent cycles keep their actual objects.')
+        self.assertIs(recorded[250], history.get(250))
+
+        rebuilt = history.get(100)
+        self.assertIsNot(recorded[100], rebuilt)
+        self.assertEqual(repr(recorded[100]), repr(rebuilt))
+        for field in CYCLE_STATS_SCALAR_FIELDS:
+            self.assertEqual(getattr(recorded[100], field), getattr(rebuilt, field), field)
+
+        replacement = CycleStatsData(1, [1, 3])
+        replacement.tiles_gained = 99
+        history[150] = replacement
+        self.assertEqual(99, history[150].tiles_gained, 'overwriting an archived cycle should replace it, not leave the stale archive behind.')
+        self.assertEqual(5, len(history))
@@ -1697,6 +1697,50 @@ player_index=0
         else:
             logbook.info(msg)
 
+    def test_GatherMaxIterativeSet_PruneReconnect__anytime_should_return_valid_plan_when_out_of_time(self):
+        testData = """
+|    |    |    |    |    |    |    |    |    |    |    |    |    |    |    |    |
+aG1  a11  a2   a2   a3   a3   a3   a3   a3   a3   a3   a2   a2   a3   a1   a3   a3
+a3   a3   a2   a2   a2   a2   a2   M    a2   a2   a2   a2   a2   a1   a1   a2   a1
+a3   b1   b1   b1   b1   b1   b1   b1   b1   b1   b1   M    b1   b1   a2   b1   a3
+a3   a2   a2   a2   a3   a3   a3   M    a3   a3   a3   a1   a1   a1   a1   a3   M
+a3   a3   a2   a2   a2   a2   a2   a2   a2   a2   a2   a2   a2   a1   a2   a2   M
+a3   a3   a2   a2   a3   a3   a3   a3   a3   a3   M    a2   a2   a6   a2   a3   a3
+a3   a2   a2   a2   a3   a3   a3   a3   M    a3   a3   a1   a1   a1   a1   a3   b1
+a3   a2   b1   b1   b1   b1   M    b1   b1   b1   b1   b1   b1   b1   b1   b1   a5
+a3   b1   M    a30  b1   b1   b1   b1   b1   b1   b1   b1   b1   b1   bG1  b1   b1
+|    |    |    |    |    |    |    |    |    |    |    |   |
+player_index=0
+        """
+        map, general, enemyGeneral = self.load_map_and_generals_from_string(testData, 100)
+
+        self.begin_capturing_logging()
+        gatherMatrix = Gather.build_gather_capture_pure_value_matrix(map, general.player, set(), useTrueValueGathered=True, prioritizeCaptureHighArmyTiles=False)
+
+        for depth in [15, 30, 45]:
+            for budget in [None, 0.01, 0.0]:
+                with self.subTest(depth=depth, budget=budget):
+                    cutoffTime = None
+                    if budget is not None:
+                        cutoffTime = time.perf_counter() + budget
+                    plan = Gather.gather_max_set_iterative_plan(
+                        map,
+                        {enemyGeneral},
+                        depth,
+                        gatherMatrix,
+                        gatherMatrix,
+                        renderLive=False,
+                        viewInfo=None,
+                        searchingPlayer=general.player,
+                        cutoffTime=cutoffTime,
+                    )
+
+                    # out of time the reconnects degrade to their best-so-far, which must still be a connected, non-empty plan within the turn budget.
+                    self.assertIsNotNone(plan)
+                    self.assertGreater(plan.length, 0)
+                    self.assertLessEqual(plan.length, depth)
+                    self.assertGreater(plan.gathered_army, 0)
+
     def test_GatherBenchmarker(self):
         #
         """
@@ -318,6 +318,9 @@ class MapBase(object):
         self.pathable_tiles: typing.Set[Tile] = set()
         """Tiles PATHABLE from the general spawn on the map, including neutral cities but not including mountains/undiscovered obstacles"""
 
+        self.pathable_tiles_version: int = 0
+        """Bumped whenever pathable_tiles or valid_spawns is replaced or modified, for caches derived from either set."""
+
         self.reachable_tiles: typing.Set[Tile] = set()
         """
         Tiles REACHABLE from the general spawn on the map, this includes EVERYTHING from pathableTiles but ALSO 
@@ -454,6 +457,7 @@ class MapBase(object):
             self.grid[tile.y][tile.x] = tile
 
         self.pathable_tiles = {self.tiles_by_index[i] for i in self.pathable_tiles}
+        self.pathable_tiles_version = state.get('pathable_tiles_version', 0) + 1
 
         for tile in self.tiles_by_index:
             tile.movable = [self.tiles_by_index[i] for i in tile.movable]
@@ -1253,6 +1257,7 @@ AttributeError: 'Map' object has no attribute 'grid'
                 pass
 
         self.pathable_tiles = pathableTiles
+        self.pathable_tiles_version += 1
         self.reachable_tiles = reachableTiles
         self.visible_tiles = visibleTiles
         t = self.GetTile(2, 6)
@@ -1334,6 +1339,7 @@ AttributeError: 'Map' object has no attribute 'grid'
             if self.valid_spawns is None:
                 self.valid_spawns = set()
             self.valid_spawns.add(tile)
+            self.pathable_tiles_version += 1
 
         # neutral army format is n{armyAmt}
         if val.startswith('n'):
@@ -1379,6 +1385,7 @@ AttributeError: 'Map' object has no attribute 'grid'
 
     def convert_tile_to_mountain(self, tile: Tile):
         self.pathable_tiles.discard(tile)
+        self.pathable_tiles_version += 1
         if tile.isCity:
             for player in self.players:
                 if tile in player.cities:
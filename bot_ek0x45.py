@@ -3921,8 +3921,7 @@ class EklipZBot(object):
         for player in self._map.players:
             if not player.dead and player.team == self.targetPlayerObj.team and player.index != self.targetPlayer:
                 enGenPositions = enGenPositions.copy()
-                for i, val in enumerate(self.armyTracker.valid_general_positions_by_player[player.index].raw):
-                    enGenPositions.raw[i] = enGenPositions.raw[i] or val
+                enGenPositions.add_bits(self.armyTracker.get_valid_general_position_bits(player.index) & ~enGenPositions.to_bits())
 
         if onlyHuntGeneral is None:
             onlyHuntGeneral = self.armyTracker.has_perfect_information_of_player_cities(self.targetPlayer)
@@ -8919,8 +8918,9 @@ class EklipZBot(object):
 
         if self.armyTracker is not None:
             if self.info_render_army_emergence_values:
+                emergence = self.armyTracker.get_emergence_snapshot(self.targetPlayer)
                 for tile in self._map.reachable_tiles:
-                    val = self.armyTracker.emergenceLocationMap[self.targetPlayer][tile]
+                    val = emergence[tile.tile_index]
                     if val != 0:
                         textVal = f"e{val:.0f}"
                         self.viewInfo.bottomMidRightGridText[tile] = textVal